@@ -2,9 +2,28 @@
 API request/response models.
 """
 
+from enum import Enum
 from typing import List, Optional
 from pydantic import BaseModel, Field, HttpUrl
 
+from config import config
+
+
+class ResolveMode(str, Enum):
+    """How much /resolve extracts."""
+    # Metadata, embed URLs and the direct audio_url (format/signature extraction)
+    FULL = "full"
+    # Metadata and embed URLs only; audio_url may be empty
+    LITE = "lite"
+
+
+class SearchSource(str, Enum):
+    """Where /search looks for results."""
+    # yt-dlp search (always fresh)
+    YOUTUBE = "youtube"
+    # Local catalog of seen tracks; falls through to YouTube on a miss
+    LOCAL = "local"
+
 
 class ResolveRequest(BaseModel):
     """Request body for track resolution."""
@@ -31,6 +50,32 @@ class TrackInfoResponse(BaseModel):
     )
 
 
+class BatchResolveRequest(BaseModel):
+    """Request body for resolving several tracks in one round trip."""
+    urls: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=config.server.batch_max_items,
+        description="YouTube URLs or 11-character video IDs"
+    )
+
+
+class BatchResolveItem(BaseModel):
+    """Per-item outcome of a batch resolve."""
+    url: str = Field(..., description="Input URL or ID as submitted")
+    id: Optional[str] = Field(default=None, description="Normalized video ID")
+    success: bool
+    track: Optional[TrackInfoResponse] = None
+    error: Optional[str] = None
+
+
+class BatchResolveResponse(BaseModel):
+    """Batch resolve results, in request order."""
+    results: List[BatchResolveItem]
+    resolved: int = Field(..., description="Number of successful items")
+    failed: int = Field(..., description="Number of failed items")
+
+
 class ErrorResponse(BaseModel):
     """Standard error response."""
     error: str
@@ -55,3 +100,10 @@ class SearchResponse(BaseModel):
     """Search results response."""
     query: str
     results: List[SearchResultItem]
+    source: SearchSource = SearchSource.YOUTUBE
+
+
+class SuggestResponse(BaseModel):
+    """Search-as-you-type suggestions."""
+    query: str
+    suggestions: List[str]
@@ -2,22 +2,71 @@
 API routes and endpoints.
 """
 
-from fastapi import APIRouter, HTTPException
+import asyncio
+import json
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from typing import Optional
 
 from api.models import (
     ResolveRequest,
+    ResolveMode,
     TrackInfoResponse,
+    BatchResolveRequest,
+    BatchResolveItem,
+    BatchResolveResponse,
     SearchResponse,
+    SearchSource,
+    SuggestResponse,
     ErrorResponse
 )
+from audio_cache import audio_cache, parse_range
+from audio_proxy import UpstreamError, audio_relay
+from prebuffer import head_cache
+from config import config
 from yt_dlp_client import ytdlp_client
-from extraction_backends import extraction_manager, BackendType
+from extraction_backends import (
+    extraction_manager,
+    BackendType,
+    ExtractionResult
+)
+from extraction_executor import extraction_executor
+from catalog import catalog
+from health_monitor import extraction_health_monitor
+from invidious_pool import invidious_pool
+from prefetch import related_prefetcher
+from search_cache import search_cache
+from startup import startup_timings
+from suggest_index import suggest_index
+from video_ids import parse_playlist_url, parse_video_id, watch_url
 
 
 router = APIRouter()
 
 
+def _after_resolve(track):
+    """Feed a played track to the catalog, suggestions and related prefetch."""
+    if catalog is not None:
+        catalog.add_track(track, played=True)
+    suggest_index.record_play(track.title)
+    if related_prefetcher is not None:
+        related_prefetcher.schedule(track.related)
+
+
+def _track_response(track) -> TrackInfoResponse:
+    """Build the API response for an extracted track."""
+    return TrackInfoResponse(
+        id=track.id,
+        title=track.title,
+        duration=track.duration,
+        audio_url=track.audio_url,
+        embed_url=track.embed_url,
+        invidious_url=track.invidious_url,
+        related=track.related
+    )
+
+
 @router.post(
     "/resolve",
     response_model=TrackInfoResponse,
@@ -28,7 +77,11 @@ router = APIRouter()
     summary="Resolve YouTube URL",
     description="Extract track metadata and direct audio URL from YouTube"
 )
-async def resolve_track(request: ResolveRequest):
+async def resolve_track(
+    request: ResolveRequest,
+    mode: Optional[ResolveMode] = Query(None, description="full (default) or lite"),
+    header_mode: Optional[ResolveMode] = Header(None, alias="X-Resolve-Mode")
+):
     """
     Resolve a YouTube URL to get track metadata and streaming URL.
     
@@ -37,6 +90,11 @@ async def resolve_track(request: ResolveRequest):
     - Fallback: Invidious API (no auth, reliable)
     
     - **url**: YouTube video URL (any format: watch, shorts, embed)
+    - **mode**: `lite` (query param or `X-Resolve-Mode` header) returns
+      metadata and embed URLs via the cheapest path (track cache,
+      metadata-only yt-dlp extraction, Invidious) and skips format
+      extraction; `audio_url` is then empty unless a fresh one was
+      cached. Use the default `full` mode when direct audio is played.
     
     Returns track info including:
     - Video ID
@@ -45,9 +103,18 @@ async def resolve_track(request: ResolveRequest):
     - Direct audio stream URL (Opus codec)
     - Related videos (best-effort)
     """
+    mode = mode or header_mode or ResolveMode.FULL
+    
+    if mode == ResolveMode.LITE:
+        if parse_video_id(request.url) is None:
+            raise HTTPException(status_code=400, detail=f"Invalid YouTube URL: {request.url}")
+        extract = extraction_manager.extract_metadata
+    else:
+        extract = extraction_manager.extract
+    
     try:
-        # Use extraction manager with pluggable backends
-        result = extraction_manager.extract(request.url)
+        # Use extraction manager with pluggable backends (off the event loop)
+        result = await extraction_executor.run(extract, request.url)
         
         if not result.success:
             raise HTTPException(
@@ -55,17 +122,8 @@ async def resolve_track(request: ResolveRequest):
                 detail=f"Extraction failed: {result.error}"
             )
         
-        track = result.track
-        
-        return TrackInfoResponse(
-            id=track.id,
-            title=track.title,
-            duration=track.duration,
-            audio_url=track.audio_url,
-            embed_url=track.embed_url,
-            invidious_url=track.invidious_url,
-            related=track.related
-        )
+        _after_resolve(result.track)
+        return _track_response(result.track)
         
     except HTTPException:
         raise
@@ -75,6 +133,258 @@ async def resolve_track(request: ResolveRequest):
         raise HTTPException(status_code=500, detail=f"Extraction error: {e}")
 
 
+def _ndjson(event: dict) -> str:
+    """Serialize one NDJSON event line."""
+    return json.dumps(event, separators=(',', ':')) + "\n"
+
+
+def _metadata_event(track) -> dict:
+    """First progressive-resolve event: what the UI needs to render."""
+    return {
+        "event": "metadata",
+        "id": track.id,
+        "title": track.title,
+        "duration": track.duration,
+        "embed_url": track.embed_url,
+        "invidious_url": track.invidious_url,
+    }
+
+
+async def _progressive_resolve_events(url: str):
+    """
+    Yield resolve events as each piece becomes available.
+    
+    Metadata comes from the track cache when it holds the track. Otherwise
+    a metadata-only extraction races the full extraction and metadata
+    comes from whichever finishes first (if the full one wins, the other
+    is cancelled unless it has started). The stream URL and related videos
+    follow once the full extraction completes.
+    """
+    full = asyncio.ensure_future(
+        extraction_executor.run(extraction_manager.extract, url)
+    )
+    metadata = None
+    
+    try:
+        cached = await extraction_executor.run(extraction_manager.cached_metadata, url)
+        sent_metadata = cached is not None
+        if sent_metadata:
+            yield _ndjson(_metadata_event(cached))
+        else:
+            # Cache miss: a second (cheaper) extraction is worth its request
+            metadata = asyncio.ensure_future(
+                extraction_executor.run(extraction_manager.extract_metadata, url)
+            )
+            for next_done in asyncio.as_completed([metadata, full]):
+                try:
+                    result = await next_done
+                except Exception as e:
+                    result = ExtractionResult(success=False, error=str(e))
+                if result.success:
+                    yield _ndjson(_metadata_event(result.track))
+                    sent_metadata = True
+                    break
+            metadata.cancel()
+        
+        try:
+            result = await full
+        except Exception as e:
+            result = ExtractionResult(success=False, error=str(e))
+        
+        if not result.success:
+            yield _ndjson({
+                "event": "error",
+                "detail": f"Extraction failed: {result.error}"
+            })
+            return
+        
+        track = result.track
+        if not sent_metadata:
+            yield _ndjson(_metadata_event(track))
+        yield _ndjson({
+            "event": "stream",
+            "audio_url": track.audio_url,
+            "codec": track.codec,
+            "expires_at": track.expires_at,
+        })
+        yield _ndjson({"event": "related", "related": track.related})
+        _after_resolve(track)
+        yield _ndjson({"event": "done"})
+    finally:
+        # Client went away or we finished: stop waiting on leftover work
+        if metadata is not None:
+            metadata.cancel()
+        full.cancel()
+
+
+@router.post(
+    "/resolve/stream",
+    responses={
+        200: {"content": {"application/x-ndjson": {}}},
+        400: {"model": ErrorResponse, "description": "Invalid URL"}
+    },
+    summary="Resolve YouTube URL Progressively",
+    description="Stream track metadata, stream URL and related videos as NDJSON events"
+)
+async def resolve_track_stream(request: ResolveRequest):
+    """
+    Resolve a YouTube URL, streaming each piece as soon as it is known.
+    
+    Emits one JSON object per line:
+    - `metadata`: id, title, duration, embed_url, invidious_url
+    - `stream`: audio_url, codec, expires_at
+    - `related`: related video suggestions
+    - `done` on success, or `error` with a detail message
+    
+    The player can render and start an embed on `metadata` while the
+    direct stream URL is still being resolved.
+    """
+    if parse_video_id(request.url) is None:
+        raise HTTPException(status_code=400, detail=f"Invalid YouTube URL: {request.url}")
+    
+    return StreamingResponse(
+        _progressive_resolve_events(request.url),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.post(
+    "/resolve/batch",
+    response_model=BatchResolveResponse,
+    summary="Resolve Many YouTube URLs",
+    description="Resolve a queue or playlist of tracks in one round trip"
+)
+async def resolve_batch(request: BatchResolveRequest):
+    """
+    Resolve several YouTube URLs or video IDs concurrently.
+    
+    - **urls**: YouTube URLs or bare video IDs (duplicates are resolved once)
+    
+    Returns one item per input, in request order, each with either the
+    track or an error. A failing item does not fail the batch.
+    """
+    # Normalize and dedupe: each distinct video is resolved once
+    video_ids = []
+    for value in request.urls:
+        video_ids.append(parse_video_id(value))
+    unique_ids = list(dict.fromkeys(v for v in video_ids if v))
+    
+    # Cap per-batch fan-out so one queue load cannot take every extraction slot
+    semaphore = asyncio.Semaphore(config.server.batch_concurrency)
+    
+    async def resolve_one(video_id: str):
+        async with semaphore:
+            try:
+                return await extraction_executor.run(
+                    extraction_manager.extract,
+                    watch_url(video_id)
+                )
+            except Exception as e:
+                return ExtractionResult(success=False, error=str(e))
+    
+    resolved = dict(zip(
+        unique_ids,
+        await asyncio.gather(*(resolve_one(v) for v in unique_ids))
+    ))
+    
+    items = []
+    for value, video_id in zip(request.urls, video_ids):
+        if video_id is None:
+            items.append(BatchResolveItem(
+                url=value, success=False, error=f"Invalid YouTube URL: {value}"
+            ))
+            continue
+        result = resolved[video_id]
+        if result.success:
+            if catalog is not None:
+                catalog.add_track(result.track)
+            items.append(BatchResolveItem(
+                url=value, id=video_id, success=True,
+                track=_track_response(result.track)
+            ))
+        else:
+            items.append(BatchResolveItem(
+                url=value, id=video_id, success=False,
+                error=f"Extraction failed: {result.error}"
+            ))
+    
+    succeeded = sum(1 for item in items if item.success)
+    return BatchResolveResponse(
+        results=items,
+        resolved=succeeded,
+        failed=len(items) - succeeded
+    )
+
+
+async def _playlist_events(pager):
+    """Yield a playlist header, then NDJSON pages of entries as yt-dlp pages."""
+    try:
+        yield _ndjson({
+            "event": "playlist",
+            "id": pager.id,
+            "title": pager.title,
+            "uploader": pager.uploader,
+        })
+        while True:
+            page = await extraction_executor.run(pager.next_page)
+            if not page:
+                break
+            if catalog is not None:
+                catalog.add_results(page)
+            yield _ndjson({"event": "entries", "entries": page})
+        yield _ndjson({
+            "event": "done",
+            "count": pager.count,
+            "skipped": pager.skipped,
+            "truncated": pager.truncated,
+        })
+    except Exception as e:
+        yield _ndjson({"event": "error", "detail": f"Playlist failed: {e}"})
+    finally:
+        pager.close()
+
+
+@router.get(
+    "/playlist",
+    responses={
+        200: {"content": {"application/x-ndjson": {}}},
+        400: {"model": ErrorResponse, "description": "Invalid or unavailable playlist"}
+    },
+    summary="Enumerate Playlist or Channel",
+    description="Stream playlist/channel entries as NDJSON pages without resolving them"
+)
+async def resolve_playlist(
+    url: str = Query(..., description="YouTube playlist or channel URL"),
+    limit: Optional[int] = Query(
+        None, ge=1, le=config.server.playlist_max_entries,
+        description="Maximum entries to return"
+    )
+):
+    """
+    Enumerate a playlist or channel with flat extraction.
+    
+    Emits one JSON object per line:
+    - `playlist`: id, title, uploader
+    - `entries`: a page of {id, title, duration, url}, sent as soon as
+      yt-dlp has fetched it
+    - `done` with count/skipped/truncated, or `error` with a detail message
+    
+    Entries are not resolved: resolve a track (e.g. POST /api/resolve)
+    when it is played.
+    """
+    if parse_playlist_url(url) is None:
+        raise HTTPException(status_code=400, detail=f"Invalid YouTube playlist or channel URL: {url}")
+    
+    try:
+        pager = await extraction_executor.run(
+            ytdlp_client.open_playlist, url, None, limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return StreamingResponse(_playlist_events(pager), media_type="application/x-ndjson")
+
+
 @router.get(
     "/search",
     response_model=SearchResponse,
@@ -83,24 +393,43 @@ async def resolve_track(request: ResolveRequest):
 )
 async def search(
     q: str = "",
-    limit: int = 20
+    limit: int = 20,
+    source: SearchSource = Query(SearchSource.YOUTUBE, description="youtube (default) or local")
 ):
     """
     Search YouTube for videos.
     
     - **q**: Search query string
     - **limit**: Maximum results (1-50, default 20)
+    - **source**: `local` answers from the catalog of tracks this server
+      has already seen (milliseconds) and only searches YouTube when the
+      catalog has no match; `youtube` always searches YouTube
     
-    Returns list of matching videos with basic metadata.
+    Returns list of matching videos with basic metadata and the source
+    that answered. Repeated YouTube queries (ignoring case, whitespace
+    and Unicode form) are served from the search cache.
     """
     if not q or len(q.strip()) < 2:
         raise HTTPException(
             status_code=400,
             detail="Search query must be at least 2 characters"
         )
+    limit = min(limit, 50)
     
     try:
-        results = ytdlp_client.search(q.strip(), min(limit, 50))
+        if source == SearchSource.LOCAL and catalog is not None:
+            results = await extraction_executor.run(catalog.search, q.strip(), limit)
+            if results:
+                suggest_index.record_search(q.strip(), results)
+                return SearchResponse(query=q, results=results, source=SearchSource.LOCAL)
+        
+        search_fn = search_cache.search if search_cache is not None else ytdlp_client.search
+        results = await extraction_executor.run(
+            search_fn, q.strip(), limit
+        )
+        suggest_index.record_search(q.strip(), results)
+        if catalog is not None:
+            catalog.add_results(results)
         
         return SearchResponse(
             query=q,
@@ -114,6 +443,165 @@ async def search(
         )
 
 
+def _sse(event: str, data) -> str:
+    """Encode one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _search_events(query: str, limit: int):
+    """Yield SSE `result` events as yt-dlp produces them, then `done`."""
+    cached = search_cache.peek(query, limit) if search_cache is not None else None
+    if cached is not None:
+        for item in cached:
+            yield _sse("result", item)
+        yield _sse("done", {"count": len(cached), "cached": True})
+        return
+    
+    entries = ytdlp_client.iter_search(query, limit)
+    results = []
+    try:
+        while True:
+            item = await extraction_executor.run(next, entries, None)
+            if item is None:
+                break
+            results.append(item)
+            yield _sse("result", item)
+        if search_cache is not None:
+            search_cache.store(query, limit, results)
+        suggest_index.record_search(query, results)
+        if catalog is not None:
+            catalog.add_results(results)
+        yield _sse("done", {"count": len(results), "cached": False})
+    except Exception as e:
+        yield _sse("error", {"detail": f"Search failed: {e}"})
+    finally:
+        try:
+            entries.close()
+        except ValueError:
+            # Still running in a worker thread (client went away); it
+            # closes itself when that step finishes and is collected
+            pass
+
+
+@router.get(
+    "/search/stream",
+    responses={
+        200: {"content": {"text/event-stream": {}}},
+        400: {"model": ErrorResponse, "description": "Query too short"}
+    },
+    summary="Search YouTube (Streaming)",
+    description="Stream search results as Server-Sent Events while yt-dlp extracts them"
+)
+async def search_stream(
+    q: str = "",
+    limit: int = 20
+):
+    """
+    Search YouTube, sending each result as soon as it is extracted.
+    
+    Server-Sent Events:
+    - `result`: one search result (id, title, duration, thumbnail)
+    - `done`: {count, cached}; or `error` with a detail message
+    
+    Cached queries are replayed immediately; otherwise results are
+    forwarded as yt-dlp yields them and cached once complete.
+    """
+    if not q or len(q.strip()) < 2:
+        raise HTTPException(
+            status_code=400,
+            detail="Search query must be at least 2 characters"
+        )
+    
+    return StreamingResponse(
+        _search_events(q.strip(), max(1, min(limit, 50))),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get(
+    "/suggest",
+    response_model=SuggestResponse,
+    summary="Search Suggestions",
+    description="Instant query completions from previously seen searches and titles"
+)
+async def suggest(
+    q: str = "",
+    limit: int = Query(8, ge=1, le=20)
+):
+    """
+    Complete a partial search query from the local prefix index.
+    
+    - **q**: What has been typed so far
+    - **limit**: Maximum suggestions (1-20, default 8)
+    
+    Suggestions come from queries searched and titles seen or played on
+    this server, most popular first. YouTube is never contacted.
+    """
+    return SuggestResponse(query=q, suggestions=suggest_index.suggest(q, limit))
+
+
+@router.get(
+    "/stream/{video_id}",
+    responses={
+        200: {"content": {"audio/webm": {}, "audio/mp4": {}}},
+        206: {"description": "Partial content (Range request)"},
+        400: {"model": ErrorResponse, "description": "Invalid video ID"},
+        404: {"model": ErrorResponse, "description": "Audio relay disabled"},
+        502: {"model": ErrorResponse, "description": "Extraction or upstream failure"}
+    },
+    summary="Relay Audio Stream",
+    description="Proxy a track's direct audio stream with HTTP Range support"
+)
+async def stream_audio(
+    video_id: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None, alias="If-Range")
+):
+    """
+    Stream a track's audio through the server.
+    
+    A stable URL for `<audio src>`: the direct stream URL is resolved
+    server-side (track cache first) and re-resolved transparently when
+    upstream rejects it as expired (403). `Range` requests are forwarded,
+    so seeking returns `206 Partial Content`.
+    
+    Tracks played from the start are also written to the on-disk audio
+    cache; once complete they are served from disk without contacting
+    YouTube.
+    
+    - **video_id**: 11-character YouTube video ID
+    """
+    if audio_relay is None:
+        raise HTTPException(status_code=404, detail="Audio relay is disabled")
+    if parse_video_id(video_id) != video_id:
+        raise HTTPException(status_code=400, detail=f"Invalid YouTube video ID: {video_id}")
+    
+    if audio_cache is not None:
+        # Only a request from the start is a play; seeks and chunked reads are not
+        requested = parse_range(range_header) if range_header else (0, None)
+        cached = await audio_cache.run(
+            audio_cache.lookup, video_id, requested is not None and requested[0] == 0
+        )
+        if cached is not None:
+            # Starlette handles Range/If-Range for files
+            return FileResponse(cached.path, media_type=cached.content_type)
+    
+    forwarded = {
+        name: value
+        for name, value in (("Range", range_header), ("If-Range", if_range))
+        if value is not None
+    }
+    try:
+        relayed = await audio_relay.stream(video_id, forwarded)
+    except (ValueError, UpstreamError) as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    
+    return StreamingResponse(
+        relayed.body, status_code=relayed.status_code, headers=relayed.headers
+    )
+
+
 @router.get(
     "/health",
     summary="Health Check",
@@ -124,20 +612,97 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@router.get(
+    "/health/live",
+    summary="Liveness",
+    description="Process is up and serving requests; never depends on upstream YouTube"
+)
+async def liveness():
+    """Liveness probe (for the Docker healthcheck)."""
+    return {"status": "alive"}
+
+
+@router.get(
+    "/health/ready",
+    summary="Readiness",
+    description="At least one extraction backend worked in the last health check"
+)
+async def readiness():
+    """
+    Readiness probe, answered from the cached extraction health snapshot.
+    
+    Returns 503 until the first background check completes, when the
+    snapshot is stale, or when no backend is available.
+    """
+    snapshot = extraction_health_monitor.snapshot()
+    body = {
+        "ready": extraction_health_monitor.ready(),
+        "status": snapshot["status"],
+        "age_seconds": snapshot["age_seconds"],
+    }
+    return JSONResponse(body, status_code=200 if body["ready"] else 503)
+
+
 @router.get(
     "/health/extraction",
     summary="Extraction Backend Health",
-    description="Check availability of extraction backends"
+    description="Last background check of the extraction backends"
 )
 async def extraction_health():
     """
     Check health of extraction backends.
     
+    Served instantly from the snapshot taken by the background health
+    monitor (see HEALTH_CHECK_INTERVAL); no upstream request is made.
+    
     Returns:
-    - Primary (yt-dlp) availability
-    - Fallback (Invidious) availability
+    - Primary (yt-dlp) availability, deep probe latency and breaker state
+    - Fallback (Invidious) availability and breaker state
     - Overall status
     - Recommended backend
+    - checked_at / age_seconds / stale for the snapshot
+    """
+    return extraction_health_monitor.snapshot()
+
+
+@router.get(
+    "/stats",
+    summary="Runtime Statistics",
+    description="Extraction pool sizing and queue statistics"
+)
+async def runtime_stats():
+    """
+    Get runtime statistics for sizing the extraction pipeline.
+    
+    Returns:
+    - executor: worker count, running/queued jobs, queue wait times (ms)
+    - extraction: extraction manager stats (worker pool mode and recycling)
+    - invidious: per-instance probe latency/success and current ranking
+    - prefetch: related-track prefetch counters (null when disabled)
+    - search: search cache hit/miss counters (null when disabled)
+    - suggest: suggestion index size
+    - catalog: local track catalog size and lookup counters (null when disabled)
+    - startup: milestones and pre-warm phase durations (ms) since process start
+    - stream: audio relay counters (null when disabled)
+    - audio_cache: on-disk audio cache size and hit/fill counters (null when disabled)
+    - prebuffer: in-memory track head count, size and hit counters (null when disabled)
     """
-    health = extraction_manager.health_check()
-    return health
+    catalog_stats = None
+    if catalog is not None:
+        catalog_stats = await extraction_executor.run(catalog.stats)
+    audio_cache_stats = None
+    if audio_cache is not None:
+        audio_cache_stats = await audio_cache.run(audio_cache.stats)
+    return {
+        "executor": extraction_executor.stats(),
+        "extraction": extraction_manager.stats(),
+        "invidious": invidious_pool.stats(),
+        "prefetch": related_prefetcher.stats() if related_prefetcher is not None else None,
+        "search": search_cache.stats() if search_cache is not None else None,
+        "suggest": suggest_index.stats(),
+        "catalog": catalog_stats,
+        "startup": startup_timings.stats(),
+        "stream": audio_relay.stats() if audio_relay is not None else None,
+        "audio_cache": audio_cache_stats,
+        "prebuffer": head_cache.stats() if head_cache is not None else None
+    }
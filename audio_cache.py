@@ -0,0 +1,454 @@
+"""
+On-disk audio cache for the /api/stream relay.
+
+Users replay the same tracks all day; without a cache every play
+downloads the audio from YouTube again. While the relay streams a track
+from its first byte, the bytes are also appended to
+``<video_id>-<format>.part`` in the cache directory. When the file is
+complete it is fsynced and atomically renamed into place, and later
+requests are served from disk (FileResponse, with Range support).
+
+- A track the client stopped listening to keeps its ``.part`` file; the
+  next request resumes it (the cached prefix is served from disk and only
+  the rest is fetched upstream).
+- The directory is held under a total-bytes budget. Eviction removes the
+  entry with the lowest score: last use plus a bonus per play (capped),
+  so tracks played often outlive ones played once more recently.
+- An SQLite index (size, total, content type, plays) survives restarts
+  and is reconciled with the files on first use.
+
+Every method blocks on disk or SQLite. Async callers go through ``run``,
+which executes the call on the cache's own I/O threads, so an fsync never
+stalls the event loop.
+"""
+
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, NamedTuple, Optional, Tuple
+
+from config import config
+
+
+# <video_id>-<format>[.part]
+_FILE_NAME = re.compile(r"^[A-Za-z0-9_-]{11}-\w+(\.part)?$")
+
+
+def parse_range(value: str) -> Optional[Tuple[int, Optional[int]]]:
+    """
+    Parse a single-range ``Range`` header.
+
+    Args:
+        value: Header value, e.g. "bytes=0-" or "bytes=100-199"
+
+    Returns:
+        (start, end or None), or None for suffix, multiple or invalid ranges
+    """
+    unit, _, spec = value.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start, sep, end = spec.strip().partition("-")
+    if not sep or not start.isdigit() or (end and not end.isdigit()):
+        return None
+    start = int(start)
+    end = int(end) if end else None
+    if end is not None and end < start:
+        return None
+    return start, end
+
+
+class CachedAudio(NamedTuple):
+    key: str
+    video_id: str
+    fmt: str
+    path: str  # Final path when complete, .part path otherwise
+    content_type: str
+    size: int  # Bytes on disk
+    total: int  # Full length of the track's audio
+    complete: bool
+
+
+def read_part(path: str, start: int, length: int) -> bytes:
+    """Read up to length bytes of a cached file from offset start."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(length)
+
+
+class AudioFill:
+    """Appends relayed bytes to a .part file; close() completes the entry."""
+
+    def __init__(self, cache: "AudioCache", entry: CachedAudio):
+        self._cache = cache
+        self.entry = entry
+        self.size = entry.size
+        # write() and close() may run on different I/O threads
+        self._lock = threading.Lock()
+        self._file = open(entry.path, "r+b" if os.path.exists(entry.path) else "wb")
+        # Drop anything past the recorded prefix (e.g. a torn write)
+        self._file.truncate(entry.size)
+        self._file.seek(entry.size)
+
+    def write(self, chunk: bytes):
+        with self._lock:
+            if self._file.closed:
+                return
+            # Never write past the end of the track
+            chunk = chunk[:self.entry.total - self.size]
+            self._file.write(chunk)
+            self.size += len(chunk)
+
+    def close(self):
+        """Flush and hand the file back (completes it if it is whole)."""
+        with self._lock:
+            if self._file.closed:
+                return
+            if self.size >= self.entry.total:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            self._file.close()
+        self._cache._finish_fill(self)
+
+
+class AudioCache:
+    """Byte-budgeted directory of relayed audio files."""
+
+    PART_SUFFIX = ".part"
+    # Threads for run(): fsyncs, file I/O and index queries
+    IO_WORKERS = 4
+    _COLUMNS = "key, video_id, fmt, content_type, size, total, complete"
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        play_bonus: Optional[float] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize cache. The directory and index are opened on first use.
+
+        Args:
+            directory: Where audio files and index.db live
+            max_bytes: Total size budget for cached files
+            play_bonus: Seconds of recency credited per play (eviction)
+            clock: Wall-clock time source
+        """
+        cfg = config.audio_cache
+        self._directory = cfg.directory if directory is None else directory
+        self._max_bytes = cfg.max_mb * 1024 * 1024 if max_bytes is None else max_bytes
+        self._play_bonus = cfg.play_bonus if play_bonus is None else play_bonus
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        # Keys with an active AudioFill -> bytes reserved for the rest of it
+        self._filling: dict = {}
+        self._io = ThreadPoolExecutor(
+            max_workers=self.IO_WORKERS, thread_name_prefix="audio-cache"
+        )
+
+        self._hits = 0
+        self._misses = 0
+        self._fills = 0
+        self._resumes = 0
+        self._completed = 0
+        self._evictions = 0
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """
+        Run a blocking cache call on the cache's I/O threads.
+
+        The call is shielded: it completes even if the awaiting request is
+        cancelled, so a fill is always closed and its key released. A fill
+        opened for a request cancelled meanwhile is closed right away.
+
+        Args:
+            fn: Blocking callable (a cache, fill or read_part call)
+            *args: Arguments for fn
+
+        Returns:
+            Whatever fn returns
+        """
+        future = asyncio.wrap_future(self._io.submit(fn, *args))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            future.add_done_callback(self._close_orphan)
+            raise
+
+    def _close_orphan(self, future: "asyncio.Future"):
+        if future.cancelled() or future.exception() is not None:
+            return
+        if isinstance(future.result(), AudioFill):
+            self._io.submit(future.result().close)
+
+    # ---------- Index ----------
+
+    def _db(self) -> sqlite3.Connection:
+        """Open the index lazily and reconcile it with the files (lock held)."""
+        if self._conn is None:
+            os.makedirs(self._directory, exist_ok=True)
+            conn = sqlite3.connect(
+                os.path.join(self._directory, "index.db"), check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS audio ("
+                " key TEXT PRIMARY KEY,"
+                " video_id TEXT NOT NULL,"
+                " fmt TEXT NOT NULL,"
+                " content_type TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " total INTEGER NOT NULL,"
+                " complete INTEGER NOT NULL,"
+                " plays INTEGER NOT NULL DEFAULT 0,"
+                " last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS audio_video ON audio(video_id)")
+            self._conn = conn
+            self._reconcile(conn)
+        return self._conn
+
+    def _path(self, key: str, complete: bool) -> str:
+        return os.path.join(self._directory, key if complete else key + self.PART_SUFFIX)
+
+    def _reconcile(self, db: sqlite3.Connection):
+        """Match index rows to files: drop missing ones, re-measure partials."""
+        known = set()
+        rows = db.execute("SELECT key, complete, total FROM audio").fetchall()
+        with db:
+            for key, complete, total in rows:
+                path = self._path(key, bool(complete))
+                if not os.path.exists(path):
+                    db.execute("DELETE FROM audio WHERE key = ?", (key,))
+                    continue
+                known.add(os.path.basename(path))
+                if not complete:
+                    size = min(os.path.getsize(path), total)
+                    db.execute("UPDATE audio SET size = ? WHERE key = ?", (size, key))
+        # Only files this cache could have written (never the index)
+        for name in os.listdir(self._directory):
+            if name not in known and _FILE_NAME.match(name):
+                os.remove(os.path.join(self._directory, name))
+
+    def _row(self, row: tuple) -> CachedAudio:
+        key, video_id, fmt, content_type, size, total, complete = row
+        return CachedAudio(
+            key, video_id, fmt, self._path(key, bool(complete)),
+            content_type, size, total, bool(complete)
+        )
+
+    # ---------- Lookups ----------
+
+    def lookup(self, video_id: str, count_play: bool = True) -> Optional[CachedAudio]:
+        """
+        Get the complete cached file for a video.
+
+        Args:
+            video_id: Canonical video ID
+            count_play: Count the lookup as a play (plays and last_used feed
+                the eviction score); False for seeks and chunked reads
+
+        Returns:
+            CachedAudio, or None if no complete file is cached
+        """
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                f"SELECT {self._COLUMNS} FROM audio"
+                " WHERE video_id = ? AND complete = 1"
+                " ORDER BY last_used DESC LIMIT 1",
+                (video_id,)
+            ).fetchone()
+            if row is None or not os.path.exists(self._path(row[0], True)):
+                if row is not None:
+                    with db:
+                        db.execute("DELETE FROM audio WHERE key = ?", (row[0],))
+                self._misses += 1
+                return None
+            if count_play:
+                with db:
+                    db.execute(
+                        "UPDATE audio SET plays = plays + 1, last_used = ? WHERE key = ?",
+                        (self._clock(), row[0])
+                    )
+            self._hits += 1
+            return self._row(row)
+
+    def partial(self, video_id: str) -> Optional[CachedAudio]:
+        """Get an incomplete file for a video that no request is filling."""
+        with self._lock:
+            for row in self._db().execute(
+                f"SELECT {self._COLUMNS} FROM audio"
+                " WHERE video_id = ? AND complete = 0 ORDER BY size DESC",
+                (video_id,)
+            ):
+                if row[0] not in self._filling:
+                    return self._row(row)
+        return None
+
+    # ---------- Filling ----------
+
+    def start_fill(
+        self, video_id: str, fmt: str, content_type: str, total: int, offset: int = 0
+    ) -> Optional[AudioFill]:
+        """
+        Claim a file for appending relayed bytes.
+
+        Args:
+            video_id: Canonical video ID
+            fmt: Format key (YouTube itag)
+            content_type: Upstream Content-Type
+            total: Full length of the audio in bytes
+            offset: Bytes already in the .part file (0 for a new file)
+
+        Returns:
+            AudioFill, or None if the file is being filled elsewhere or
+            cannot fit in the budget
+        """
+        if total <= 0 or total > self._max_bytes:
+            return None
+        key = f"{video_id}-{fmt}"
+        with self._lock:
+            db = self._db()
+            if key in self._filling:
+                return None
+            row = db.execute(
+                "SELECT size, total, complete FROM audio WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[2]:
+                return None
+            # Resuming needs the same track and exactly the recorded prefix
+            if offset and (row is None or row[1] != total or row[0] != offset):
+                return None
+            # Claim the key first so eviction cannot remove the file being resumed
+            self._filling[key] = 0
+            if not self._make_room(db, total - offset):
+                del self._filling[key]
+                return None
+            self._filling[key] = total - offset
+            with db:
+                db.execute(
+                    "INSERT OR REPLACE INTO audio VALUES (?, ?, ?, ?, ?, ?, 0,"
+                    " COALESCE((SELECT plays FROM audio WHERE key = ?), 0), ?)",
+                    (key, video_id, fmt, content_type, offset, total, key, self._clock())
+                )
+            self._fills += 1
+            if offset:
+                self._resumes += 1
+        try:
+            return AudioFill(self, CachedAudio(
+                key, video_id, fmt, self._path(key, False), content_type, offset, total, False
+            ))
+        except OSError:
+            with self._lock:
+                self._filling.pop(key, None)
+            return None
+
+    def _finish_fill(self, fill: AudioFill):
+        entry = fill.entry
+        complete = fill.size >= entry.total
+        if complete:
+            os.replace(entry.path, self._path(entry.key, True))
+        with self._lock:
+            self._filling.pop(entry.key, None)
+            db = self._db()
+            with db:
+                db.execute(
+                    "UPDATE audio SET size = ?, complete = ?, last_used = ? WHERE key = ?",
+                    (fill.size, int(complete), self._clock(), entry.key)
+                )
+            if complete:
+                self._completed += 1
+            self._make_room(db, 0)
+
+    def discard(self, key: str):
+        """Remove an entry and its file (e.g. a partial of a changed format)."""
+        with self._lock:
+            if key not in self._filling:
+                self._remove(self._db(), key)
+
+    # ---------- Eviction ----------
+
+    def _remove(self, db: sqlite3.Connection, key: str):
+        row = db.execute("SELECT complete FROM audio WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return
+        try:
+            os.remove(self._path(key, bool(row[0])))
+        except FileNotFoundError:
+            pass
+        with db:
+            db.execute("DELETE FROM audio WHERE key = ?", (key,))
+
+    def _make_room(self, db: sqlite3.Connection, incoming: int) -> bool:
+        """
+        Evict lowest-scoring idle entries until incoming bytes fit (lock held).
+
+        Bytes already reserved by active fills count as used, so
+        concurrent fills cannot overrun the budget together.
+
+        Returns:
+            True if the incoming bytes fit
+        """
+        used = db.execute("SELECT COALESCE(SUM(size), 0) FROM audio").fetchone()[0]
+        used += sum(self._filling.values())
+        if used + incoming <= self._max_bytes:
+            return True
+        candidates = db.execute(
+            "SELECT key, size FROM audio"
+            " ORDER BY last_used + MIN(plays, 10) * ? ASC",
+            (self._play_bonus,)
+        ).fetchall()
+        for key, size in candidates:
+            if used + incoming <= self._max_bytes:
+                break
+            if key in self._filling:
+                continue
+            self._remove(db, key)
+            used -= size
+            self._evictions += 1
+        return used + incoming <= self._max_bytes
+
+    # ---------- Stats ----------
+
+    def stats(self) -> dict:
+        """Get cache size and hit/fill counters."""
+        with self._lock:
+            complete, partial, used = self._db().execute(
+                "SELECT COALESCE(SUM(complete), 0), COALESCE(SUM(1 - complete), 0),"
+                " COALESCE(SUM(size), 0) FROM audio"
+            ).fetchone()
+            lookups = self._hits + self._misses
+            return {
+                "files": complete,
+                "partial_files": partial,
+                "bytes": used,
+                "reserved_bytes": sum(self._filling.values()),
+                "capacity_bytes": self._max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 3) if lookups else 0.0,
+                "fills": self._fills,
+                "resumed_fills": self._resumes,
+                "completed_fills": self._completed,
+                "evictions": self._evictions,
+            }
+
+    def close(self):
+        """Finish pending I/O and close the index."""
+        self._io.shutdown(wait=True)
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Global audio cache (None when disabled)
+audio_cache: Optional[AudioCache] = AudioCache() if config.audio_cache.enabled else None
@@ -0,0 +1,480 @@
+"""
+Audio relay for GET /api/stream/{video_id}.
+
+googlevideo stream URLs can be bound to the IP that extracted them and
+expire after a few hours, so the browser cannot always use ``audio_url``
+directly. The relay gives ``<audio>`` a stable local URL instead:
+
+- the track is resolved through the extraction manager (track cache
+  first), so a cached stream URL costs nothing;
+- the client's Range/If-Range headers are forwarded and the upstream
+  status (200/206/416) and Content-Range/Length are passed through, so
+  seeking works;
+- the body is streamed chunk by chunk, never buffered, over one shared
+  keep-alive httpx.AsyncClient;
+- an upstream 403/410 means the URL expired or was revoked: the track is
+  re-extracted once and the request retried with the fresh URL.
+
+With an AudioCache, requests that start at the beginning of a track (or
+at the end of its cached prefix) also fill the cache; see audio_cache.
+Cache calls run on the cache's I/O threads (AudioCache.run), never on
+the event loop.
+With a HeadCache, tracks whose first seconds are held in memory start
+playing before they are even resolved; see prebuffer.
+"""
+
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+import httpx
+
+from audio_cache import AudioCache, AudioFill, CachedAudio, audio_cache, parse_range, read_part
+from config import config
+from extraction_backends import extraction_manager
+from extraction_executor import extraction_executor
+from prebuffer import AudioHead, HeadCache, head_cache
+from video_ids import watch_url
+
+
+class UpstreamError(Exception):
+    """The upstream stream could not be fetched (after one re-resolve)."""
+
+
+class RelayedStream(NamedTuple):
+    """A client response: status, headers and body chunks."""
+    status_code: int
+    headers: Dict[str, str]
+    body: AsyncIterator[bytes]
+
+
+class _Prefix(NamedTuple):
+    """The start of a track held locally: a .part file or a head."""
+    fmt: str
+    content_type: str
+    total: int
+    size: int
+    part: Optional[CachedAudio]
+    head: Optional[AudioHead]
+
+
+def _content_range(response: httpx.Response) -> Optional[Tuple[int, int]]:
+    """(first byte, total length) of an upstream response, if known."""
+    if response.status_code == 200:
+        length = response.headers.get("content-length", "")
+        return (0, int(length)) if length.isdigit() else None
+    # "bytes <first>-<last>/<total>"
+    spec = response.headers.get("content-range", "").partition(" ")[2]
+    span, _, total = spec.partition("/")
+    first = span.partition("-")[0]
+    if not first.isdigit() or not total.isdigit():
+        return None
+    return int(first), int(total)
+
+
+def _reextract(video_id: str):
+    """Drop a cached track and extract it afresh (blocking; executor side)."""
+    extraction_manager.cache.invalidate(video_id)
+    return extraction_manager.extract(watch_url(video_id))
+
+
+async def resolve_stream_url(video_id: str, stale_url: Optional[str] = None) -> str:
+    """
+    Get a direct stream URL for a video.
+
+    Args:
+        video_id: Canonical video ID
+        stale_url: URL upstream just rejected; if the cache still holds
+            it, it is dropped and the track extracted afresh
+
+    Returns:
+        Direct audio stream URL
+
+    Raises:
+        ValueError: If extraction fails or yields no stream URL
+    """
+    url = watch_url(video_id)
+    result = await extraction_executor.run(extraction_manager.extract, url)
+    if (stale_url and result.success and result.track.audio_url == stale_url
+            and extraction_manager.cache is not None):
+        result = await extraction_executor.run(_reextract, video_id)
+    if not result.success:
+        raise ValueError(f"Extraction failed: {result.error}")
+    if not result.track.audio_url:
+        raise ValueError("Extraction returned no stream URL")
+    return result.track.audio_url
+
+
+class AudioRelay:
+    """Range-aware streaming proxy for direct audio URLs."""
+
+    # Client request headers forwarded upstream
+    REQUEST_HEADERS = ("Range", "If-Range")
+    # Upstream response headers returned to the client
+    RESPONSE_HEADERS = (
+        "content-type", "content-length", "content-range",
+        "accept-ranges", "last-modified", "etag"
+    )
+    # Statuses relayed as-is; anything else is an upstream error
+    RELAYED_STATUSES = (200, 206, 416)
+    # Statuses meaning the stream URL is no longer valid
+    STALE_STATUSES = (403, 410)
+
+    def __init__(
+        self,
+        resolve: Callable[[str, Optional[str]], Awaitable[str]],
+        chunk_size: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        cache: Optional[AudioCache] = None,
+        heads: Optional[HeadCache] = None
+    ):
+        """
+        Initialize relay. The HTTP client is created on first use.
+
+        Args:
+            resolve: Async (video_id, stale_url) -> direct stream URL
+            chunk_size: Bytes per relayed chunk
+            timeout: Upstream connect/read timeout in seconds
+            max_connections: Upstream connection pool size
+            transport: httpx transport override (tests)
+            cache: Audio cache to fill while relaying (None disables)
+            heads: Head cache for instant starts (None disables)
+        """
+        cfg = config.stream
+        self._resolve = resolve
+        self._chunk_size = cfg.chunk_size if chunk_size is None else chunk_size
+        self._timeout = cfg.timeout if timeout is None else timeout
+        self._max_connections = cfg.max_connections if max_connections is None else max_connections
+        self._transport = transport
+        self._cache = cache
+        self._heads = heads
+        self._client: Optional[httpx.AsyncClient] = None
+
+        self._requests = 0
+        self._reresolves = 0
+        self._upstream_errors = 0
+        self._active = 0
+        self._bytes = 0
+        self._prefix_starts = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared keep-alive client for upstream requests."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers={'User-Agent': 'Mozilla/5.0'},
+                timeout=self._timeout,
+                limits=httpx.Limits(
+                    max_connections=self._max_connections,
+                    max_keepalive_connections=self._max_connections
+                ),
+                follow_redirects=True,
+                transport=self._transport
+            )
+        return self._client
+
+    async def _send(self, url: str, headers: Dict[str, str]) -> httpx.Response:
+        request = self.client.build_request("GET", url, headers=headers)
+        try:
+            return await self.client.send(request, stream=True)
+        except httpx.HTTPError as e:
+            self._upstream_errors += 1
+            raise UpstreamError(f"Upstream request failed: {e}") from e
+
+    async def open(self, video_id: str, headers: Dict[str, str]) -> httpx.Response:
+        """
+        Resolve a video and open its upstream stream.
+
+        Args:
+            video_id: Canonical video ID
+            headers: Client request headers (only Range/If-Range are used)
+
+        Returns:
+            Streaming upstream response with a relayable status; pass it
+            to iter_body(), which closes it
+
+        Raises:
+            ValueError: If the video cannot be resolved
+            UpstreamError: If upstream fails or rejects the fresh URL too
+        """
+        self._requests += 1
+        forwarded = {name: headers[name] for name in self.REQUEST_HEADERS if headers.get(name)}
+
+        audio_url = await self._resolve(video_id, None)
+        response = await self._send(audio_url, forwarded)
+        if response.status_code in self.STALE_STATUSES:
+            await response.aclose()
+            self._reresolves += 1
+            audio_url = await self._resolve(video_id, audio_url)
+            response = await self._send(audio_url, forwarded)
+
+        if response.status_code not in self.RELAYED_STATUSES:
+            await response.aclose()
+            self._upstream_errors += 1
+            raise UpstreamError(f"Upstream returned HTTP {response.status_code}")
+        return response
+
+    def response_headers(self, response: httpx.Response) -> Dict[str, str]:
+        """Client headers for a relayed upstream response."""
+        headers = {
+            name: response.headers[name]
+            for name in self.RESPONSE_HEADERS if name in response.headers
+        }
+        headers.setdefault("accept-ranges", "bytes")
+        # Stream URLs change; the relay URL must not be cached as a whole
+        headers["cache-control"] = "no-store"
+        # Let nginx pass chunks through instead of buffering them
+        headers["x-accel-buffering"] = "no"
+        return headers
+
+    async def iter_body(self, response: httpx.Response) -> AsyncIterator[bytes]:
+        """Relay the upstream body chunk by chunk, then close it."""
+        self._active += 1
+        try:
+            async for chunk in response.aiter_raw(self._chunk_size):
+                self._bytes += len(chunk)
+                yield chunk
+        finally:
+            self._active -= 1
+            await response.aclose()
+
+    def _passthrough(self, response: httpx.Response) -> RelayedStream:
+        return RelayedStream(
+            response.status_code, self.response_headers(response), self.iter_body(response)
+        )
+
+    async def stream(self, video_id: str, headers: Dict[str, str]) -> RelayedStream:
+        """
+        Open a client response for a video, filling the local caches.
+
+        Without caches, or for requests that cannot use or extend a local
+        prefix (suffix/multi ranges, If-Range, a start past the prefix),
+        upstream is relayed as-is. If the start of the track is held
+        locally (a .part file or a pre-buffered head, whichever is
+        longer), the response starts at once: the prefix is sent while
+        the track is resolved and the bytes after it are fetched upstream,
+        then relayed and appended to the cache file. Otherwise upstream is
+        streamed from byte 0 and recorded in both caches.
+
+        Args:
+            video_id: Canonical video ID
+            headers: Client request headers (only Range/If-Range are used)
+
+        Returns:
+            RelayedStream for the client
+
+        Raises:
+            ValueError: If the video cannot be resolved (before any byte
+                is sent)
+            UpstreamError: If upstream fails (likewise)
+        """
+        range_header = headers.get("Range")
+        byte_range = parse_range(range_header) if range_header else (0, None)
+        local = self._cache is not None or self._heads is not None
+        if not local or byte_range is None or headers.get("If-Range"):
+            return self._passthrough(await self.open(video_id, headers))
+
+        start, end = byte_range
+        prefix = await self._prefix(video_id)
+        offset = prefix.size if prefix is not None else 0
+        if start > offset or (prefix is not None and start >= prefix.total):
+            return self._passthrough(await self.open(video_id, headers))
+        if prefix is None:
+            return await self._stream_from_start(video_id, headers, end)
+
+        self._prefix_starts += 1
+        last = prefix.total - 1 if end is None else min(end, prefix.total - 1)
+        upstream_range = None
+        if last >= offset:
+            upstream_range = f"bytes={offset}-{'' if end is None else end}"
+        return self._client_stream(
+            bool(range_header), prefix.content_type, start, last, prefix.total,
+            self._prefixed_body(video_id, prefix, start, min(last + 1, offset), upstream_range)
+        )
+
+    async def _prefix(self, video_id: str) -> Optional[_Prefix]:
+        """The longest locally held start of a track, if any."""
+        part = None
+        if self._cache is not None:
+            part = await self._cache.run(self._cache.partial, video_id)
+        head = self._heads.get(video_id) if self._heads is not None else None
+        if head is not None and (part is None or len(head.data) > part.size):
+            return _Prefix(head.fmt, head.content_type, head.total, len(head.data), None, head)
+        if part is not None:
+            return _Prefix(part.fmt, part.content_type, part.total, part.size, part, None)
+        return None
+
+    async def _stream_from_start(
+        self, video_id: str, headers: Dict[str, str], end: Optional[int]
+    ) -> RelayedStream:
+        """Relay from byte 0, recording the track in the audio and head caches."""
+        response = await self.open(video_id, {"Range": f"bytes=0-{'' if end is None else end}"})
+        span = _content_range(response)
+        if span is None or span[0] != 0:
+            await response.aclose()
+            return self._passthrough(await self.open(video_id, headers))
+
+        fmt = response.url.params.get("itag") or "audio"
+        content_type = response.headers.get("content-type", "application/octet-stream")
+        total = span[1]
+        fill = None
+        if self._cache is not None:
+            fill = await self._cache.run(
+                self._cache.start_fill, video_id, fmt, content_type, total
+            )
+        head = None
+        if self._heads is not None and not self._heads.contains(video_id):
+            head = AudioHead(fmt, content_type, total, b"")
+        last = total - 1 if end is None else min(end, total - 1)
+        return self._client_stream(
+            bool(headers.get("Range")), content_type, 0, last, total,
+            self._upstream_body(video_id, response, fill, head)
+        )
+
+    def _start_fill(self, video_id: str, prefix: _Prefix) -> Optional[AudioFill]:
+        """Continue a .part file, or start one with a head's bytes (blocking)."""
+        if self._cache is None:
+            return None
+        if prefix.part is not None:
+            return self._cache.start_fill(
+                video_id, prefix.fmt, prefix.content_type, prefix.total, prefix.size
+            )
+        fill = self._cache.start_fill(video_id, prefix.fmt, prefix.content_type, prefix.total)
+        if fill is not None:
+            fill.write(prefix.head.data)
+        return fill
+
+    def _client_stream(
+        self, ranged: bool, content_type: str, start: int, last: int, total: int,
+        body: AsyncIterator[bytes]
+    ) -> RelayedStream:
+        headers = {
+            "content-type": content_type,
+            "content-length": str(last - start + 1),
+            "accept-ranges": "bytes",
+            "cache-control": "no-store",
+            "x-accel-buffering": "no",
+        }
+        if ranged:
+            headers["content-range"] = f"bytes {start}-{last}/{total}"
+        return RelayedStream(206 if ranged else 200, headers, body)
+
+    async def _local_chunks(self, prefix: _Prefix, start: int, stop: int) -> AsyncIterator[bytes]:
+        """Prefix bytes [start, stop) from memory or disk."""
+        for position in range(start, stop, self._chunk_size):
+            length = min(self._chunk_size, stop - position)
+            if prefix.head is not None:
+                chunk = prefix.head.data[position:position + length]
+            else:
+                chunk = await self._cache.run(read_part, prefix.part.path, position, length)
+            if not chunk:
+                break
+            yield chunk
+
+    async def _upstream_body(
+        self,
+        video_id: str,
+        response: httpx.Response,
+        fill: Optional[AudioFill],
+        head: Optional[AudioHead]
+    ) -> AsyncIterator[bytes]:
+        """Relay upstream, teed to fill and (from byte 0) captured as the head."""
+        captured = bytearray() if head is not None else None
+        try:
+            async for chunk in self.iter_body(response):
+                if fill is not None:
+                    await self._cache.run(fill.write, chunk)
+                if captured is not None:
+                    captured += chunk[:self._heads.head_bytes - len(captured)]
+                    if len(captured) >= min(self._heads.head_bytes, head.total):
+                        self._heads.put(video_id, head._replace(data=bytes(captured)))
+                        captured = None
+                yield chunk
+        finally:
+            # A partial fill stays on disk and is resumed by a later request
+            if fill is not None:
+                await self._cache.run(fill.close)
+            await response.aclose()
+
+    async def _prefixed_body(
+        self,
+        video_id: str,
+        prefix: _Prefix,
+        start: int,
+        stop: int,
+        upstream_range: Optional[str]
+    ) -> AsyncIterator[bytes]:
+        """
+        Prefix bytes [start, stop), then upstream_range from upstream.
+
+        Resolving and connecting run while the prefix is sent. The status
+        and headers are already out by then, so if upstream fails or no
+        longer matches the prefix (format or length changed), the prefix
+        is dropped and the body ends short; the client retries.
+        """
+        opening = None
+        if upstream_range is not None:
+            opening = asyncio.ensure_future(self.open(video_id, {"Range": upstream_range}))
+        response = None
+        tail = None
+        try:
+            async for chunk in self._local_chunks(prefix, start, stop):
+                self._bytes += len(chunk)
+                yield chunk
+            if opening is None:
+                return
+            try:
+                response = await opening
+            except (ValueError, UpstreamError):
+                return
+            span = _content_range(response)
+            fmt = response.url.params.get("itag") or "audio"
+            if span != (prefix.size, prefix.total) or fmt != prefix.fmt:
+                self._upstream_errors += 1
+                if prefix.part is not None:
+                    await self._cache.run(self._cache.discard, prefix.part.key)
+                if self._heads is not None:
+                    self._heads.discard(video_id)
+                return
+            fill = None
+            if self._cache is not None:
+                fill = await self._cache.run(self._start_fill, video_id, prefix)
+            tail = self._upstream_body(video_id, response, fill, None)
+            async for chunk in tail:
+                yield chunk
+        finally:
+            if opening is not None and not opening.done():
+                opening.cancel()
+            elif (opening is not None and response is None and not opening.cancelled()
+                    and opening.exception() is None):
+                # Opened, but the client hung up during the prefix
+                await opening.result().aclose()
+            if tail is not None:
+                await tail.aclose()
+            if response is not None:
+                await response.aclose()
+
+    def stats(self) -> dict:
+        """Get relay counters."""
+        return {
+            "requests": self._requests,
+            "active": self._active,
+            "reresolves": self._reresolves,
+            "upstream_errors": self._upstream_errors,
+            "bytes_relayed": self._bytes,
+            "prefix_starts": self._prefix_starts,
+        }
+
+    async def aclose(self):
+        """Close upstream connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Global relay (None when disabled)
+audio_relay: Optional[AudioRelay] = (
+    AudioRelay(resolve_stream_url, cache=audio_cache, heads=head_cache)
+    if config.stream.enabled else None
+)
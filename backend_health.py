@@ -0,0 +1,199 @@
+"""
+Per-backend health tracking for ExtractionManager.
+
+Each extraction backend keeps an EWMA of its latency and error rate and a
+circuit breaker:
+
+- closed: calls go through; ``failure_threshold`` consecutive failures open it
+- open: calls are skipped for ``open_seconds``
+- half_open: after the cool-down a single probe call is let through; its
+  success closes the breaker, its failure re-opens it
+
+Backends are tried in order of expected time to a successful result
+(EWMA latency divided by EWMA success rate), so a blocked yt-dlp stops
+adding its timeout to every resolve.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Hashable, Iterable, List, Optional
+
+from config import config
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class _BackendState:
+    """Mutable health record for one backend."""
+    __slots__ = (
+        "latency", "error_rate", "samples", "consecutive_failures",
+        "state", "opened_at", "probing", "opens", "rejected"
+    )
+
+    def __init__(self):
+        self.latency = 0.0
+        self.error_rate = 0.0
+        self.samples = 0
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probing = False
+        self.opens = 0
+        self.rejected = 0
+
+
+class BackendHealth:
+    """EWMA latency/error tracking and circuit breakers keyed by backend."""
+
+    def __init__(
+        self,
+        alpha: Optional[float] = None,
+        failure_threshold: Optional[int] = None,
+        open_seconds: Optional[float] = None,
+        min_samples: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize tracker (unset arguments come from config.breaker).
+
+        Args:
+            alpha: EWMA smoothing factor (weight of the newest observation)
+            failure_threshold: Consecutive failures that open a breaker
+            open_seconds: Cool-down before a half-open probe is allowed
+            min_samples: Observations every backend needs before reordering
+            clock: Monotonic time source
+        """
+        cfg = config.breaker
+        self._alpha = cfg.ewma_alpha if alpha is None else alpha
+        self._failure_threshold = cfg.failure_threshold if failure_threshold is None else failure_threshold
+        self._open_seconds = cfg.open_seconds if open_seconds is None else open_seconds
+        self._min_samples = cfg.min_samples if min_samples is None else min_samples
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._backends: Dict[Hashable, _BackendState] = {}
+
+    def _state(self, backend: Hashable) -> _BackendState:
+        """Get or create the record for a backend (caller holds the lock)."""
+        state = self._backends.get(backend)
+        if state is None:
+            state = self._backends[backend] = _BackendState()
+        return state
+
+    def _cost(self, state: _BackendState) -> float:
+        """Expected seconds to a successful result."""
+        return state.latency / max(1.0 - state.error_rate, 0.05)
+
+    def order(self, backends: Iterable[Hashable],
+              prefer: Optional[Hashable] = None) -> List[Hashable]:
+        """
+        Order backends for the next extraction.
+
+        The given (static) order is kept until every backend has
+        ``min_samples`` observations; after that backends are sorted by
+        expected cost. Backends whose breaker is open go last, and a
+        preferred backend goes first.
+
+        Args:
+            backends: Backends in their static order
+            prefer: Optional backend to try first
+
+        Returns:
+            Backends in the order they should be tried
+        """
+        backends = list(backends)
+        with self._lock:
+            states = [self._state(backend) for backend in backends]
+            if all(state.samples >= self._min_samples for state in states):
+                costs = {backend: self._cost(state) for backend, state in zip(backends, states)}
+                backends.sort(key=costs.__getitem__)
+            # Stable sort: open breakers last, otherwise unchanged
+            backends.sort(key=lambda backend: self._backends[backend].state == OPEN)
+        if prefer in backends:
+            backends.remove(prefer)
+            backends.insert(0, prefer)
+        return backends
+
+    def allow(self, backend: Hashable) -> bool:
+        """
+        Ask the breaker whether a call may go to the backend now.
+
+        A True answer for an open breaker past its cool-down claims the
+        single half-open probe, so the caller must report the outcome with
+        ``record_success`` or ``record_failure``.
+        """
+        now = self._clock()
+        with self._lock:
+            state = self._state(backend)
+            if state.state == CLOSED:
+                return True
+            if state.state == OPEN and now - state.opened_at >= self._open_seconds:
+                state.state = HALF_OPEN
+            if state.state == HALF_OPEN and not state.probing:
+                state.probing = True
+                return True
+            state.rejected += 1
+            return False
+
+    def release(self, backend: Hashable):
+        """Give back a half-open probe claimed by ``allow`` but never made."""
+        with self._lock:
+            self._state(backend).probing = False
+
+    def is_open(self, backend: Hashable) -> bool:
+        """Whether calls to the backend are currently being skipped."""
+        with self._lock:
+            state = self._state(backend)
+            if state.state == OPEN:
+                return self._clock() - state.opened_at < self._open_seconds
+            return state.state == HALF_OPEN and state.probing
+
+    def _observe(self, state: _BackendState, latency: float, failed: bool):
+        if state.samples == 0:
+            state.latency = latency
+            state.error_rate = float(failed)
+        else:
+            state.latency += self._alpha * (latency - state.latency)
+            state.error_rate += self._alpha * (float(failed) - state.error_rate)
+        state.samples += 1
+
+    def record_success(self, backend: Hashable, latency: float):
+        """Record a successful call and close the breaker."""
+        with self._lock:
+            state = self._state(backend)
+            self._observe(state, latency, failed=False)
+            state.consecutive_failures = 0
+            state.state = CLOSED
+            state.probing = False
+
+    def record_failure(self, backend: Hashable, latency: float):
+        """Record a failed call; open the breaker if the threshold is hit."""
+        with self._lock:
+            state = self._state(backend)
+            self._observe(state, latency, failed=True)
+            state.consecutive_failures += 1
+            if state.state == HALF_OPEN or state.consecutive_failures >= self._failure_threshold:
+                if state.state != OPEN:
+                    state.opens += 1
+                state.state = OPEN
+                state.opened_at = self._clock()
+                state.probing = False
+
+    def stats(self) -> dict:
+        """Get per-backend latency, error rate and breaker state."""
+        with self._lock:
+            return {
+                str(getattr(backend, "value", backend)): {
+                    "state": state.state,
+                    "latency_ms": round(state.latency * 1000, 1),
+                    "error_rate": round(state.error_rate, 3),
+                    "samples": state.samples,
+                    "consecutive_failures": state.consecutive_failures,
+                    "opens": state.opens,
+                    "rejected": state.rejected,
+                }
+                for backend, state in self._backends.items()
+            }
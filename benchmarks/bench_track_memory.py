@@ -0,0 +1,245 @@
+"""
+Memory benchmark: yt-dlp info dicts vs the compact TrackInfo.
+
+Builds a synthetic info dict shaped like a real YouTube extraction (every
+format with its URL and headers, thumbnails, automatic captions in ~150
+languages, heatmap, tags) and measures with tracemalloc:
+
+- how much of it is released when it is projected with
+  ``ytdlp_track_fields`` instead of kept alive until the YoutubeDL block
+  exits;
+- the retained size per cached track for the old ``__dict__`` dataclass
+  and the slotted TrackInfo;
+- peak memory of ``--concurrency`` threads running the real
+  ``YTDLPCClient.resolve_track`` at once, against a stubbed YoutubeDL
+  whose ``extract_info`` returns that dict after all threads have one
+  (modelling overlapping network waits), compared with the
+  ``resolve_track`` body this change replaced.
+
+Usage:
+    python benchmarks/bench_track_memory.py [--records N] [--concurrency N]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import yt_dlp_client
+from track_info import BackendType, TrackInfo, ytdlp_track_fields
+from video_ids import watch_url
+
+
+@dataclass
+class LegacyTrackInfo:
+    """The record TrackInfo replaced (same fields, per-instance __dict__)."""
+    id: str
+    title: str
+    duration: int
+    audio_url: str
+    codec: str = "opus"
+    backend: BackendType = BackendType.YT_DLP
+    related: List[dict] = None
+    embed_url: str = None
+    invidious_url: str = None
+    expires_at: Optional[int] = None
+
+
+def fake_info(n: int) -> dict:
+    """A YouTube-sized info dict for video number n."""
+    video_id = f"{n:011d}"
+    base = f"https://rr3---sn-4g5e6nze.googlevideo.com/videoplayback?expire=1767225600&id={video_id}"
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'en-us,en;q=0.5',
+        'Sec-Fetch-Mode': 'navigate',
+    }
+    formats = [
+        {
+            'format_id': str(100 + i),
+            'format_note': f"{144 * (i % 8 + 1)}p",
+            'url': f"{base}&itag={100 + i}&sig=" + "A" * 900,
+            'ext': 'webm' if i % 2 else 'mp4',
+            'acodec': 'opus' if i % 3 == 0 else 'none',
+            'vcodec': 'vp9' if i % 3 else 'none',
+            'abr': 160.0, 'vbr': 1200.0, 'tbr': 1360.0, 'asr': 48000,
+            'filesize': 3_400_000 + i, 'fps': 30, 'width': 1920, 'height': 1080,
+            'quality': float(i), 'protocol': 'https', 'container': 'webm_dash',
+            'dynamic_range': 'SDR', 'has_drm': False, 'source_preference': -1,
+            'http_headers': dict(headers),
+            'downloader_options': {'http_chunk_size': 10485760},
+            'format': f"{100 + i} - 1920x1080 (1080p)",
+            'resolution': '1920x1080', 'aspect_ratio': 1.78,
+        }
+        for i in range(60)
+    ]
+    captions = {
+        f"lang{lang:03d}": [
+            {'ext': ext, 'url': f"https://www.youtube.com/api/timedtext?v={video_id}&lang={lang}&fmt={ext}&" + "x" * 300, 'name': f"Language {lang}"}
+            for ext in ('json3', 'srv1', 'srv2', 'srv3', 'ttml', 'vtt')
+        ]
+        for lang in range(150)
+    }
+    return {
+        'id': video_id,
+        'title': f"Track {n} (Official Audio)",
+        'duration': 213,
+        'url': formats[0]['url'],
+        'acodec': 'opus',
+        'formats': formats,
+        'requested_formats': [formats[0]],
+        'thumbnails': [
+            {'url': f"https://i.ytimg.com/vi/{video_id}/{i}.jpg", 'preference': -i, 'id': str(i), 'height': 90 * i, 'width': 160 * i}
+            for i in range(40)
+        ],
+        'automatic_captions': captions,
+        'subtitles': {},
+        'heatmap': [{'start_time': i * 2.1, 'end_time': i * 2.1 + 2.1, 'value': 0.5} for i in range(100)],
+        'description': "Lyrics and credits. " * 100,
+        'tags': [f"tag{i}" for i in range(30)],
+        'categories': ['Music'],
+        'related_videos': [
+            {'id': f"{n + i:011d}", 'title': f"Related {i}", 'duration': 180 + i}
+            for i in range(1, 21)
+        ],
+        'http_headers': headers,
+    }
+
+
+def measure(fn):
+    """(retained bytes, peak bytes) of calling fn(); its result is kept."""
+    gc.collect()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    result = fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, peak
+
+
+def build_records(cls, fields):
+    """Retained bytes per record for the same projected fields."""
+    gc.collect()
+    tracemalloc.start()
+    records = [cls(backend=BackendType.YT_DLP, **f) for f in fields]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return size / len(fields)
+
+
+class StubDownloadError(Exception):
+    pass
+
+
+def stub_youtube_dl(barrier):
+    """YoutubeDL stand-in: extract_info builds fake_info, then waits for
+    every other thread to hold its own (all extractions in flight)."""
+    class StubYoutubeDL:
+        def __init__(self, opts):
+            self.opts = opts
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def extract_info(self, url, download=False):
+            info = fake_info(int(url[-11:]))
+            barrier.wait()
+            return info
+
+    return StubYoutubeDL
+
+
+def baseline_resolve_track(client, url):
+    """resolve_track as it was before the projection (info dict held
+    until the record is built, related list copied by hand)."""
+    YoutubeDL = yt_dlp_client.YoutubeDL
+    with YoutubeDL(client.ydl_opts.copy()) as ydl:
+        info = ydl.extract_info(url, download=False)
+        if not info.get('id'):
+            raise ValueError("Incomplete track data: missing id")
+        if not info.get('url'):
+            raise ValueError("Incomplete track data: missing url")
+        related_videos = []
+        if info.get('related_videos'):
+            related_videos = [
+                {
+                    'id': v.get('id', ''),
+                    'title': v.get('title', 'Unknown'),
+                    'duration': v.get('duration') or 0
+                }
+                for v in info.get('related_videos', [])[:10]
+            ]
+        return TrackInfo(
+            id=info['id'],
+            title=info.get('title', 'Unknown Title'),
+            duration=info.get('duration', 0) or 0,
+            audio_url=info.get('url', ''),
+            related=related_videos
+        )
+
+
+def in_flight(count, resolve):
+    """Peak bytes of count threads each calling resolve(client, url)."""
+    client = yt_dlp_client.YTDLPCClient()
+    urls = [watch_url(f"{n:011d}") for n in range(count)]
+    barrier = threading.Barrier(count)
+    saved = {name: yt_dlp_client.__dict__.get(name) for name in ('YoutubeDL', 'DownloadError')}
+    yt_dlp_client.YoutubeDL = stub_youtube_dl(barrier)
+    yt_dlp_client.DownloadError = StubDownloadError
+    try:
+        with ThreadPoolExecutor(max_workers=count) as pool:
+            def run():
+                return list(pool.map(lambda url: resolve(client, url), urls))
+            return measure(run)
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                yt_dlp_client.__dict__.pop(name, None)
+            else:
+                setattr(yt_dlp_client, name, value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=10_000, help="cached tracks")
+    parser.add_argument("--concurrency", type=int, default=32, help="in-flight extractions")
+    args = parser.parse_args()
+
+    info_size, _ = measure(lambda: fake_info(0))
+    fields_size, _ = measure(lambda: ytdlp_track_fields(fake_info(0)))
+    print(f"info dict            {info_size / 1024:>9.1f} KB")
+    print(f"projected fields     {fields_size / 1024:>9.1f} KB  "
+          f"({info_size / fields_size:.0f}x smaller)")
+
+    # Distinct IDs, shared strings otherwise: only the record itself differs
+    template = ytdlp_track_fields(fake_info(0))
+    fields = [dict(template, id=f"{n:011d}") for n in range(args.records)]
+    legacy = build_records(LegacyTrackInfo, fields)
+    compact = build_records(TrackInfo, fields)
+    print(f"record, __dict__     {legacy:>9.0f} B")
+    print(f"record, slotted      {compact:>9.0f} B  "
+          f"({(1 - compact / legacy) * 100:.0f}% less, "
+          f"{(legacy - compact) * args.records / 1024:.0f} KB per {args.records} tracks)")
+
+    _, before_peak = in_flight(args.concurrency, baseline_resolve_track)
+    _, after_peak = in_flight(args.concurrency, yt_dlp_client.YTDLPCClient.resolve_track)
+    print(f"{args.concurrency} resolve_track, before {before_peak / 1024 / 1024:>7.1f} MB peak")
+    print(f"{args.concurrency} resolve_track, after  {after_peak / 1024 / 1024:>7.1f} MB peak  "
+          f"({(after_peak / before_peak - 1) * 100:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Microbenchmark: video ID parsing.
+
+Compares the canonical precompiled parser (video_ids.parse_video_id) with
+the per-module pattern lists it replaced, which looped over uncompiled
+``re.search`` calls and re-imported ``re`` on every call.
+
+Usage:
+    python benchmarks/bench_video_ids.py [--number N]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from video_ids import parse_video_id
+
+
+# Common inputs, roughly in order of how often the frontend sends them
+CASES = {
+    "watch": "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "watch+params": "https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL123&t=30s",
+    "youtu.be": "https://youtu.be/dQw4w9WgXcQ?si=share",
+    "shorts": "https://youtube.com/shorts/dQw4w9WgXcQ",
+    "embed": "https://www.youtube.com/embed/dQw4w9WgXcQ",
+    "music": "https://music.youtube.com/watch?v=dQw4w9WgXcQ",
+    "bare id": "dQw4w9WgXcQ",
+    "invalid": "https://www.google.com/search?q=music",
+}
+
+
+def legacy_parse(url):
+    """The removed YTDLPExtractionBackend._extract_video_id."""
+    import re
+
+    patterns = [
+        r'(?:https?://)?(?:www\.)?youtube\.com/watch\?v=([a-zA-Z0-9_-]{11})',
+        r'(?:https?://)?youtu\.be/([a-zA-Z0-9_-]{11})',
+        r'(?:https?://)?(?:www\.)?youtube\.com/shorts/([a-zA-Z0-9_-]{11})',
+    ]
+
+    for pattern in patterns:
+        match = re.search(pattern, url)
+        if match:
+            return match.group(1)
+    return None
+
+
+def bench(fn, value, number):
+    """Nanoseconds per call (best of 5 runs)."""
+    best = min(timeit.repeat(lambda: fn(value), number=number, repeat=5))
+    return best / number * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=100_000, help="calls per run")
+    args = parser.parse_args()
+
+    print(f"{'input':<14} {'legacy ns':>10} {'canonical ns':>13} {'speedup':>8}  result")
+    for name, value in CASES.items():
+        legacy = bench(legacy_parse, value, args.number)
+        canonical = bench(parse_video_id, value, args.number)
+        print(
+            f"{name:<14} {legacy:>10.0f} {canonical:>13.0f} "
+            f"{legacy / canonical:>7.1f}x  {parse_video_id(value)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
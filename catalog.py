@@ -0,0 +1,339 @@
+"""
+Local full-text track catalog.
+
+Every track resolved and every search entry returned is upserted into a
+SQLite table with an FTS5 index over titles, so searches for tracks this
+server has already seen can be answered locally in milliseconds
+(``/api/search?source=local``) instead of going to YouTube.
+
+Writes never block a request: they are queued and a single writer thread
+applies them in batched transactions. Rows carry play and seen counters
+that boost ranking; past ``max_entries`` the least recently updated rows
+are pruned.
+
+Reads (``search``, ``stats``) block on SQLite, so async callers run them
+on the extraction executor. Each reading thread has its own read-only
+connection; in WAL mode they never wait for the writer or its lock. An
+in-memory database (tests) is private to one connection, so there reads
+share the writer's connection and lock.
+"""
+
+import os
+import pathlib
+import queue
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, List, Optional
+
+from config import config
+
+
+_TOKEN = re.compile(r"\w+")
+
+
+def fts_query(query: str) -> Optional[str]:
+    """
+    Build an FTS5 MATCH expression: every word, as a prefix, must match.
+
+    Args:
+        query: Raw user query
+
+    Returns:
+        MATCH expression, or None if the query has no words
+    """
+    words = _TOKEN.findall(query.casefold())
+    if not words:
+        return None
+    # Quoting keeps FTS5 operators (AND, NEAR, ...) in user input literal
+    return " ".join(f'"{word}"*' for word in words)
+
+
+class TrackCatalog:
+    """SQLite FTS5 catalog of seen tracks with a background writer."""
+
+    # Prune overflow rows every N applied writes
+    PRUNE_EVERY = 500
+    # Rows per writer transaction
+    BATCH_SIZE = 200
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        max_entries: Optional[int] = None,
+        max_queue: int = 10000,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize catalog. The SQLite file is opened on first use.
+
+        Args:
+            db_path: SQLite file (":memory:" for tests)
+            max_entries: Maximum catalogued tracks
+            max_queue: Pending writes before new ones are dropped
+            clock: Wall-clock time source (row timestamps)
+        """
+        cfg = config.catalog
+        self._db_path = cfg.db_path if db_path is None else db_path
+        self._max_entries = cfg.max_entries if max_entries is None else max_entries
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        # Read-only connections, one per reading thread
+        self._readers = threading.local()
+        self._reader_conns: List[sqlite3.Connection] = []
+        self._counter_lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._writer: Optional[threading.Thread] = None
+        self._writes = 0
+        self._dropped = 0
+        self._pruned = 0
+        self._local_hits = 0
+        self._local_misses = 0
+
+    # ---------- SQLite ----------
+
+    def _db(self) -> sqlite3.Connection:
+        """Open the database lazily (caller holds the lock)."""
+        if self._conn is None:
+            directory = os.path.dirname(self._db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self._db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS tracks ("
+                " video_id TEXT PRIMARY KEY,"
+                " title TEXT NOT NULL,"
+                " duration INTEGER NOT NULL DEFAULT 0,"
+                " thumbnail TEXT NOT NULL DEFAULT '',"
+                " plays INTEGER NOT NULL DEFAULT 0,"
+                " seen INTEGER NOT NULL DEFAULT 0,"
+                " updated_at REAL NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS tracks_updated ON tracks(updated_at);"
+                "CREATE VIRTUAL TABLE IF NOT EXISTS tracks_fts USING fts5("
+                " title, content='tracks', content_rowid='rowid',"
+                " tokenize='unicode61 remove_diacritics 2');"
+                # Keep the external-content index in sync with the table
+                "CREATE TRIGGER IF NOT EXISTS tracks_ai AFTER INSERT ON tracks BEGIN"
+                " INSERT INTO tracks_fts(rowid, title) VALUES (new.rowid, new.title);"
+                " END;"
+                "CREATE TRIGGER IF NOT EXISTS tracks_ad AFTER DELETE ON tracks BEGIN"
+                " INSERT INTO tracks_fts(tracks_fts, rowid, title)"
+                " VALUES ('delete', old.rowid, old.title);"
+                " END;"
+                "CREATE TRIGGER IF NOT EXISTS tracks_au AFTER UPDATE OF title ON tracks BEGIN"
+                " INSERT INTO tracks_fts(tracks_fts, rowid, title)"
+                " VALUES ('delete', old.rowid, old.title);"
+                " INSERT INTO tracks_fts(rowid, title) VALUES (new.rowid, new.title);"
+                " END;"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _reader(self) -> Optional[sqlite3.Connection]:
+        """This thread's read-only connection (None for in-memory databases)."""
+        if self._db_path == ":memory:":
+            return None
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            if self._conn is None:
+                # The writer connection creates the file and schema
+                with self._lock:
+                    self._db()
+            uri = pathlib.Path(self._db_path).absolute().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            self._readers.conn = conn
+            with self._counter_lock:
+                self._reader_conns.append(conn)
+        return conn
+
+    def _read(self, sql: str, params: tuple = ()) -> list:
+        """Run a read query without waiting for the writer when possible."""
+        conn = self._reader()
+        if conn is not None:
+            return conn.execute(sql, params).fetchall()
+        with self._lock:
+            return self._db().execute(sql, params).fetchall()
+
+    # ---------- Writes (queued) ----------
+
+    def _enqueue(self, row: tuple):
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._counter_lock:
+                self._dropped += 1
+
+    def add_track(self, track, played: bool = False):
+        """
+        Queue an upsert of a resolved track.
+
+        Args:
+            track: TrackInfo (id, title, duration)
+            played: Count this as a play (interactive resolve)
+        """
+        if not track.id or not track.title:
+            return
+        self._enqueue((
+            track.id, track.title, int(track.duration or 0), '', int(played)
+        ))
+
+    def add_results(self, results: List[dict]):
+        """Queue upserts of search or playlist entries."""
+        for item in results:
+            if item.get('id') and item.get('title'):
+                self._enqueue((
+                    item['id'], item['title'], int(item.get('duration') or 0),
+                    item.get('thumbnail') or '', 0
+                ))
+
+    def _ensure_writer(self):
+        if self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._run_writer, name="catalog-writer", daemon=True
+                )
+                self._writer.start()
+
+    def _run_writer(self):
+        while True:
+            row = self._queue.get()
+            if row is None:
+                self._queue.task_done()
+                return
+            batch = [row]
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    row = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if row is None:
+                    # Put the stop marker back for the outer loop
+                    self._queue.task_done()
+                    self._queue.put(None)
+                    break
+                batch.append(row)
+            try:
+                self._apply(batch)
+            except sqlite3.Error:
+                with self._counter_lock:
+                    self._dropped += len(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _apply(self, batch: List[tuple]):
+        now = self._clock()
+        with self._lock:
+            db = self._db()
+            with db:
+                db.executemany(
+                    "INSERT INTO tracks"
+                    " (video_id, title, duration, thumbnail, plays, seen, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, 1, ?)"
+                    " ON CONFLICT(video_id) DO UPDATE SET"
+                    "  title = excluded.title,"
+                    "  duration = MAX(excluded.duration, tracks.duration),"
+                    "  thumbnail = CASE WHEN excluded.thumbnail != ''"
+                    "   THEN excluded.thumbnail ELSE tracks.thumbnail END,"
+                    "  plays = tracks.plays + excluded.plays,"
+                    "  seen = tracks.seen + 1,"
+                    "  updated_at = excluded.updated_at",
+                    [row + (now,) for row in batch]
+                )
+            previous = self._writes
+            self._writes += len(batch)
+            if self._writes // self.PRUNE_EVERY != previous // self.PRUNE_EVERY:
+                self._prune(db)
+
+    def _prune(self, db: sqlite3.Connection):
+        """Drop the least recently updated rows beyond max_entries."""
+        with db:
+            self._pruned += db.execute(
+                "DELETE FROM tracks WHERE video_id IN ("
+                " SELECT video_id FROM tracks ORDER BY updated_at DESC"
+                " LIMIT -1 OFFSET ?)",
+                (self._max_entries,)
+            ).rowcount
+
+    def flush(self):
+        """Block until every queued write has been applied."""
+        self._queue.join()
+
+    # ---------- Reads ----------
+
+    def search(self, query: str, limit: int = 20) -> List[dict]:
+        """
+        Full-text search of catalogued tracks (blocking).
+
+        Args:
+            query: Raw user query (every word must prefix-match the title)
+            limit: Maximum number of results
+
+        Returns:
+            Search result dicts (id, title, duration, thumbnail), best
+            match first with frequently played tracks boosted
+        """
+        match = fts_query(query)
+        if match is None:
+            return []
+        rows = self._read(
+            "SELECT t.video_id, t.title, t.duration, t.thumbnail"
+            " FROM tracks_fts JOIN tracks t ON t.rowid = tracks_fts.rowid"
+            " WHERE tracks_fts MATCH ?"
+            # bm25 is negative (lower is better); plays push it lower
+            " ORDER BY bm25(tracks_fts) * (1.0 + 0.1 * MIN(t.plays, 10))"
+            " LIMIT ?",
+            (match, limit)
+        )
+        with self._counter_lock:
+            if rows:
+                self._local_hits += 1
+            else:
+                self._local_misses += 1
+        return [
+            {'id': row[0], 'title': row[1], 'duration': row[2], 'thumbnail': row[3]}
+            for row in rows
+        ]
+
+    def stats(self) -> dict:
+        """Get catalog size and write/lookup counters (blocking)."""
+        entries = self._read("SELECT COUNT(*) FROM tracks")[0][0]
+        with self._counter_lock:
+            return {
+                "entries": entries,
+                "capacity": self._max_entries,
+                "pending_writes": self._queue.qsize(),
+                "writes": self._writes,
+                "dropped_writes": self._dropped,
+                "pruned": self._pruned,
+                "local_hits": self._local_hits,
+                "local_misses": self._local_misses,
+            }
+
+    def close(self):
+        """Apply pending writes, stop the writer and close the database."""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join(timeout=5)
+            self._writer = None
+        with self._counter_lock:
+            for conn in self._reader_conns:
+                conn.close()
+            self._reader_conns = []
+            self._readers = threading.local()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Global catalog (None when disabled)
+catalog: Optional[TrackCatalog] = TrackCatalog() if config.catalog.enabled else None
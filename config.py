@@ -3,7 +3,7 @@ Configuration management for NextSoundWave.
 """
 
 import os
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 
 
@@ -12,6 +12,12 @@ class ServerConfig(BaseModel):
     host: str = "0.0.0.0"
     port: int = 8000
     debug: bool = False
+    # POST /api/resolve/batch limits
+    batch_max_items: int = 50
+    batch_concurrency: int = 8
+    # GET /api/playlist: entries per streamed page and overall cap
+    playlist_page_size: int = 50
+    playlist_max_entries: int = 5000
 
 
 class YTDLPCConfig(BaseModel):
@@ -20,12 +26,184 @@ class YTDLPCConfig(BaseModel):
     format: str = "bestaudio[acodec=opus]/bestaudio[ext=webm]/bestaudio"
     timeout: int = 30
     max_concurrent_extracts: int = 50
+    # "thread" runs yt-dlp in the extraction executor's threads;
+    # "process" hands it to a pool of warm worker processes
+    worker_mode: str = "thread"
+    process_workers: int = os.cpu_count() or 2
+    worker_max_jobs: int = 200
+    worker_max_rss_mb: int = 512
+    # Warm yt-dlp in the background at startup (import, extractors, workers)
+    prewarm: bool = True
+    # Also run one extraction of health.probe_video to cache the player JS
+    prewarm_player: bool = True
+
+
+class CacheConfig(BaseModel):
+    """Track metadata cache configuration."""
+    enabled: bool = True
+    memory_entries: int = 1000
+    # Title, duration, related, embed URLs (planning doc: 5-minute TTL)
+    metadata_ttl: int = 300
+    # Direct audio_url from yt-dlp/Invidious when it has no expire= parameter
+    stream_ttl: int = 180
+    # Treat a URL with expire= as stale this many seconds early
+    stream_expiry_margin: int = 60
+    # Refresh-ahead: entries hit this often are re-extracted in the
+    # background shortly before they expire (XFetch-style randomized)
+    refresh_min_hits: int = 3
+    refresh_min_lead: float = 10.0
+    refresh_beta: float = 1.0
+    refresh_workers: int = 2
+    # SQLite file for the persistent tier ("" disables it)
+    db_path: str = "data/track_cache.db"
+    disk_entries: int = 50000
+
+
+class HedgeConfig(BaseModel):
+    """Hedged extraction configuration."""
+    # Launch the fallback in parallel when the primary is slower than usual
+    enabled: bool = False
+    # Hedge after this percentile of recent primary latencies...
+    percentile: float = 0.95
+    # ...clamped to [min_delay, max_delay] seconds
+    min_delay: float = 1.0
+    max_delay: float = 10.0
+    # Delay used until min_samples primary latencies have been observed
+    initial_delay: float = 4.0
+    min_samples: int = 20
+    window: int = 200
+
+
+class BreakerConfig(BaseModel):
+    """Backend health tracking / circuit breaker configuration."""
+    # Weight of the newest observation in the latency/error EWMAs
+    ewma_alpha: float = 0.3
+    # Consecutive failures that open a backend's circuit breaker
+    failure_threshold: int = 3
+    # Seconds an open breaker waits before letting a probe through
+    open_seconds: float = 30.0
+    # Observations per backend before they are reordered by latency
+    min_samples: int = 5
+
+
+class InvidiousConfig(BaseModel):
+    """Invidious instance pool configuration."""
+    # Public instances, no auth, ad-free
+    instances: List[str] = [
+        "https://yewtu.be",
+        "https://invidious.snopyta.org",
+        "https://invidious.kavin.rocks",
+        "https://invidious.jingl.xyz",
+    ]
+    # Background health probe period and per-probe timeout (seconds)
+    probe_interval: float = 60.0
+    probe_timeout: float = 5.0
+    # Shared keep-alive HTTP client for probes and video requests
+    request_timeout: float = 10.0
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    # Weight of the newest sample in instance latency/success averages
+    ewma_alpha: float = 0.3
+
+
+class HealthConfig(BaseModel):
+    """Background health check configuration."""
+    # Seconds between deep backend checks (served from a cached snapshot)
+    interval: float = 30.0
+    # Video used for the deep yt-dlp metadata probe ("" skips the probe)
+    probe_video: str = "jNQXAC9IVRw"
+
+
+class PrefetchConfig(BaseModel):
+    """Related-track prefetch configuration."""
+    enabled: bool = True
+    # Related tracks resolved ahead after each interactive resolve
+    top_k: int = 3
+    # Background threads (never the interactive extraction executor)
+    workers: int = 1
+    max_pending: int = 30
+    # Prefetch extractions allowed per minute (token bucket)
+    budget_per_minute: int = 30
+    # Skip prefetching while the interactive executor is this busy
+    # ((running + queued) / max_workers)
+    max_interactive_load: float = 0.5
+
+
+class SearchConfig(BaseModel):
+    """Search result cache configuration."""
+    cache_enabled: bool = True
+    cache_entries: int = 500
+    # Seconds a query's results stay cached
+    cache_ttl: int = 600
+    # Upstream results fetched per query; smaller limits are served from it
+    fetch_limit: int = 20
+    # GET /api/suggest prefix index bounds
+    suggest_max_terms: int = 20000
+    suggest_scan_limit: int = 2000
+
+
+class CatalogConfig(BaseModel):
+    """Local full-text track catalog configuration."""
+    enabled: bool = True
+    db_path: str = "data/catalog.db"
+    max_entries: int = 200000
+
+
+class StreamConfig(BaseModel):
+    """GET /api/stream audio relay configuration."""
+    enabled: bool = True
+    chunk_size: int = 64 * 1024
+    # Upstream connect/read timeout (seconds)
+    timeout: float = 30.0
+    max_connections: int = 50
+
+
+class AudioCacheConfig(BaseModel):
+    """On-disk cache of relayed audio files."""
+    enabled: bool = True
+    directory: str = "data/audio_cache"
+    max_mb: int = 2048
+    # Eviction credit per play, in seconds of recency (capped at 10 plays)
+    play_bonus: float = 3600.0
+
+
+class PrebufferConfig(BaseModel):
+    """In-memory heads of hot and prefetched tracks, for instant starts."""
+    enabled: bool = True
+    # ~30 s of Opus at 128-160 kbps
+    head_kb: int = 512
+    max_mb: int = 64
 
 
 class Config(BaseModel):
     """Application configuration."""
     server: ServerConfig = ServerConfig()
     ytdlp: YTDLPCConfig = YTDLPCConfig()
+    cache: CacheConfig = CacheConfig()
+    hedge: HedgeConfig = HedgeConfig()
+    breaker: BreakerConfig = BreakerConfig()
+    invidious: InvidiousConfig = InvidiousConfig()
+    health: HealthConfig = HealthConfig()
+    prefetch: PrefetchConfig = PrefetchConfig()
+    search: SearchConfig = SearchConfig()
+    catalog: CatalogConfig = CatalogConfig()
+    stream: StreamConfig = StreamConfig()
+    audio_cache: AudioCacheConfig = AudioCacheConfig()
+    prebuffer: PrebufferConfig = PrebufferConfig()
+
+
+def _invidious_config() -> InvidiousConfig:
+    """Invidious settings; INVIDIOUS_INSTANCES is a comma-separated URL list."""
+    options = dict(
+        probe_interval=float(os.getenv("INVIDIOUS_PROBE_INTERVAL", "60")),
+        probe_timeout=float(os.getenv("INVIDIOUS_PROBE_TIMEOUT", "5")),
+        request_timeout=float(os.getenv("INVIDIOUS_TIMEOUT", "10")),
+        max_connections=int(os.getenv("INVIDIOUS_MAX_CONNECTIONS", "20"))
+    )
+    instances = os.getenv("INVIDIOUS_INSTANCES")
+    if instances:
+        options["instances"] = [i.strip().rstrip("/") for i in instances.split(",") if i.strip()]
+    return InvidiousConfig(**options)
 
 
 def load_config() -> Config:
@@ -34,12 +212,89 @@ def load_config() -> Config:
         server=ServerConfig(
             host=os.getenv("SERVER_HOST", "0.0.0.0"),
             port=int(os.getenv("SERVER_PORT", "8000")),
-            debug=os.getenv("DEBUG", "false").lower() == "true"
+            debug=os.getenv("DEBUG", "false").lower() == "true",
+            batch_max_items=int(os.getenv("BATCH_MAX_ITEMS", "50")),
+            batch_concurrency=int(os.getenv("BATCH_CONCURRENCY", "8")),
+            playlist_page_size=int(os.getenv("PLAYLIST_PAGE_SIZE", "50")),
+            playlist_max_entries=int(os.getenv("PLAYLIST_MAX_ENTRIES", "5000"))
         ),
         ytdlp=YTDLPCConfig(
             format=os.getenv("YTDLP_FORMAT", "bestaudio[ext=m4a]/best"),
             timeout=int(os.getenv("YTDLP_TIMEOUT", "30")),
-            max_concurrent_extracts=int(os.getenv("YTDLP_MAX_CONCURRENT", "50"))
+            max_concurrent_extracts=int(os.getenv("YTDLP_MAX_CONCURRENT", "50")),
+            worker_mode=os.getenv("YTDLP_WORKER_MODE", "thread").lower(),
+            process_workers=int(os.getenv("YTDLP_PROCESS_WORKERS", str(os.cpu_count() or 2))),
+            worker_max_jobs=int(os.getenv("YTDLP_WORKER_MAX_JOBS", "200")),
+            worker_max_rss_mb=int(os.getenv("YTDLP_WORKER_MAX_RSS_MB", "512")),
+            prewarm=os.getenv("YTDLP_PREWARM", "true").lower() == "true",
+            prewarm_player=os.getenv("YTDLP_PREWARM_PLAYER", "true").lower() == "true"
+        ),
+        cache=CacheConfig(
+            enabled=os.getenv("CACHE_ENABLED", "true").lower() == "true",
+            memory_entries=int(os.getenv("CACHE_MEMORY_ENTRIES", "1000")),
+            metadata_ttl=int(os.getenv("CACHE_METADATA_TTL", "300")),
+            stream_ttl=int(os.getenv("CACHE_STREAM_TTL", "180")),
+            stream_expiry_margin=int(os.getenv("CACHE_STREAM_EXPIRY_MARGIN", "60")),
+            refresh_min_hits=int(os.getenv("CACHE_REFRESH_MIN_HITS", "3")),
+            refresh_min_lead=float(os.getenv("CACHE_REFRESH_MIN_LEAD", "10")),
+            refresh_beta=float(os.getenv("CACHE_REFRESH_BETA", "1.0")),
+            refresh_workers=int(os.getenv("CACHE_REFRESH_WORKERS", "2")),
+            db_path=os.getenv("CACHE_DB_PATH", "data/track_cache.db"),
+            disk_entries=int(os.getenv("CACHE_DISK_ENTRIES", "50000"))
+        ),
+        hedge=HedgeConfig(
+            enabled=os.getenv("HEDGE_ENABLED", "false").lower() == "true",
+            percentile=float(os.getenv("HEDGE_PERCENTILE", "0.95")),
+            min_delay=float(os.getenv("HEDGE_MIN_DELAY", "1.0")),
+            max_delay=float(os.getenv("HEDGE_MAX_DELAY", "10.0")),
+            initial_delay=float(os.getenv("HEDGE_INITIAL_DELAY", "4.0"))
+        ),
+        breaker=BreakerConfig(
+            ewma_alpha=float(os.getenv("BACKEND_EWMA_ALPHA", "0.3")),
+            failure_threshold=int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3")),
+            open_seconds=float(os.getenv("BREAKER_OPEN_SECONDS", "30")),
+            min_samples=int(os.getenv("BACKEND_MIN_SAMPLES", "5"))
+        ),
+        invidious=_invidious_config(),
+        health=HealthConfig(
+            interval=float(os.getenv("HEALTH_CHECK_INTERVAL", "30")),
+            probe_video=os.getenv("HEALTH_PROBE_VIDEO", "jNQXAC9IVRw")
+        ),
+        prefetch=PrefetchConfig(
+            enabled=os.getenv("PREFETCH_ENABLED", "true").lower() == "true",
+            top_k=int(os.getenv("PREFETCH_TOP_K", "3")),
+            workers=int(os.getenv("PREFETCH_WORKERS", "1")),
+            budget_per_minute=int(os.getenv("PREFETCH_BUDGET_PER_MINUTE", "30")),
+            max_interactive_load=float(os.getenv("PREFETCH_MAX_INTERACTIVE_LOAD", "0.5"))
+        ),
+        search=SearchConfig(
+            cache_enabled=os.getenv("SEARCH_CACHE_ENABLED", "true").lower() == "true",
+            cache_entries=int(os.getenv("SEARCH_CACHE_ENTRIES", "500")),
+            cache_ttl=int(os.getenv("SEARCH_CACHE_TTL", "600")),
+            fetch_limit=int(os.getenv("SEARCH_FETCH_LIMIT", "20")),
+            suggest_max_terms=int(os.getenv("SUGGEST_MAX_TERMS", "20000"))
+        ),
+        catalog=CatalogConfig(
+            enabled=os.getenv("CATALOG_ENABLED", "true").lower() == "true",
+            db_path=os.getenv("CATALOG_DB_PATH", "data/catalog.db"),
+            max_entries=int(os.getenv("CATALOG_MAX_ENTRIES", "200000"))
+        ),
+        stream=StreamConfig(
+            enabled=os.getenv("STREAM_RELAY_ENABLED", "true").lower() == "true",
+            chunk_size=int(os.getenv("STREAM_CHUNK_SIZE", str(64 * 1024))),
+            timeout=float(os.getenv("STREAM_TIMEOUT", "30")),
+            max_connections=int(os.getenv("STREAM_MAX_CONNECTIONS", "50"))
+        ),
+        audio_cache=AudioCacheConfig(
+            enabled=os.getenv("AUDIO_CACHE_ENABLED", "true").lower() == "true",
+            directory=os.getenv("AUDIO_CACHE_DIR", "data/audio_cache"),
+            max_mb=int(os.getenv("AUDIO_CACHE_MAX_MB", "2048")),
+            play_bonus=float(os.getenv("AUDIO_CACHE_PLAY_BONUS", "3600"))
+        ),
+        prebuffer=PrebufferConfig(
+            enabled=os.getenv("PREBUFFER_ENABLED", "true").lower() == "true",
+            head_kb=int(os.getenv("PREBUFFER_HEAD_KB", "512")),
+            max_mb=int(os.getenv("PREBUFFER_MAX_MB", "64"))
         )
     )
 
@@ -6,34 +6,29 @@ Strategy:
 - Client (Browser): YouTube Embed with AdBlock → Invidious (last resort)
 """
 
+import importlib.util
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    TimeoutError as FutureTimeoutError,
+    wait,
+)
 from dataclasses import dataclass
 from typing import List, Optional
-from enum import Enum
 
+import httpx
 
-class BackendType(Enum):
-    """Extraction backend types."""
-    YT_DLP = "yt-dlp"
-    INVIDIOUS = "invidious"
-
-
-@dataclass
-class TrackInfo:
-    """Represents track metadata and streaming info."""
-    id: str
-    title: str
-    duration: int
-    audio_url: str  # Direct stream URL (from yt-dlp)
-    codec: str = "opus"
-    backend: BackendType = BackendType.YT_DLP
-    related: List[dict] = None
-    embed_url: str = None  # Client: YouTube Embed URL (with AdBlock)
-    invidious_url: str = None  # Client: Invidious Embed URL (last resort)
-    
-    def __post_init__(self):
-        if self.related is None:
-            self.related = []
+from config import config
+from backend_health import BackendHealth
+from extraction_workers import ExtractionWorkerPool
+from hedging import HedgePolicy
+from invidious_pool import InvidiousInstancePool, invidious_pool
+from singleflight import SingleFlight
+from track_cache import TrackCache, track_cache
+from track_info import BackendType, TrackInfo, parse_stream_expiry, ytdlp_track_fields
+from video_ids import parse_video_id, watch_url
 
 
 @dataclass  
@@ -62,6 +57,19 @@ class ExtractionBackend(ABC):
     def get_name(self) -> str:
         """Get backend name for logging."""
         pass
+    
+    def extract_metadata(self, url: str) -> TrackInfo:
+        """
+        Extract title/duration/embed URLs as cheaply as the backend allows.
+        
+        The returned track may have an empty audio_url. Backends without a
+        cheaper path fall back to a full extraction.
+        """
+        return self.extract(url)
+    
+    def _extract_video_id(self, url: str) -> Optional[str]:
+        """Extract video ID from URL."""
+        return parse_video_id(url)
 
 
 class YTDLPExtractionBackend(ExtractionBackend):
@@ -75,8 +83,7 @@ class YTDLPExtractionBackend(ExtractionBackend):
     Returns embed URLs for client-side playback.
     """
     
-    def __init__(self):
-        from yt_dlp import YoutubeDL
+    def __init__(self, worker_pool: Optional[ExtractionWorkerPool] = None):
         from config import config
         
         self.ydl_opts = {
@@ -87,6 +94,15 @@ class YTDLPExtractionBackend(ExtractionBackend):
             'socket_timeout': config.ytdlp.timeout,
         }
         self._name = "yt-dlp (server)"
+        
+        # Optional process pool of warm YoutubeDL workers
+        if worker_pool is None and config.ytdlp.worker_mode == "process":
+            worker_pool = ExtractionWorkerPool(self.ydl_opts)
+        self._worker_pool = worker_pool
+    
+    @property
+    def worker_pool(self) -> Optional[ExtractionWorkerPool]:
+        return self._worker_pool
     
     def extract(self, url: str) -> TrackInfo:
         """Extract using yt-dlp (server-side).
@@ -101,74 +117,66 @@ class YTDLPExtractionBackend(ExtractionBackend):
         if not video_id:
             raise ValueError(f"Invalid YouTube URL: {url}")
         
+        if self._worker_pool is not None:
+            fields = self._worker_pool.extract(url)
+            return TrackInfo(backend=BackendType.YT_DLP, **fields)
+        
         try:
             with YoutubeDL(self.ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                
-                # Extract related videos (best-effort)
-                related = []
-                if info.get('related_videos'):
-                    related = [
-                        {
-                            'id': v.get('id', ''),
-                            'title': v.get('title', 'Unknown'),
-                            'duration': v.get('duration') or 0
-                        }
-                        for v in info.get('related_videos', [])[:10]
-                    ]
-                
-                # Build YouTube embed URL (primary)
-                youtube_embed = f"https://www.youtube.com/embed/{info['id']}"
-                
-                # Build Invidious embed URL (fallback)
-                invidious_embed = f"https://yewtu.be/embed/{info['id']}"
-                
-                # Determine codec
-                codec = info.get('acodec', 'opus')
-                if not codec or codec == 'none':
-                    codec = 'opus'
-                
-                return TrackInfo(
-                    id=info['id'],
-                    title=info.get('title', 'Unknown Title'),
-                    duration=info.get('duration', 0) or 0,
-                    audio_url=info.get('url', ''),
-                    codec=codec,
-                    backend=BackendType.YT_DLP,
-                    related=related,
-                    embed_url=youtube_embed,
-                    invidious_url=invidious_embed
-                )
-                
+                # Project at once: the full info dict is never bound to a name
+                fields = ytdlp_track_fields(ydl.extract_info(url, download=False))
         except DownloadError as e:
             raise ValueError(f"yt-dlp extraction failed: {e}")
+        
+        return TrackInfo(backend=BackendType.YT_DLP, **fields)
     
-    def is_available(self) -> bool:
-        """Check if yt-dlp is available."""
+    def extract_metadata(self, url: str) -> TrackInfo:
+        """Extract metadata only, skipping format selection.
+        
+        Runs yt-dlp without processing the info dict (no format sorting,
+        selection or signature work for the chosen format) and skips the
+        DASH/HLS manifest downloads. The returned track has no audio_url.
+        """
+        from yt_dlp import YoutubeDL
+        from yt_dlp.utils import DownloadError
+        
+        video_id = self._extract_video_id(url)
+        if not video_id:
+            raise ValueError(f"Invalid YouTube URL: {url}")
+        
+        ydl_opts = dict(
+            self.ydl_opts,
+            extractor_args={'youtube': {'skip': ['dash', 'hls']}}
+        )
+        
         try:
-            from yt_dlp import YoutubeDL
-            return True
-        except ImportError:
-            return False
+            with YoutubeDL(ydl_opts) as ydl:
+                fields = ytdlp_track_fields(
+                    ydl.extract_info(url, download=False, process=False)
+                )
+        except DownloadError as e:
+            raise ValueError(f"yt-dlp metadata extraction failed: {e}")
+        
+        # Unprocessed info has no selected format, so never a usable URL
+        fields.update(audio_url='', expires_at=None)
+        return TrackInfo(backend=BackendType.YT_DLP, **fields)
+    
+    def is_available(self) -> bool:
+        """Check if yt-dlp is installed (without importing it)."""
+        return importlib.util.find_spec("yt_dlp") is not None
     
     def get_name(self) -> str:
         return self._name
     
-    def _extract_video_id(self, url: str) -> Optional[str]:
-        """Extract video ID from URL."""
-        import re
-        
-        patterns = [
-            r'(?:https?://)?(?:www\.)?youtube\.com/watch\?v=([a-zA-Z0-9_-]{11})',
-            r'(?:https?://)?youtu\.be/([a-zA-Z0-9_-]{11})',
-            r'(?:https?://)?(?:www\.)?youtube\.com/shorts/([a-zA-Z0-9_-]{11})',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
-        return None
+
+
+def _is_instance_fault(error: Exception) -> bool:
+    """Whether a failed Invidious request says something about the instance."""
+    if isinstance(error, httpx.HTTPStatusError):
+        code = error.response.status_code
+        # 404 etc. are about the video; 403/429/5xx mean the instance is struggling
+        return code >= 500 or code in (403, 429)
+    return True
 
 
 class InvidiousExtractionBackend(ExtractionBackend):
@@ -185,38 +193,65 @@ class InvidiousExtractionBackend(ExtractionBackend):
     """
     
     # Known working Invidious instances (public, no auth, ad-free)
-    INSTANCES = [
-        "https://yewtu.be",
-        "https://invidious.snopyta.org", 
-        "https://invidious.kavin.rocks",
-        "https://invidious.jingl.xyz",
-    ]
-    
-    def __init__(self, instance_url: str = None):
+    INSTANCES = config.invidious.instances
+    
+    def __init__(self, instance_url: str = None,
+                 pool: Optional[InvidiousInstancePool] = None):
+        """
+        Initialize backend.
+        
+        Args:
+            instance_url: Pin every request to this instance; otherwise
+                each request uses the best healthy instance from the pool
+            pool: Instance pool (default: the global background-probed pool)
+        """
+        self._pinned = instance_url
+        self._pool = pool or invidious_pool
         self._instance = instance_url or self.INSTANCES[0]
-        self._name = f"Invidious ({self._instance})"
+        self._name = f"Invidious ({instance_url or 'pool'})"
+    
+    # Only the keys extract() maps into TrackInfo (Invidious `fields=` filter)
+    VIDEO_FIELDS = "title,lengthSeconds,formatStreams(url,type),recommendedVideos(videoId,title)"
+    
+    def _fetch_video(self, instance: str, video_id: str) -> dict:
+        """Fetch trimmed video JSON from one instance, reporting the outcome to the pool."""
+        started = time.monotonic()
+        try:
+            response = self._pool.client.get(
+                f"{instance}/api/v1/videos/{video_id}",
+                params={'fields': self.VIDEO_FIELDS}
+            )
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            if _is_instance_fault(e):
+                self._pool.record(instance, time.monotonic() - started, False, str(e))
+            raise
+        self._pool.record(instance, time.monotonic() - started, True)
+        return data
     
     def extract(self, url: str) -> TrackInfo:
         """Extract using Invidious API."""
-        import re
-        import urllib.request
-        import json
-        
         video_id = self._extract_video_id(url)
         if not video_id:
             raise ValueError(f"Invalid YouTube URL: {url}")
         
-        # Try to get video info from Invidious
-        api_url = f"{self._instance}/api/v1/videos/{video_id}.json"
+        # Pinned backends use one instance; pooled ones retry once elsewhere
+        instance = self._pinned or self._pool.choose()
+        if instance is None:
+            raise ValueError("Invidious extraction failed: no healthy instance")
         
         try:
-            req = urllib.request.Request(
-                api_url,
-                headers={'User-Agent': 'NextSoundWave/1.0'}
-            )
-            
-            with urllib.request.urlopen(req, timeout=10) as response:
-                data = json.loads(response.read().decode('utf-8'))
+            try:
+                data = self._fetch_video(instance, video_id)
+            except Exception as e:
+                retry = None
+                if not self._pinned and _is_instance_fault(e):
+                    retry = self._pool.choose(exclude=instance)
+                if retry is None:
+                    raise
+                instance = retry
+                data = self._fetch_video(instance, video_id)
             
             # Get best audio format (prefer opus)
             audio_formats = [f for f in data.get('formatStreams', []) 
@@ -244,81 +279,48 @@ class InvidiousExtractionBackend(ExtractionBackend):
                     for v in data.get('recommendedVideos', [])[:10]
                 ]
             
+            audio_url = best_audio.get('url', '') if best_audio else ''
+            
             return TrackInfo(
                 id=video_id,
                 title=data.get('title', 'Unknown Title'),
                 duration=data.get('lengthSeconds', 0) or 0,
-                audio_url=best_audio.get('url', '') if best_audio else '',
+                audio_url=audio_url,
                 codec='opus',
                 backend=BackendType.INVIDIOUS,
                 related=related,
-                embed_url=f"{self._instance}/embed/{video_id}",
-                invidious_url=f"{self._instance}/embed/{video_id}"
+                embed_url=f"{instance}/embed/{video_id}",
+                invidious_url=f"{instance}/embed/{video_id}",
+                expires_at=parse_stream_expiry(audio_url)
             )
             
         except Exception as e:
             raise ValueError(f"Invidious extraction failed: {e}")
     
     def is_available(self) -> bool:
-        """Check if Invidious instance is available."""
-        try:
-            import urllib.request
-            req = urllib.request.Request(
-                f"{self._instance}/api/v1/trending",
-                headers={'User-Agent': 'NextSoundWave/1.0'},
-                method='HEAD'
-            )
-            with urllib.request.urlopen(req, timeout=5) as resp:
-                return resp.status == 200
-        except Exception:
-            return False
+        """
+        Check if an Invidious instance is usable.
+        
+        Answered from the pool's background probes and recent request
+        outcomes; no request is sent here.
+        """
+        if self._pinned:
+            return True
+        return self._pool.has_healthy()
     
     def get_name(self) -> str:
         return self._name
     
-    def _extract_video_id(self, url: str) -> Optional[str]:
-        """Extract video ID from URL."""
-        import re
-        
-        patterns = [
-            r'(?:https?://)?(?:www\.)?youtube\.com/watch\?v=([a-zA-Z0-9_-]{11})',
-            r'(?:https?://)?youtu\.be/([a-zA-Z0-9_-]{11})',
-            r'(?:https?://)?(?:www\.)?youtube\.com/shorts/([a-zA-Z0-9_-]{11})',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
-        return None
-    
     def find_working_instance(self) -> Optional[str]:
-        """Find a working Invidious instance."""
-        import urllib.request
-        import concurrent.futures
-        import threading
-        
-        def check_instance(instance: str) -> tuple:
-            try:
-                req = urllib.request.Request(
-                    f"{instance}/api/v1/trending",
-                    headers={'User-Agent': 'NextSoundWave/1.0'},
-                    method='HEAD'
-                )
-                with urllib.request.urlopen(req, timeout=5) as resp:
-                    return (instance, resp.status == 200)
-            except Exception:
-                return (instance, False)
-        
-        # Check instances in parallel
-        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-            results = list(executor.map(check_instance, self.INSTANCES))
-        
-        for instance, available in results:
-            if available:
-                return instance
+        """
+        Probe all instances now and return the fastest healthy one.
         
-        return None
+        Blocking; the extraction path relies on the background pool instead.
+        """
+        pool = InvidiousInstancePool(self.INSTANCES, client=self._pool.client)
+        pool.probe_once()
+        ranked = pool.ranked()
+        return ranked[0] if ranked else None
 
 
 class ExtractionManager:
@@ -329,20 +331,54 @@ class ExtractionManager:
     1. yt-dlp (primary) - full metadata + stream URL
     2. Invidious (fallback) - when yt-dlp is blocked
     
+    The order adapts to observed latency/error rates, and a backend whose
+    circuit breaker is open (e.g. yt-dlp during an IP block) is skipped
+    until a half-open probe succeeds.
+    
     Returns embed URLs for CLIENT-SIDE playback:
     - embed_url: YouTube Embed (with AdBlock)
     - invidious_url: Invidious Embed (last resort)
     """
     
-    def __init__(self):
+    def __init__(self, cache: Optional[TrackCache] = None,
+                 hedge: Optional[HedgePolicy] = None,
+                 health: Optional[BackendHealth] = None):
         self._primary: ExtractionBackend = YTDLPExtractionBackend()
         self._fallback: Optional[ExtractionBackend] = None
         self._backend_order: List[BackendType] = [BackendType.YT_DLP, BackendType.INVIDIOUS]
+        self._inflight = SingleFlight()
+        self._cache = cache
+        # Threads are only started once the first refresh is submitted
+        self._refresher = ThreadPoolExecutor(
+            max_workers=config.cache.refresh_workers,
+            thread_name_prefix="refresh"
+        )
+        self._refresh_failures = 0
+        self._health = health or BackendHealth()
+        self._hedge = hedge or HedgePolicy()
+        # Runs both sides of a hedged race (the caller's thread only waits)
+        self._hedge_pool = ThreadPoolExecutor(
+            max_workers=2 * config.ytdlp.max_concurrent_extracts,
+            thread_name_prefix="hedge"
+        )
+    
+    @property
+    def cache(self) -> Optional[TrackCache]:
+        return self._cache
+    
+    @property
+    def worker_pool(self) -> Optional[ExtractionWorkerPool]:
+        """The primary backend's process pool (None in thread mode)."""
+        return getattr(self._primary, 'worker_pool', None)
     
     def extract(self, url: str, prefer_backend: BackendType = None) -> ExtractionResult:
         """
         Extract track info using available backends.
         
+        Fresh tracks are served from the track cache. Concurrent
+        extractions of the same video are coalesced: only one runs and
+        every caller receives its ExtractionResult.
+        
         Args:
             url: YouTube URL to extract
             prefer_backend: Optional preference override
@@ -350,67 +386,328 @@ class ExtractionManager:
         Returns:
             ExtractionResult with track info or error
         """
-        # Try preferred backend first if specified
-        if prefer_backend == BackendType.INVIDIOUS and self._fallback:
-            try:
-                track = self._fallback.extract(url)
+        video_id = parse_video_id(url)
+        if video_id is None:
+            # Nothing to cache or coalesce on; the backends report the invalid URL
+            return self._extract(url, prefer_backend, track_health=False)
+        
+        if self._cache is not None:
+            track = self._cache.get(video_id)
+            if track is not None:
+                if self._cache.claim_refresh(video_id):
+                    self._schedule_refresh(video_id, url)
                 return ExtractionResult(
                     success=True,
                     track=track,
-                    backend_used=BackendType.INVIDIOUS
+                    backend_used=track.backend
                 )
-            except Exception as e:
-                pass  # Fall through to try other backends
         
-        # Try primary backend first
-        if self._primary.is_available():
+        result, _ = self._inflight.do(
+            video_id, self._extract_and_cache, video_id, url, prefer_backend
+        )
+        return result
+    
+    def cached_metadata(self, url: str) -> Optional[TrackInfo]:
+        """
+        Get a track's metadata from the track cache only (no extraction).
+        
+        Args:
+            url: YouTube URL to look up
+            
+        Returns:
+            Cached track (its audio_url blank if the stream URL has
+            expired), or None if it is not cached or the URL is invalid
+        """
+        video_id = parse_video_id(url)
+        if video_id is None or self._cache is None:
+            return None
+        return self._cache.get(video_id, require_stream=False)
+    
+    def extract_metadata(self, url: str) -> ExtractionResult:
+        """
+        Get title, duration and embed URLs via the cheapest available path.
+        
+        Order: track cache (even if its stream URL has expired), then the
+        backends' metadata-only extraction. The track in the result may
+        have an empty audio_url.
+        
+        Args:
+            url: YouTube URL to extract
+            
+        Returns:
+            ExtractionResult with track metadata or error
+        """
+        video_id = parse_video_id(url)
+        if video_id is None:
+            return ExtractionResult(success=False, error=f"Invalid YouTube URL: {url}")
+        
+        track = self.cached_metadata(url)
+        if track is not None:
+            return ExtractionResult(
+                success=True,
+                track=track,
+                backend_used=track.backend
+            )
+        
+        result, _ = self._inflight.do(
+            ("metadata", video_id), self._extract_metadata, video_id, url
+        )
+        return result
+    
+    def _extract_metadata(self, video_id: str, url: str) -> ExtractionResult:
+        """Run metadata-only extraction in backend health order."""
+        error = "No available extraction backend"
+        for backend_type in self._health.order(self._backend_order):
+            # Metadata calls only skip open breakers; they never probe
+            if self._health.is_open(backend_type):
+                continue
+            backend = self._backend(backend_type)
+            if backend is None or not backend.is_available():
+                continue
             try:
-                track = self._primary.extract(url)
-                return ExtractionResult(
-                    success=True,
-                    track=track,
-                    backend_used=BackendType.YT_DLP
-                )
+                track = backend.extract_metadata(url)
             except Exception as e:
-                pass  # Try fallback
+                error = str(e)
+                continue
+            if self._cache is not None:
+                self._cache.put_metadata(video_id, track)
+            return ExtractionResult(success=True, track=track, backend_used=backend_type)
         
-        # Initialize fallback if needed
-        if not self._fallback:
-            self._fallback = InvidiousExtractionBackend()
-            # Try to find best instance
-            working = self._fallback.find_working_instance()
-            if working:
-                self._fallback = InvidiousExtractionBackend(working)
+        return ExtractionResult(success=False, error=error)
+    
+    def _extract_and_cache(self, video_id: str, url: str,
+                           prefer_backend: BackendType = None) -> ExtractionResult:
+        """Extract and store successful results in the track cache."""
+        started = time.monotonic()
+        result = self._extract(url, prefer_backend)
+        if result.success and self._cache is not None:
+            self._cache.put(video_id, result.track, cost=time.monotonic() - started)
+        return result
+    
+    def _schedule_refresh(self, video_id: str, url: str):
+        """Re-extract a hot cached track in the background before it expires."""
+        self._refresher.submit(self._refresh, video_id, url)
+    
+    def _refresh(self, video_id: str, url: str):
+        # Coalesces with any interactive miss for the same video
+        result, _ = self._inflight.do(video_id, self._extract_and_cache, video_id, url)
+        if not result.success:
+            self._refresh_failures += 1
+            self._cache.release_refresh(video_id)
+    
+    def _extract(self, url: str, prefer_backend: BackendType = None,
+                 track_health: bool = True) -> ExtractionResult:
+        """
+        Run the backend chain for a single extraction.
+        
+        Backends are tried in the order chosen by the health tracker
+        (static order until every backend has enough observations, then by
+        expected latency), skipping backends whose circuit breaker is open.
         
-        # Try fallback
-        if self._fallback and self._fallback.is_available():
+        Args:
+            url: YouTube URL to extract
+            prefer_backend: Optional backend to try first
+            track_health: Record outcomes for the breakers (False for URLs
+                that failed validation, which say nothing about a backend)
+        """
+        order = self._health.order(self._backend_order, prefer=prefer_backend)
+        error = "No available extraction backend"
+        
+        if (self._hedge.enabled and len(order) > 1
+                and order[0] == BackendType.YT_DLP
+                and prefer_backend != BackendType.YT_DLP):
+            backend = self._ready(BackendType.YT_DLP)
+            if backend is not None:
+                result = self._extract_hedged(url, backend, order[1], track_health)
+                if result.success:
+                    return result
+                error = result.error
+                # Whatever the race already tried is not tried again
+                order = order[1:] if result.backend_used is None else order[2:]
+            else:
+                order = order[1:]
+        
+        for backend_type in order:
+            backend = self._ready(backend_type)
+            if backend is None:
+                continue
             try:
-                track = self._fallback.extract(url)
-                return ExtractionResult(
-                    success=True,
-                    track=track,
-                    backend_used=BackendType.INVIDIOUS
-                )
+                return self._attempt(backend, backend_type, url, track_health)
             except Exception as e:
-                return ExtractionResult(
-                    success=False,
-                    error=str(e)
-                )
+                error = str(e)
         
         # All backends failed
         return ExtractionResult(
             success=False,
-            error="No available extraction backend"
+            error=error
         )
     
-    def health_check(self) -> dict:
+    def _ensure_fallback(self):
+        """Initialize the fallback backend if needed."""
+        if not self._fallback:
+            # Instance choice is per request, from the background-probed pool
+            self._fallback = InvidiousExtractionBackend()
+    
+    def _backend(self, backend_type: BackendType) -> Optional[ExtractionBackend]:
+        """Get the backend instance for a type, initializing the fallback lazily."""
+        if backend_type == BackendType.YT_DLP:
+            return self._primary
+        self._ensure_fallback()
+        return self._fallback
+    
+    def _ready(self, backend_type: BackendType) -> Optional[ExtractionBackend]:
+        """Get the backend if its breaker admits a call and it is available."""
+        if not self._health.allow(backend_type):
+            return None
+        backend = self._backend(backend_type)
+        if backend is None or not backend.is_available():
+            self._health.release(backend_type)
+            return None
+        return backend
+    
+    def _attempt(self, backend: ExtractionBackend, backend_type: BackendType,
+                 url: str, track_health: bool = True) -> ExtractionResult:
+        """
+        Extract with one backend and record the outcome.
+        
+        Without track_health the outcome is not recorded, so a half-open
+        probe claimed by _ready() is given back instead.
+        
+        Raises:
+            Whatever the backend raised
+        """
+        started = time.monotonic()
+        try:
+            track = backend.extract(url)
+        except Exception:
+            if track_health:
+                self._health.record_failure(backend_type, time.monotonic() - started)
+            raise
+        finally:
+            if not track_health:
+                self._health.release(backend_type)
+        elapsed = time.monotonic() - started
+        if track_health:
+            self._health.record_success(backend_type, elapsed)
+        if backend_type == BackendType.YT_DLP:
+            self._hedge.record_latency(elapsed)
+        return ExtractionResult(success=True, track=track, backend_used=backend_type)
+    
+    def _extract_hedged(self, url: str, primary_backend: ExtractionBackend,
+                        hedge_type: BackendType, track_health: bool) -> ExtractionResult:
+        """
+        Race the next backend against a slow primary.
+        
+        The primary gets the learned hedge delay to answer on its own. If it
+        has not, the hedge backend starts in parallel and the first success
+        wins. The loser is cancelled if it has not started; a running
+        extraction cannot be interrupted, so its result is discarded.
+        
+        Returns:
+            ExtractionResult. On failure, backend_used is None if only the
+            primary was tried, or the hedge backend's type if both were
+        """
+        primary = self._hedge_pool.submit(
+            self._attempt, primary_backend, BackendType.YT_DLP, url, track_health
+        )
+        try:
+            result = primary.result(timeout=self._hedge.delay())
+            self._hedge.record_unhedged()
+            return result
+        except FutureTimeoutError:
+            pass
+        except Exception as e:
+            return ExtractionResult(success=False, error=str(e))
+        
+        hedge_backend = self._ready(hedge_type)
+        if hedge_backend is None:
+            # Nothing to hedge with; keep waiting on the primary
+            try:
+                return primary.result()
+            except Exception as e:
+                return ExtractionResult(success=False, error=str(e))
+        
+        hedge = self._hedge_pool.submit(
+            self._attempt, hedge_backend, hedge_type, url, track_health
+        )
+        types = {primary: BackendType.YT_DLP, hedge: hedge_type}
+        pending = {primary, hedge}
+        error = "No available extraction backend"
+        
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = str(e)
+                    continue
+                loser = next(iter(pending), None)
+                if loser is not None and loser.cancel():
+                    # Never started: give back what _ready() claimed for it
+                    self._health.release(types[loser])
+                self._hedge.record_race(
+                    types[future].value, types[loser].value if loser is not None else None
+                )
+                return result
+        
+        self._hedge.record_race(None, None)
+        return ExtractionResult(success=False, error=error, backend_used=hedge_type)
+    
+    def stats(self) -> dict:
+        """
+        Get extraction pipeline statistics.
+        
+        Returns:
+            Dict with worker pool stats (mode "thread" when no pool is used)
+            single-flight counters (coalesced = requests that shared
+            another request's extraction), track cache counters,
+            per-backend hedging wins/losses and per-backend EWMA
+            latency/error rate with circuit breaker state
+        """
+        pool = getattr(self._primary, 'worker_pool', None)
+        return {
+            "workers": pool.stats() if pool is not None else {"mode": "thread"},
+            "singleflight": self._inflight.stats(),
+            "cache": self._cache.stats() if self._cache is not None else None,
+            "refresh_failures": self._refresh_failures,
+            "hedging": self._hedge.stats(),
+            "backends": self._health.stats()
+        }
+    
+    def shutdown(self):
+        """Release backend resources (worker processes, cache database)."""
+        pool = getattr(self._primary, 'worker_pool', None)
+        if pool is not None:
+            pool.shutdown()
+        self._refresher.shutdown(wait=False, cancel_futures=True)
+        self._hedge_pool.shutdown(wait=False, cancel_futures=True)
+        if self._cache is not None:
+            self._cache.close()
+    
+    def health_check(self, deep: bool = False) -> dict:
         """
         Check health of all backends.
         
+        Args:
+            deep: Also run a real metadata extraction of
+                config.health.probe_video through yt-dlp (network; meant
+                for the background health monitor, not the request path)
+        
         Returns:
             Dict with backend availability status
         """
         yt_dlp_available = self._primary.is_available()
+        primary = {"backend": "yt-dlp"}
+        
+        if deep and yt_dlp_available and config.health.probe_video:
+            started = time.monotonic()
+            try:
+                self._primary.extract_metadata(watch_url(config.health.probe_video))
+            except Exception as e:
+                yt_dlp_available = False
+                primary["error"] = str(e)
+            primary["probe_ms"] = round((time.monotonic() - started) * 1000, 1)
         
         # Check Invidious
         if not self._fallback:
@@ -429,19 +726,21 @@ class ExtractionManager:
             status = "unhealthy"
             primary_status = "unavailable"
         
+        breakers = self._health.stats()
+        primary["available"] = yt_dlp_available
+        primary["breaker"] = breakers.get(BackendType.YT_DLP.value, {}).get("state", "closed")
+        
         return {
             "status": status,
-            "primary": {
-                "backend": "yt-dlp",
-                "available": yt_dlp_available
-            },
+            "primary": primary,
             "fallback": {
                 "backend": "invidious",
-                "available": invidious_available
+                "available": invidious_available,
+                "breaker": breakers.get(BackendType.INVIDIOUS.value, {}).get("state", "closed")
             },
             "recommended_backend": BackendType.YT_DLP if yt_dlp_available else BackendType.INVIDIOUS
         }
 
 
 # Global extraction manager
-extraction_manager = ExtractionManager()
+extraction_manager = ExtractionManager(cache=track_cache)
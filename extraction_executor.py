@@ -0,0 +1,153 @@
+"""
+Bounded executor for blocking extraction work.
+
+yt-dlp and the Invidious HTTP calls are synchronous. Calling them directly
+from ``async def`` routes blocks the uvicorn event loop, so every request
+(including ``/api/health``) stalls behind a single slow extraction.
+
+ExtractionExecutor runs that work on a dedicated thread pool capped at
+``config.ytdlp.max_concurrent_extracts`` and records queue depth and
+queue wait times so the pool can be sized from real traffic.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from config import config
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 if empty)."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return sorted_values[index]
+
+
+class ExtractionExecutor:
+    """Thread pool executor with a hard concurrency cap and wait-time stats."""
+
+    # Number of recent queue waits kept for percentile reporting
+    WAIT_SAMPLES = 512
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Initialize executor.
+
+        Args:
+            max_workers: Maximum concurrent extractions
+                (defaults to config.ytdlp.max_concurrent_extracts)
+        """
+        self._max_workers = max(1, max_workers or config.ytdlp.max_concurrent_extracts)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self._max_workers,
+            thread_name_prefix="extract"
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._cancelled = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._waits: deque = deque(maxlen=self.WAIT_SAMPLES)
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Submit blocking work to the pool.
+
+        Args:
+            fn: Callable to run on a worker thread
+            *args, **kwargs: Arguments for fn
+
+        Returns:
+            concurrent.futures.Future for the call
+        """
+        submitted_at = time.monotonic()
+
+        def task():
+            waited = time.monotonic() - submitted_at
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._total_wait += waited
+                self._max_wait = max(self._max_wait, waited)
+                self._waits.append(waited)
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                with self._lock:
+                    self._running -= 1
+                    self._failed += 1
+                raise
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+            return result
+
+        with self._lock:
+            self._queued += 1
+        future = self._pool.submit(task)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: Future):
+        # A future cancelled while still queued never ran ``task``
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+                self._cancelled += 1
+
+    def load(self) -> float:
+        """Running plus queued jobs as a fraction of max_workers."""
+        with self._lock:
+            return (self._running + self._queued) / self._max_workers
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run blocking work off the event loop and await its result.
+
+        Exceptions raised by fn propagate to the caller.
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self) -> dict:
+        """
+        Get executor statistics.
+
+        Returns:
+            Dict with pool size, queue depth and wait times (milliseconds)
+        """
+        with self._lock:
+            waits = sorted(self._waits)
+            started = self._completed + self._failed + self._running
+            return {
+                "max_workers": self._max_workers,
+                "running": self._running,
+                "queued": self._queued,
+                "completed": self._completed,
+                "failed": self._failed,
+                "cancelled": self._cancelled,
+                "wait_ms": {
+                    "avg": round(self._total_wait / started * 1000, 2) if started else 0.0,
+                    "p95": round(_percentile(waits, 0.95) * 1000, 2),
+                    "max": round(self._max_wait * 1000, 2),
+                },
+            }
+
+    def shutdown(self, wait: bool = False):
+        """Stop accepting work and cancel anything still queued."""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+# Global extraction executor
+extraction_executor = ExtractionExecutor()
@@ -0,0 +1,197 @@
+"""
+Process-pool extraction workers.
+
+yt-dlp extraction is CPU-bound (signature/nsig deciphering, info dict
+construction) and holds the GIL, so the thread executor alone cannot
+spread it across cores. In "process" worker mode the yt-dlp backend hands
+extractions to a pool of worker processes instead.
+
+Each worker keeps one long-lived, pre-initialised YoutubeDL instance and
+sends back only the trimmed TrackInfo fields, never the full info dict.
+Workers are recycled after ``max_jobs`` extractions, and the whole pool is
+replaced when a worker reports an RSS above the configured ceiling.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional, Tuple
+
+from config import config
+from track_info import ytdlp_track_fields
+
+
+# Per-process YoutubeDL instance, created by the pool initializer
+_worker_ydl = None
+
+
+def _init_worker(ydl_opts: dict):
+    """Pool initializer: build the long-lived YoutubeDL for this worker."""
+    global _worker_ydl
+    from yt_dlp import YoutubeDL
+
+    _worker_ydl = YoutubeDL(ydl_opts)
+
+
+def _warm_worker() -> Tuple[int, int]:
+    """No-op job: forces a worker process (and its YoutubeDL) to start."""
+    return os.getpid(), _current_rss()
+
+
+def _current_rss() -> int:
+    """Resident set size of the current process in bytes."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def extract_track_fields(url: str) -> Tuple[dict, int]:
+    """
+    Extract a track inside a worker process.
+
+    Args:
+        url: YouTube URL to extract
+
+    Returns:
+        Tuple of (trimmed TrackInfo fields, worker RSS in bytes)
+
+    Raises:
+        ValueError: If yt-dlp extraction fails
+    """
+    from yt_dlp.utils import DownloadError
+
+    try:
+        info = _worker_ydl.extract_info(url, download=False)
+    except DownloadError as e:
+        # yt-dlp errors carry unpicklable exc_info; send a plain message back
+        raise ValueError(f"yt-dlp extraction failed: {e}") from None
+
+    fields = ytdlp_track_fields(info)
+    del info
+    return fields, _current_rss()
+
+
+class ExtractionWorkerPool:
+    """Pool of warm yt-dlp worker processes with job and memory recycling."""
+
+    def __init__(
+        self,
+        ydl_opts: dict,
+        max_workers: Optional[int] = None,
+        max_jobs_per_worker: Optional[int] = None,
+        max_rss_mb: Optional[int] = None
+    ):
+        """
+        Initialize worker pool. Processes are started on first use.
+
+        Args:
+            ydl_opts: Options for each worker's YoutubeDL instance
+            max_workers: Number of worker processes
+            max_jobs_per_worker: Extractions before a worker is replaced
+            max_rss_mb: RSS ceiling that triggers a pool recycle (0 disables)
+        """
+        self._ydl_opts = dict(ydl_opts)
+        self._max_workers = max_workers or config.ytdlp.process_workers
+        self._max_jobs = max_jobs_per_worker or config.ytdlp.worker_max_jobs
+        rss_mb = config.ytdlp.worker_max_rss_mb if max_rss_mb is None else max_rss_mb
+        self._max_rss = rss_mb * 1024 * 1024
+
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._jobs = 0
+        self._rss_recycles = 0
+        self._crash_recycles = 0
+        self._last_rss = 0
+        self._peak_rss = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._max_workers,
+                    # spawn: never fork a process that is running threads
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self._ydl_opts,),
+                    max_tasks_per_child=self._max_jobs
+                )
+            return self._executor
+
+    def _recycle(self, executor: ProcessPoolExecutor, crashed: bool = False):
+        """Replace the pool; in-flight jobs on the old pool still finish."""
+        with self._lock:
+            if self._executor is not executor:
+                return  # Another thread already recycled it
+            self._executor = None
+            if crashed:
+                self._crash_recycles += 1
+            else:
+                self._rss_recycles += 1
+        executor.shutdown(wait=False)
+
+    def run(self, fn: Callable, *args):
+        """
+        Run a picklable job in a worker and return its result.
+
+        The job must return a ``(result, rss_bytes)`` tuple.
+
+        Raises:
+            ValueError: If the worker process died during the job
+        """
+        executor = self._get_executor()
+        try:
+            result, rss = executor.submit(fn, *args).result()
+        except BrokenProcessPool as e:
+            self._recycle(executor, crashed=True)
+            raise ValueError(f"Extraction worker crashed: {e}")
+
+        with self._lock:
+            self._jobs += 1
+            self._last_rss = rss
+            self._peak_rss = max(self._peak_rss, rss)
+
+        if self._max_rss and rss > self._max_rss:
+            self._recycle(executor)
+
+        return result
+
+    def warm(self):
+        """Start every worker process now instead of on the first extractions."""
+        executor = self._get_executor()
+        futures = [executor.submit(_warm_worker) for _ in range(self._max_workers)]
+        for future in futures:
+            future.result()
+
+    def extract(self, url: str) -> dict:
+        """Extract a track in a worker and return its TrackInfo fields."""
+        return self.run(extract_track_fields, url)
+
+    def stats(self) -> dict:
+        """Get worker pool statistics."""
+        with self._lock:
+            return {
+                "mode": "process",
+                "workers": self._max_workers,
+                "started": self._executor is not None,
+                "jobs": self._jobs,
+                "max_jobs_per_worker": self._max_jobs,
+                "max_rss_mb": self._max_rss // (1024 * 1024),
+                "last_rss_mb": round(self._last_rss / (1024 * 1024), 1),
+                "peak_rss_mb": round(self._peak_rss / (1024 * 1024), 1),
+                "recycles": {
+                    "rss": self._rss_recycles,
+                    "crash": self._crash_recycles,
+                },
+            }
+
+    def shutdown(self, wait: bool = False):
+        """Stop all worker processes."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,115 @@
+"""
+Background health monitor.
+
+Deep extraction health checks touch the network (a real yt-dlp metadata
+probe), so they never run in the request path. A daemon thread runs the
+check every ``interval`` seconds and the health endpoints serve the last
+snapshot, with its age, instantly.
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+from config import config
+from extraction_backends import extraction_manager
+
+
+class HealthMonitor:
+    """Run a health check on a schedule and cache its latest result."""
+
+    def __init__(
+        self,
+        check: Callable[[], dict],
+        interval: Optional[float] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize monitor. Nothing runs until start() or refresh().
+
+        Args:
+            check: Callable returning a health dict with a "status" key
+            interval: Seconds between checks
+            clock: Wall-clock time source (snapshot timestamps)
+        """
+        self._check = check
+        self._interval = config.health.interval if interval is None else interval
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._snapshot: Optional[dict] = None
+        self._checked_at: Optional[float] = None
+        self._duration = 0.0
+        self._failures = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self):
+        """Run the check now (blocking) and store the result."""
+        started = time.monotonic()
+        try:
+            result = self._check()
+        except Exception as e:
+            result = {"status": "unhealthy", "error": str(e)}
+            with self._lock:
+                self._failures += 1
+        with self._lock:
+            self._snapshot = result
+            self._checked_at = self._clock()
+            self._duration = time.monotonic() - started
+
+    def snapshot(self) -> dict:
+        """
+        Get the last check result without blocking.
+
+        Returns:
+            The check's dict plus "checked_at", "age_seconds" and "stale"
+            (older than three intervals). Status is "unknown" until the
+            first check completes.
+        """
+        with self._lock:
+            if self._snapshot is None:
+                return {
+                    "status": "unknown",
+                    "checked_at": None,
+                    "age_seconds": None,
+                    "stale": True,
+                }
+            age = max(0.0, self._clock() - self._checked_at)
+            return {
+                **self._snapshot,
+                "checked_at": self._checked_at,
+                "age_seconds": round(age, 1),
+                "stale": age > 3 * self._interval,
+                "check_ms": round(self._duration * 1000, 1),
+            }
+
+    def ready(self) -> bool:
+        """Whether the last fresh snapshot says some backend can extract."""
+        snapshot = self.snapshot()
+        return not snapshot["stale"] and snapshot["status"] in ("healthy", "degraded")
+
+    def start(self):
+        """Start checking in the background (first check runs immediately)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="health-monitor", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            self.refresh()
+            if self._stop.wait(self._interval):
+                return
+
+    def stop(self):
+        """Stop the background checks."""
+        self._stop.set()
+        self._thread = None
+
+
+# Global monitor for the extraction backends
+extraction_health_monitor = HealthMonitor(lambda: extraction_manager.health_check(deep=True))
@@ -0,0 +1,111 @@
+"""
+Hedged extraction policy.
+
+ExtractionManager normally waits for yt-dlp to fail (up to its full
+socket timeout) before trying Invidious. With hedging enabled, the
+fallback is launched in parallel once the primary has taken longer than
+its usual p95 latency, and whichever succeeds first wins.
+
+HedgePolicy learns the hedge delay from recent primary latencies and
+keeps per-backend win/loss counters to show how often hedging pays off.
+"""
+
+import threading
+from collections import deque
+from typing import Optional
+
+from config import config
+
+
+class HedgePolicy:
+    """Hedge delay from a rolling latency window, plus win/loss stats."""
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        percentile: Optional[float] = None,
+        min_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        initial_delay: Optional[float] = None,
+        min_samples: Optional[int] = None,
+        window: Optional[int] = None
+    ):
+        """
+        Initialize policy (unset arguments come from config.hedge).
+
+        Args:
+            enabled: Whether hedged extraction is used at all
+            percentile: Latency percentile after which to hedge
+            min_delay, max_delay: Clamp for the hedge delay (seconds)
+            initial_delay: Delay until enough latencies are observed
+            min_samples: Observations needed before using the percentile
+            window: Number of recent latencies kept
+        """
+        cfg = config.hedge
+        self.enabled = cfg.enabled if enabled is None else enabled
+        self._percentile = cfg.percentile if percentile is None else percentile
+        self._min_delay = cfg.min_delay if min_delay is None else min_delay
+        self._max_delay = cfg.max_delay if max_delay is None else max_delay
+        self._initial_delay = cfg.initial_delay if initial_delay is None else initial_delay
+        self._min_samples = cfg.min_samples if min_samples is None else min_samples
+
+        self._lock = threading.Lock()
+        self._latencies: deque = deque(maxlen=cfg.window if window is None else window)
+        self._hedged = 0
+        self._unhedged = 0
+        self._wins = {}
+        self._losses = {}
+
+    def record_latency(self, seconds: float):
+        """Record a successful primary extraction latency."""
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def delay(self) -> float:
+        """Seconds to wait on the primary before launching the hedge."""
+        with self._lock:
+            if len(self._latencies) < self._min_samples:
+                return self._initial_delay
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self._percentile))
+        return min(self._max_delay, max(self._min_delay, ordered[index]))
+
+    def record_unhedged(self):
+        """The primary answered before the hedge delay."""
+        with self._lock:
+            self._unhedged += 1
+
+    def record_race(self, winner: Optional[str], loser: Optional[str]):
+        """
+        Record the outcome of a hedged race.
+
+        Args:
+            winner: Name of the backend whose result was used (None if both failed)
+            loser: Name of the backend whose result was discarded
+        """
+        with self._lock:
+            self._hedged += 1
+            if winner is not None:
+                self._wins[winner] = self._wins.get(winner, 0) + 1
+            if loser is not None:
+                self._losses[loser] = self._losses.get(loser, 0) + 1
+
+    def stats(self) -> dict:
+        """Get hedging statistics."""
+        delay = self.delay()
+        with self._lock:
+            backends = sorted(set(self._wins) | set(self._losses))
+            return {
+                "enabled": self.enabled,
+                "delay_ms": round(delay * 1000, 1),
+                "samples": len(self._latencies),
+                "unhedged": self._unhedged,
+                "hedged": self._hedged,
+                "backends": {
+                    name: {
+                        "wins": self._wins.get(name, 0),
+                        "losses": self._losses.get(name, 0),
+                    }
+                    for name in backends
+                },
+            }
@@ -0,0 +1,252 @@
+"""
+Latency-ranked pool of Invidious instances.
+
+A background thread probes every configured instance periodically and
+keeps an EWMA of its latency and success rate. Real extractions report
+their outcome too, so a dying instance is demoted between probes.
+
+The Invidious backend asks the pool for an instance per request instead
+of sending its own HEAD check first, and sends the request through the
+pool's shared keep-alive HTTP client so repeat requests to an instance
+skip the TCP/TLS handshake. Load is spread over the healthy
+instances with "power of two choices": pick two at random and use the
+faster one.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from config import config
+
+
+class _InstanceState:
+    """Health record for one instance."""
+    __slots__ = ("latency", "success_rate", "samples", "probes", "failures", "last_error")
+
+    def __init__(self):
+        self.latency = 0.0
+        self.success_rate = 1.0
+        self.samples = 0
+        self.probes = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+
+class InvidiousInstancePool:
+    """Background-probed Invidious instances ranked by latency and success."""
+
+    # Instances below this EWMA success rate are not handed out
+    HEALTHY_SUCCESS_RATE = 0.5
+
+    def __init__(
+        self,
+        instances: Optional[List[str]] = None,
+        probe_interval: Optional[float] = None,
+        probe_timeout: Optional[float] = None,
+        alpha: Optional[float] = None,
+        rng: Callable[[], float] = random.random,
+        client: Optional[httpx.Client] = None
+    ):
+        """
+        Initialize pool. No network traffic happens until a probe runs.
+
+        Args:
+            instances: Base URLs of the Invidious instances
+            probe_interval: Seconds between background probe rounds
+            probe_timeout: Timeout for a single probe request
+            alpha: EWMA smoothing factor (weight of the newest observation)
+            rng: Uniform [0, 1) source for instance selection
+            client: HTTP client to use (default: a pooled client created
+                on first request)
+        """
+        cfg = config.invidious
+        self._instances = list(cfg.instances if instances is None else instances)
+        self._probe_interval = cfg.probe_interval if probe_interval is None else probe_interval
+        self._probe_timeout = cfg.probe_timeout if probe_timeout is None else probe_timeout
+        self._alpha = cfg.ewma_alpha if alpha is None else alpha
+        self._rng = rng
+        self._request_timeout = cfg.request_timeout
+        self._max_connections = cfg.max_connections
+        self._max_keepalive = cfg.max_keepalive_connections
+        self._client = client
+
+        self._lock = threading.Lock()
+        self._states: Dict[str, _InstanceState] = {i: _InstanceState() for i in self._instances}
+        self._rounds = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def instances(self) -> List[str]:
+        return list(self._instances)
+
+    @property
+    def client(self) -> httpx.Client:
+        """Shared keep-alive client (thread-safe; created on first use)."""
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    headers={'User-Agent': 'NextSoundWave/1.0'},
+                    timeout=self._request_timeout,
+                    limits=httpx.Limits(
+                        max_connections=self._max_connections,
+                        max_keepalive_connections=self._max_keepalive
+                    ),
+                    follow_redirects=True
+                )
+            return self._client
+
+    # ---------- Observations ----------
+
+    def record(self, instance: str, latency: float, ok: bool, error: Optional[str] = None):
+        """
+        Record the outcome of a probe or real request against an instance.
+
+        Args:
+            instance: Instance base URL
+            latency: Seconds the request took
+            ok: Whether it succeeded
+            error: Failure description for stats
+        """
+        with self._lock:
+            state = self._states.get(instance)
+            if state is None:
+                return
+            if state.samples == 0:
+                state.latency = latency
+                state.success_rate = float(ok)
+            else:
+                state.latency += self._alpha * (latency - state.latency)
+                state.success_rate += self._alpha * (float(ok) - state.success_rate)
+            state.samples += 1
+            if not ok:
+                state.failures += 1
+                state.last_error = error
+
+    def _probe(self, instance: str):
+        """Send one health probe and record it."""
+        client = self.client
+        started = time.monotonic()
+        try:
+            resp = client.head(f"{instance}/api/v1/trending", timeout=self._probe_timeout)
+            ok = resp.status_code == 200
+            error = None if ok else f"HTTP {resp.status_code}"
+        except Exception as e:
+            ok, error = False, str(e)
+        self.record(instance, time.monotonic() - started, ok, error)
+        with self._lock:
+            self._states[instance].probes += 1
+
+    def probe_once(self):
+        """Probe every instance in parallel and wait for the results."""
+        if not self._instances:
+            return
+        with ThreadPoolExecutor(max_workers=len(self._instances)) as executor:
+            list(executor.map(self._probe, self._instances))
+        with self._lock:
+            self._rounds += 1
+
+    # ---------- Selection ----------
+
+    def _score(self, state: _InstanceState) -> float:
+        """Expected seconds to a successful response (lower is better)."""
+        # Unprobed instances rank behind any measured healthy one
+        latency = state.latency if state.samples else self._probe_timeout
+        return latency / max(state.success_rate, 0.05)
+
+    def ranked(self) -> List[str]:
+        """Healthy instances, best first (configured order breaks ties)."""
+        with self._lock:
+            healthy = [
+                instance for instance in self._instances
+                if self._states[instance].success_rate >= self.HEALTHY_SUCCESS_RATE
+            ]
+            return sorted(healthy, key=lambda i: self._score(self._states[i]))
+
+    def has_healthy(self) -> bool:
+        """Whether any instance is currently considered healthy."""
+        with self._lock:
+            return any(
+                state.success_rate >= self.HEALTHY_SUCCESS_RATE
+                for state in self._states.values()
+            )
+
+    def choose(self, exclude: Optional[str] = None) -> Optional[str]:
+        """
+        Pick an instance for the next request.
+
+        Args:
+            exclude: Instance to avoid (e.g. one that just failed)
+
+        Returns:
+            Instance base URL, or None if none is healthy
+        """
+        candidates = [i for i in self.ranked() if i != exclude]
+        if len(candidates) <= 1:
+            return candidates[0] if candidates else None
+        first = candidates[int(self._rng() * len(candidates))]
+        second = candidates[int(self._rng() * len(candidates))]
+        # ranked() order is best-first, so the lower index is the faster one
+        return min(first, second, key=candidates.index)
+
+    # ---------- Background prober ----------
+
+    def start(self):
+        """Start the background prober (first round runs immediately)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="invidious-prober", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            self.probe_once()
+            if self._stop.wait(self._probe_interval):
+                return
+
+    def stop(self):
+        """Stop the background prober."""
+        self._stop.set()
+        self._thread = None
+
+    def close(self):
+        """Stop probing and close the shared HTTP client."""
+        self.stop()
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def stats(self) -> dict:
+        """Get per-instance health and ranking."""
+        ranked = self.ranked()
+        with self._lock:
+            return {
+                "probing": self._thread is not None,
+                "rounds": self._rounds,
+                "ranked": ranked,
+                "instances": {
+                    instance: {
+                        "healthy": state.success_rate >= self.HEALTHY_SUCCESS_RATE,
+                        "latency_ms": round(state.latency * 1000, 1),
+                        "success_rate": round(state.success_rate, 3),
+                        "samples": state.samples,
+                        "probes": state.probes,
+                        "failures": state.failures,
+                        "last_error": state.last_error,
+                    }
+                    for instance, state in self._states.items()
+                },
+            }
+
+
+# Global instance pool (probing starts with the application)
+invidious_pool = InvidiousInstancePool()
@@ -3,12 +3,26 @@ NextSoundWave - Self-hosted Music/Podcast Streaming Service
 Main FastAPI application entry point.
 """
 
+# First import: the origin of the startup milestones
+from startup import start_prewarm, startup_timings
+
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 
 from api.routes import router
 from api.errors import setup_error_handlers
+from audio_cache import audio_cache
+from audio_proxy import audio_relay
+from prebuffer import head_cache
+from catalog import catalog
+from extraction_backends import extraction_manager
+from extraction_executor import extraction_executor
+from health_monitor import extraction_health_monitor
+from invidious_pool import invidious_pool
+from prefetch import related_prefetcher
+
+startup_timings.mark("imported")
 
 
 @asynccontextmanager
@@ -16,8 +30,27 @@ async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup: initialize services
     print("🚀 NextSoundWave server starting...")
+    invidious_pool.start()
+    extraction_health_monitor.start()
+    # Warm yt-dlp in the background; the server is ready before it finishes
+    start_prewarm(startup_timings, extraction_manager.worker_pool)
+    startup_timings.mark("ready")
     yield
     # Shutdown: cleanup
+    extraction_health_monitor.stop()
+    if related_prefetcher is not None:
+        related_prefetcher.shutdown()
+    invidious_pool.close()
+    if audio_relay is not None:
+        await audio_relay.aclose()
+    if audio_cache is not None:
+        audio_cache.close()
+    if head_cache is not None:
+        head_cache.close()
+    if catalog is not None:
+        catalog.close()
+    extraction_executor.shutdown()
+    extraction_manager.shutdown()
     print("👋 NextSoundWave server shutting down...")
 
 
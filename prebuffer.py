@@ -0,0 +1,207 @@
+"""
+First-seconds pre-buffer for instant playback start.
+
+The relay cannot send a byte before the track is resolved and googlevideo
+has answered, which is most of the time to first audio. This cache keeps
+the first ``head_kb`` of audio (about 30 seconds of Opus at 128-160 kbps)
+in memory for hot and prefetched tracks, with the format, content type and
+total length needed to answer a request on its own. The relay sends the
+head at once and fetches the rest upstream while it is playing.
+
+Heads are recorded when the relay streams a track from its start, and by
+the related-track prefetcher (``fetch``) for the tracks likely to be
+played next. The cache is an LRU bounded by total bytes.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+
+from config import config
+
+
+class AudioHead(NamedTuple):
+    fmt: str  # YouTube itag of the audio format
+    content_type: str
+    total: int  # Full length of the track's audio in bytes
+    data: bytes
+
+
+def stream_format(audio_url: str) -> str:
+    """Format key of a direct stream URL (its itag), or "audio"."""
+    return parse_qs(urlparse(audio_url).query).get("itag", ["audio"])[0]
+
+
+class HeadCache:
+    """Byte-bounded LRU of the first bytes of tracks' audio."""
+
+    def __init__(
+        self,
+        head_bytes: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        timeout: Optional[float] = None,
+        transport: Optional[httpx.BaseTransport] = None
+    ):
+        """
+        Initialize an empty cache.
+
+        Args:
+            head_bytes: Bytes kept per track
+            max_bytes: Total bytes kept (LRU eviction)
+            timeout: Timeout for fetch() in seconds
+            transport: httpx transport override for fetch() (tests)
+        """
+        cfg = config.prebuffer
+        self._head_bytes = cfg.head_kb * 1024 if head_bytes is None else head_bytes
+        self._max_bytes = cfg.max_mb * 1024 * 1024 if max_bytes is None else max_bytes
+        self._timeout = config.stream.timeout if timeout is None else timeout
+        self._transport = transport
+
+        self._lock = threading.Lock()
+        self._heads: "OrderedDict[str, AudioHead]" = OrderedDict()
+        self._bytes = 0
+        self._client: Optional[httpx.Client] = None
+
+        self._hits = 0
+        self._misses = 0
+        self._fetched = 0
+        self._fetch_failures = 0
+        self._evictions = 0
+
+    @property
+    def head_bytes(self) -> int:
+        return self._head_bytes
+
+    def get(self, video_id: str) -> Optional[AudioHead]:
+        """Get a track's head (counts a hit/miss)."""
+        with self._lock:
+            head = self._heads.get(video_id)
+            if head is None:
+                self._misses += 1
+                return None
+            self._heads.move_to_end(video_id)
+            self._hits += 1
+            return head
+
+    def contains(self, video_id: str) -> bool:
+        """Check for a head without touching LRU order or stats."""
+        with self._lock:
+            return video_id in self._heads
+
+    def put(self, video_id: str, head: AudioHead):
+        """
+        Store a track's head.
+
+        Args:
+            video_id: Canonical video ID
+            head: Head whose data starts at byte 0; kept only if it holds
+                head_bytes (or the whole track, if shorter)
+        """
+        data = head.data[:self._head_bytes]
+        if len(data) < min(self._head_bytes, head.total) or len(data) > self._max_bytes:
+            return
+        head = head._replace(data=bytes(data))
+        with self._lock:
+            previous = self._heads.pop(video_id, None)
+            if previous is not None:
+                self._bytes -= len(previous.data)
+            self._heads[video_id] = head
+            self._bytes += len(head.data)
+            while self._bytes > self._max_bytes:
+                _, evicted = self._heads.popitem(last=False)
+                self._bytes -= len(evicted.data)
+                self._evictions += 1
+
+    def discard(self, video_id: str):
+        """Drop a head (e.g. its format no longer matches upstream)."""
+        with self._lock:
+            head = self._heads.pop(video_id, None)
+            if head is not None:
+                self._bytes -= len(head.data)
+
+    def _http(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    headers={'User-Agent': 'Mozilla/5.0'},
+                    timeout=self._timeout,
+                    follow_redirects=True,
+                    transport=self._transport
+                )
+            return self._client
+
+    def fetch(self, video_id: str, audio_url: str) -> bool:
+        """
+        Download and store a track's head (blocking; for background use).
+
+        Args:
+            video_id: Canonical video ID
+            audio_url: Direct stream URL from extraction
+
+        Returns:
+            True if a head is cached for the track afterwards
+        """
+        if self.contains(video_id):
+            return True
+        head = None
+        try:
+            with self._http().stream(
+                "GET", audio_url, headers={"Range": f"bytes=0-{self._head_bytes - 1}"}
+            ) as response:
+                # "bytes 0-<last>/<total>"; a 200 ignored the Range: leave its body unread
+                total = ""
+                if response.status_code == 206:
+                    total = response.headers.get("content-range", "").rpartition("/")[2]
+                if total.isdigit():
+                    data = bytearray()
+                    for chunk in response.iter_bytes():
+                        data += chunk
+                        if len(data) >= self._head_bytes:
+                            break
+                    head = AudioHead(
+                        stream_format(str(response.url)),
+                        response.headers.get("content-type", "application/octet-stream"),
+                        int(total),
+                        bytes(data[:self._head_bytes])
+                    )
+        except httpx.HTTPError:
+            head = None
+        if head is None:
+            with self._lock:
+                self._fetch_failures += 1
+            return False
+        self.put(video_id, head)
+        with self._lock:
+            self._fetched += 1
+        return self.contains(video_id)
+
+    def stats(self) -> dict:
+        """Get cache size and counters."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "heads": len(self._heads),
+                "bytes": self._bytes,
+                "capacity_bytes": self._max_bytes,
+                "head_bytes": self._head_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 3) if lookups else 0.0,
+                "fetched": self._fetched,
+                "fetch_failures": self._fetch_failures,
+                "evictions": self._evictions,
+            }
+
+    def close(self):
+        """Close the HTTP client used by fetch()."""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+# Global head cache (None when disabled)
+head_cache: Optional[HeadCache] = HeadCache() if config.prebuffer.enabled else None
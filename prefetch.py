@@ -0,0 +1,211 @@
+"""
+Related-track prefetcher.
+
+After an interactive resolve, the listener's next track is very likely
+one of the first related videos. Resolving those ahead of time puts them
+in the track cache, so pressing "next" is a cache hit instead of a fresh
+yt-dlp extraction.
+
+Prefetching is strictly best-effort and lower priority than anything a
+user is waiting on:
+
+- It runs on its own small thread pool, never on the interactive
+  extraction executor.
+- A job is dropped (not delayed) when the interactive executor is busier
+  than ``max_interactive_load`` at the moment it would start.
+- A token bucket caps prefetch extractions per minute.
+- Tracks already cached or already queued are skipped; a prefetch racing
+  an interactive request for the same video coalesces with it inside
+  ExtractionManager (single-flight).
+
+With a HeadCache, the first seconds of each prefetched track's audio are
+downloaded too, so the relay can start playing it instantly.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Set
+
+from config import config
+from extraction_backends import extraction_manager
+from extraction_executor import extraction_executor
+from prebuffer import HeadCache, head_cache
+from track_cache import track_cache
+from video_ids import parse_video_id, watch_url
+
+
+class _TokenBucket:
+    """Refills ``rate_per_minute`` tokens per minute up to the same capacity."""
+
+    def __init__(self, rate_per_minute: int, clock: Callable[[], float]):
+        self._capacity = float(rate_per_minute)
+        self._tokens = float(rate_per_minute)
+        self._rate = rate_per_minute / 60.0
+        self._clock = clock
+        self._updated = clock()
+
+    def take(self) -> bool:
+        now = self._clock()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+class RelatedPrefetcher:
+    """Resolve the top related tracks in the background to warm the cache."""
+
+    def __init__(
+        self,
+        extract: Callable,
+        is_cached: Callable[[str], bool],
+        load: Callable[[], float],
+        top_k: Optional[int] = None,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        budget_per_minute: Optional[int] = None,
+        max_interactive_load: Optional[float] = None,
+        heads: Optional[HeadCache] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize prefetcher. Threads start on the first schedule().
+
+        Args:
+            extract: Full extraction for a URL (caches its result)
+            is_cached: Whether a video ID already has a fresh cached track
+            load: Current interactive load ((running + queued) / workers)
+            top_k: Related tracks prefetched per resolve
+            workers: Background prefetch threads
+            max_pending: Maximum queued prefetches; extra ones are dropped
+            budget_per_minute: Maximum prefetch extractions per minute
+            max_interactive_load: Skip prefetches while load is above this
+            heads: Head cache to pre-buffer prefetched tracks into
+            clock: Monotonic time source (budget refill)
+        """
+        cfg = config.prefetch
+        self._extract = extract
+        self._is_cached = is_cached
+        self._load = load
+        self._heads = heads
+        self._top_k = cfg.top_k if top_k is None else top_k
+        self._max_pending = cfg.max_pending if max_pending is None else max_pending
+        self._max_load = (
+            cfg.max_interactive_load if max_interactive_load is None else max_interactive_load
+        )
+        self._budget = _TokenBucket(
+            cfg.budget_per_minute if budget_per_minute is None else budget_per_minute,
+            clock
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=cfg.workers if workers is None else workers,
+            thread_name_prefix="prefetch"
+        )
+
+        self._lock = threading.Lock()
+        self._pending: Set[str] = set()
+        self._stats = {
+            "scheduled": 0,
+            "prefetched": 0,
+            "prebuffered": 0,
+            "failed": 0,
+            "skipped_cached": 0,
+            "skipped_busy": 0,
+            "skipped_budget": 0,
+            "dropped": 0,
+        }
+
+    def schedule(self, related: Optional[List[dict]]) -> int:
+        """
+        Queue the first related tracks of a resolved track for prefetch.
+
+        Never blocks: the work happens on the prefetcher's own threads.
+
+        Args:
+            related: The resolved track's related list ({"id", ...} dicts)
+
+        Returns:
+            Number of tracks queued
+        """
+        queued = 0
+        for item in (related or [])[:self._top_k]:
+            video_id = parse_video_id(item.get('id'))
+            if video_id is None:
+                continue
+            with self._lock:
+                if video_id in self._pending:
+                    continue
+                if len(self._pending) >= self._max_pending:
+                    self._stats["dropped"] += 1
+                    continue
+                self._pending.add(video_id)
+                self._stats["scheduled"] += 1
+            try:
+                self._executor.submit(self._prefetch, video_id)
+            except RuntimeError:
+                # Shut down
+                with self._lock:
+                    self._pending.discard(video_id)
+                break
+            queued += 1
+        return queued
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _prefetch(self, video_id: str):
+        try:
+            if self._is_cached(video_id) and (
+                    self._heads is None or self._heads.contains(video_id)):
+                self._count("skipped_cached")
+                return
+            if self._load() > self._max_load:
+                self._count("skipped_busy")
+                return
+            with self._lock:
+                allowed = self._budget.take()
+            if not allowed:
+                self._count("skipped_budget")
+                return
+            try:
+                result = self._extract(watch_url(video_id))
+                ok = result.success
+            except Exception:
+                ok = False
+            self._count("prefetched" if ok else "failed")
+            if ok and self._heads is not None and result.track.audio_url:
+                if self._heads.fetch(video_id, result.track.audio_url):
+                    self._count("prebuffered")
+        finally:
+            with self._lock:
+                self._pending.discard(video_id)
+
+    def stats(self) -> dict:
+        """Get prefetch counters."""
+        with self._lock:
+            return {
+                **self._stats,
+                "pending": len(self._pending),
+                "top_k": self._top_k,
+            }
+
+    def shutdown(self):
+        """Drop queued prefetches and stop the threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Global prefetcher (None when disabled or when there is no cache to warm)
+related_prefetcher: Optional[RelatedPrefetcher] = (
+    RelatedPrefetcher(
+        extract=extraction_manager.extract,
+        is_cached=track_cache.contains,
+        load=extraction_executor.load,
+        heads=head_cache
+    )
+    if config.prefetch.enabled and track_cache is not None
+    else None
+)
@@ -0,0 +1,197 @@
+"""
+Search result cache.
+
+Popular queries ("lofi", "daft punk") repeat constantly and each one
+costs a fresh ``ytsearchN:`` run in yt-dlp. Results are cached per
+normalized query (Unicode NFKC, case-folded, whitespace collapsed) in a
+TTL-bounded LRU:
+
+- Each query is fetched upstream with at least ``fetch_limit`` results,
+  so a later request with a smaller limit is a slice of the cached list.
+- A result shorter than what was asked for is complete: any limit can be
+  served from it.
+- Concurrent identical searches share one upstream call (single-flight).
+
+The streaming search endpoint uses ``peek``/``store`` directly: a hit is
+replayed at once, a miss is streamed from yt-dlp and stored when complete.
+"""
+
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, List, NamedTuple, Optional
+
+from config import config
+from singleflight import SingleFlight
+from yt_dlp_client import ytdlp_client
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form of a search query (the cache key).
+
+    Args:
+        query: Raw query string
+
+    Returns:
+        NFKC-normalized, case-folded query with collapsed whitespace
+    """
+    query = unicodedata.normalize("NFKC", query).casefold()
+    return _WHITESPACE.sub(" ", query).strip()
+
+
+class _Entry(NamedTuple):
+    results: List[dict]
+    fetched: int  # Limit the upstream search was run with
+    expires_at: float
+
+    def covers(self, limit: int) -> bool:
+        # Fewer results than asked for means there are no more
+        return self.fetched >= limit or len(self.results) < self.fetched
+
+
+class SearchCache:
+    """TTL LRU of search results in front of an upstream search."""
+
+    def __init__(
+        self,
+        search: Callable[[str, int], List[dict]],
+        max_entries: Optional[int] = None,
+        ttl: Optional[float] = None,
+        fetch_limit: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            search: Upstream search (query, limit) -> list of result dicts
+            max_entries: Maximum cached queries (LRU eviction)
+            ttl: Seconds a query's results stay cached
+            fetch_limit: Minimum limit each upstream search runs with
+            clock: Monotonic time source
+        """
+        cfg = config.search
+        self._search = search
+        self._max_entries = cfg.cache_entries if max_entries is None else max_entries
+        self._ttl = cfg.cache_ttl if ttl is None else ttl
+        self._fetch_limit = cfg.fetch_limit if fetch_limit is None else fetch_limit
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._flight = SingleFlight()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _lookup(self, key: str, limit: int) -> Optional[List[dict]]:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= now:
+                del self._entries[key]
+                return None
+            if not entry.covers(limit):
+                return None
+            self._entries.move_to_end(key)
+            return entry.results[:limit]
+
+    def _store(self, key: str, limit: int, results: List[dict]):
+        # An empty list may be a swallowed upstream error; do not pin it
+        if not results:
+            return
+        with self._lock:
+            self._entries[key] = _Entry(results, limit, self._clock() + self._ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def _fetch(self, key: str, limit: int) -> List[dict]:
+        results = self._search(key, limit)
+        self._store(key, limit, results)
+        return results
+
+    def peek(self, query: str, limit: int) -> Optional[List[dict]]:
+        """
+        Get cached results without searching upstream (counts a hit/miss).
+
+        Args:
+            query: Raw query string
+            limit: Maximum number of results
+
+        Returns:
+            Up to limit results, or None on a miss
+        """
+        results = self._lookup(normalize_query(query), limit)
+        with self._lock:
+            if results is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return results
+
+    def store(self, query: str, limit: int, results: List[dict]):
+        """
+        Cache results fetched elsewhere (e.g. a completed streamed search).
+
+        Args:
+            query: Raw query string
+            limit: Limit the upstream search ran with
+            results: Every result it returned
+        """
+        self._store(normalize_query(query), limit, results)
+
+    def search(self, query: str, limit: int) -> List[dict]:
+        """
+        Search, serving from cache where possible.
+
+        Args:
+            query: Raw query string
+            limit: Maximum number of results
+
+        Returns:
+            List of search result dictionaries
+        """
+        results = self.peek(query, limit)
+        if results is not None:
+            return results
+
+        key = normalize_query(query)
+        fetch_limit = max(limit, self._fetch_limit)
+        results, _ = self._flight.do((key, fetch_limit), self._fetch, key, fetch_limit)
+        return results[:limit]
+
+    def clear(self):
+        """Drop all cached results."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Get hit/miss counters and coalescing stats."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "capacity": self._max_entries,
+                "ttl": self._ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 3) if lookups else 0.0,
+                "evictions": self._evictions,
+                "singleflight": self._flight.stats(),
+            }
+
+
+# Global search cache (None when disabled)
+search_cache: Optional[SearchCache] = (
+    SearchCache(ytdlp_client.search) if config.search.cache_enabled else None
+)
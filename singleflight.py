@@ -0,0 +1,83 @@
+"""
+Single-flight call coalescing.
+
+When many threads ask for the same key at once, only the first (the
+leader) runs the work; the rest wait and share its result or exception.
+Used to collapse bursts of identical extractions into one upstream call.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class _Call:
+    """An in-flight call that followers wait on."""
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._executed = 0
+        self._coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Run fn once per key among concurrent callers.
+
+        Args:
+            key: Coalescing key
+            fn: Callable to run if no call for key is in flight
+            *args, **kwargs: Arguments for fn
+
+        Returns:
+            Tuple of (result, shared) where shared is True for followers
+            that received the leader's result
+
+        Raises:
+            Whatever fn raised, for the leader and all of its followers
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self) -> dict:
+        """Get coalescing statistics."""
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "executed": self._executed,
+                "coalesced": self._coalesced,
+            }
@@ -0,0 +1,146 @@
+"""
+Startup phase timings and background yt-dlp pre-warm.
+
+The server answers /api/health as soon as the app is imported; yt-dlp is
+not imported on that path (see yt_dlp_client). The lifespan hook then
+warms yt-dlp on a background thread so the first real resolve does not
+pay for it either:
+
+1. ``yt_dlp_import``: import the package and its extractor registry
+2. ``yt_dlp_extractors``: build a YoutubeDL and initialise the YouTube
+   video, tab (playlist/channel) and search extractors
+3. ``worker_pool``: start the warm worker processes (process mode only)
+4. ``player_js``: one full extraction of the health probe video, which
+   downloads YouTube's player JS and fills yt-dlp's on-disk signature
+   cache (optional; needs network)
+
+Every phase's duration is published under "startup" in /api/stats.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from config import config
+from video_ids import watch_url
+
+
+# Taken when main imports this module first: the origin for milestones
+_PROCESS_T0 = time.perf_counter()
+
+
+class StartupTimings:
+    """Milestones since import and durations of named startup phases."""
+
+    def __init__(self, origin: Optional[float] = None, clock: Callable[[], float] = time.perf_counter):
+        """
+        Args:
+            origin: perf_counter value milestones are measured from
+            clock: Monotonic time source
+        """
+        self._clock = clock
+        self._origin = clock() if origin is None else origin
+        self._lock = threading.Lock()
+        self._milestones: Dict[str, float] = {}
+        self._phases: Dict[str, float] = {}
+        self._errors: Dict[str, str] = {}
+        self._prewarm = "pending"
+
+    def mark(self, name: str):
+        """Record that a milestone was reached (ms since origin)."""
+        with self._lock:
+            self._milestones[name] = round((self._clock() - self._origin) * 1000, 1)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block; a failure is recorded and re-raised."""
+        started = self._clock()
+        try:
+            yield
+        except Exception as e:
+            with self._lock:
+                self._errors[name] = str(e)
+            raise
+        finally:
+            with self._lock:
+                self._phases[name] = round((self._clock() - started) * 1000, 1)
+
+    def set_prewarm(self, state: str):
+        with self._lock:
+            self._prewarm = state
+
+    def stats(self) -> dict:
+        """Get milestones, phase durations (ms) and pre-warm state."""
+        with self._lock:
+            return {
+                "milestones_ms": dict(self._milestones),
+                "phases_ms": dict(self._phases),
+                "errors": dict(self._errors),
+                "prewarm": self._prewarm,
+            }
+
+
+def prewarm(timings: "StartupTimings", worker_pool=None, probe_video: Optional[str] = None):
+    """
+    Warm yt-dlp (blocking). Failures are recorded, never raised.
+
+    Args:
+        timings: Where phase durations are recorded
+        worker_pool: ExtractionWorkerPool to start, if any
+        probe_video: Video ID for the player JS warm-up (None skips it)
+    """
+    from yt_dlp_client import _load_yt_dlp
+
+    timings.set_prewarm("running")
+    try:
+        with timings.phase("yt_dlp_import"):
+            YoutubeDL = _load_yt_dlp()
+        with timings.phase("yt_dlp_extractors"):
+            # Any format selection deciphers signatures, which needs the player
+            # JS; yt-dlp builds its format selector here, not on extract_info
+            ydl = YoutubeDL({
+                'quiet': True, 'no_warnings': True, 'skip_download': True,
+                'format': 'bestaudio',
+            })
+            for key in ("Youtube", "YoutubeTab", "YoutubeSearch"):
+                ydl.get_info_extractor(key)
+        try:
+            if worker_pool is not None:
+                with timings.phase("worker_pool"):
+                    worker_pool.warm()
+            if probe_video:
+                with timings.phase("player_js"):
+                    ydl.extract_info(watch_url(probe_video), download=False)
+        finally:
+            ydl.close()
+    except Exception:
+        timings.set_prewarm("failed")
+        return
+    timings.mark("prewarmed")
+    timings.set_prewarm("done")
+
+
+def start_prewarm(timings: "StartupTimings", worker_pool=None) -> Optional[threading.Thread]:
+    """
+    Run prewarm() on a daemon thread if enabled in config.
+
+    Returns:
+        The started thread, or None when pre-warm is disabled
+    """
+    if not config.ytdlp.prewarm:
+        timings.set_prewarm("disabled")
+        return None
+    probe_video = config.health.probe_video if config.ytdlp.prewarm_player else None
+    thread = threading.Thread(
+        target=prewarm,
+        args=(timings, worker_pool, probe_video),
+        name="ytdlp-prewarm",
+        daemon=True
+    )
+    thread.start()
+    return thread
+
+
+# Global timings (origin: first import of this module)
+startup_timings = StartupTimings(origin=_PROCESS_T0)
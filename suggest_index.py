@@ -0,0 +1,135 @@
+"""
+Search-as-you-type suggestion index.
+
+Queries users searched for and titles they saw or played are kept in a
+sorted array of normalized terms. A prefix lookup is a binary search to
+the first match followed by a bounded forward scan, then the heaviest
+matches win. Nothing here touches YouTube.
+
+Popularity weights: a searched query counts most, a played (resolved)
+title a little less, a title merely shown in search results least. The
+array is bounded: past ``max_terms`` the lightest terms are evicted.
+"""
+
+import bisect
+import heapq
+import threading
+from typing import Dict, List, Optional
+
+from config import config
+from search_cache import normalize_query
+
+
+class SuggestIndex:
+    """Sorted-array prefix index of popularity-weighted terms."""
+
+    # Weight added per observation
+    QUERY_WEIGHT = 1.0
+    PLAY_WEIGHT = 0.5
+    RESULT_WEIGHT = 0.1
+
+    # Terms longer than this are truncated (titles with long suffixes)
+    MAX_TERM_LENGTH = 100
+
+    def __init__(self, max_terms: Optional[int] = None, scan_limit: Optional[int] = None):
+        """
+        Initialize an empty index.
+
+        Args:
+            max_terms: Maximum indexed terms (lightest are evicted)
+            scan_limit: Maximum matches examined per lookup; bounds the
+                cost of very short prefixes
+        """
+        cfg = config.search
+        self._max_terms = cfg.suggest_max_terms if max_terms is None else max_terms
+        self._scan_limit = cfg.suggest_scan_limit if scan_limit is None else scan_limit
+
+        self._lock = threading.Lock()
+        self._keys: List[str] = []  # Sorted normalized terms
+        self._weights: Dict[str, float] = {}
+        self._display: Dict[str, str] = {}  # Most recent original spelling
+        self._evictions = 0
+
+    def add(self, term: str, weight: float = 1.0):
+        """
+        Record an observation of a term.
+
+        Args:
+            term: Query or title as the user saw it
+            weight: Popularity added for this observation
+        """
+        if not term:
+            return
+        display = " ".join(term.split())[:self.MAX_TERM_LENGTH]
+        key = normalize_query(display)
+        if len(key) < 2:
+            return
+        with self._lock:
+            if key in self._weights:
+                self._weights[key] += weight
+            else:
+                bisect.insort(self._keys, key)
+                self._weights[key] = weight
+            self._display[key] = display
+            if len(self._keys) > self._max_terms:
+                self._evict()
+
+    def _evict(self):
+        """Drop the lightest tenth so eviction is amortized (lock held)."""
+        keep = self._max_terms - max(1, self._max_terms // 10)
+        survivors = set(heapq.nlargest(keep, self._keys, key=self._weights.__getitem__))
+        self._evictions += len(self._keys) - len(survivors)
+        self._keys = [k for k in self._keys if k in survivors]
+        for key in list(self._weights):
+            if key not in survivors:
+                del self._weights[key]
+                del self._display[key]
+
+    def record_search(self, query: str, results: List[dict]):
+        """Index a searched query and the titles it returned."""
+        self.add(query, self.QUERY_WEIGHT)
+        for item in results:
+            self.add(item.get('title', ''), self.RESULT_WEIGHT)
+
+    def record_play(self, title: str):
+        """Index the title of a resolved (played) track."""
+        self.add(title, self.PLAY_WEIGHT)
+
+    def suggest(self, prefix: str, limit: int = 8) -> List[str]:
+        """
+        Get the most popular terms starting with a prefix.
+
+        Args:
+            prefix: What the user has typed so far
+            limit: Maximum suggestions
+
+        Returns:
+            Terms in their original spelling, most popular first
+        """
+        key = normalize_query(prefix)
+        if not key:
+            return []
+        with self._lock:
+            start = bisect.bisect_left(self._keys, key)
+            end = min(start + self._scan_limit, len(self._keys))
+            matches = []
+            for i in range(start, end):
+                candidate = self._keys[i]
+                if not candidate.startswith(key):
+                    break
+                matches.append(candidate)
+            best = heapq.nlargest(limit, matches, key=self._weights.__getitem__)
+            return [self._display[k] for k in best]
+
+    def stats(self) -> dict:
+        """Get index size."""
+        with self._lock:
+            return {
+                "terms": len(self._keys),
+                "capacity": self._max_terms,
+                "evictions": self._evictions,
+            }
+
+
+# Global suggestion index (fed by search and resolve)
+suggest_index = SuggestIndex()
@@ -1,8 +1,21 @@
 """Pytest configuration and fixtures."""
 
+import os
+
 import pytest
 
 
+# Route tests return canned tracks with real-looking related IDs; keep the
+# background prefetcher from resolving them over the network
+os.environ.setdefault("PREFETCH_ENABLED", "false")
+# Keep catalogued search results out of the real data/ directory
+os.environ.setdefault("CATALOG_DB_PATH", ":memory:")
+# Relay tests must not write audio into the real data/ directory
+os.environ.setdefault("AUDIO_CACHE_ENABLED", "false")
+# App lifespans in route tests must not extract the probe video
+os.environ.setdefault("YTDLP_PREWARM_PLAYER", "false")
+
+
 # Register custom markers
 def pytest_configure(config):
     config.addinivalue_line(
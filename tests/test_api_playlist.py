@@ -0,0 +1,121 @@
+"""Tests for the streaming playlist endpoint."""
+
+import json
+
+import pytest
+from unittest.mock import MagicMock, patch
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+
+
+def read_events(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def make_pager(pages, error=None):
+    pager = MagicMock()
+    pager.id = "PLabc"
+    pager.title = "Mix"
+    pager.uploader = "Someone"
+    pager.count = sum(len(page) for page in pages)
+    pager.skipped = 0
+    pager.truncated = False
+    results = list(pages) + ([error] if error else [[]])
+    pager.next_page.side_effect = results
+    return pager
+
+
+def entry(i):
+    video_id = f"vid{i:08d}"
+    return {
+        "id": video_id,
+        "title": f"Song {i}",
+        "duration": 100,
+        "url": f"https://www.youtube.com/watch?v={video_id}",
+    }
+
+
+class TestPlaylistEndpoint:
+    """Test GET /api/playlist."""
+
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+
+    def test_streams_pages(self, client):
+        pager = make_pager([[entry(0), entry(1)], [entry(2)]])
+        with patch('api.routes.ytdlp_client') as ytdlp:
+            ytdlp.open_playlist.return_value = pager
+            response = client.get(
+                "/api/playlist",
+                params={"url": "https://www.youtube.com/playlist?list=PLabc"}
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        events = read_events(response)
+        assert [e["event"] for e in events] == ["playlist", "entries", "entries", "done"]
+        assert events[0]["title"] == "Mix"
+        assert [e["id"] for e in events[1]["entries"]] == ["vid00000000", "vid00000001"]
+        assert events[3]["count"] == 3
+        pager.close.assert_called_once()
+
+    def test_entries_are_not_resolved(self, client):
+        pager = make_pager([[entry(0)]])
+        with patch('api.routes.ytdlp_client') as ytdlp, \
+                patch('api.routes.extraction_manager') as manager:
+            ytdlp.open_playlist.return_value = pager
+            client.get(
+                "/api/playlist",
+                params={"url": "https://www.youtube.com/playlist?list=PLabc"}
+            )
+
+        manager.extract.assert_not_called()
+        manager.extract_metadata.assert_not_called()
+
+    def test_limit_is_passed(self, client):
+        with patch('api.routes.ytdlp_client') as ytdlp:
+            ytdlp.open_playlist.return_value = make_pager([])
+            client.get(
+                "/api/playlist",
+                params={"url": "https://www.youtube.com/@artist", "limit": 25}
+            )
+
+        assert ytdlp.open_playlist.call_args.args[2] == 25
+
+    def test_invalid_url(self, client):
+        response = client.get(
+            "/api/playlist",
+            params={"url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ"}
+        )
+        assert response.status_code == 400
+
+    def test_unavailable_playlist(self, client):
+        with patch('api.routes.ytdlp_client') as ytdlp:
+            ytdlp.open_playlist.side_effect = ValueError("Failed to load playlist: gone")
+            response = client.get(
+                "/api/playlist",
+                params={"url": "https://www.youtube.com/playlist?list=PLgone"}
+            )
+
+        assert response.status_code == 400
+        assert "gone" in response.json()["detail"]
+
+    def test_error_while_paging(self, client):
+        pager = make_pager([[entry(0)]], error=ValueError("Failed to page playlist: boom"))
+        with patch('api.routes.ytdlp_client') as ytdlp:
+            ytdlp.open_playlist.return_value = pager
+            response = client.get(
+                "/api/playlist",
+                params={"url": "https://www.youtube.com/playlist?list=PLabc"}
+            )
+
+        events = read_events(response)
+        assert [e["event"] for e in events] == ["playlist", "entries", "error"]
+        assert "boom" in events[-1]["detail"]
+        pager.close.assert_called_once()
@@ -0,0 +1,118 @@
+"""Tests for the batch resolve endpoint."""
+
+import threading
+import time
+
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from extraction_backends import BackendType, ExtractionResult, TrackInfo
+
+
+def fake_extract(url, prefer_backend=None):
+    """Resolve any URL whose ID does not start with 'bad'."""
+    video_id = url.rsplit('=', 1)[-1]
+    if video_id.startswith('bad'):
+        return ExtractionResult(success=False, error="blocked")
+    track = TrackInfo(
+        id=video_id,
+        title=f"Track {video_id}",
+        duration=120,
+        audio_url=f"https://example.com/{video_id}.webm",
+        backend=BackendType.YT_DLP,
+        embed_url=f"https://www.youtube.com/embed/{video_id}",
+    )
+    return ExtractionResult(success=True, track=track, backend_used=BackendType.YT_DLP)
+
+
+class TestBatchResolve:
+    """Test POST /api/resolve/batch."""
+
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+
+    @pytest.fixture
+    def extract(self):
+        with patch('api.routes.extraction_manager.extract', side_effect=fake_extract) as mock:
+            yield mock
+
+    def test_resolves_items_in_order(self, client, extract):
+        response = client.post('/api/resolve/batch', json={'urls': [
+            'https://youtube.com/watch?v=aaaaaaaaaaa',
+            'bbbbbbbbbbb',
+            'https://youtu.be/ccccccccccc',
+        ]})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [item['id'] for item in data['results']] == [
+            'aaaaaaaaaaa', 'bbbbbbbbbbb', 'ccccccccccc'
+        ]
+        assert all(item['success'] for item in data['results'])
+        assert data['results'][1]['track']['title'] == 'Track bbbbbbbbbbb'
+        assert data['resolved'] == 3
+
+    def test_duplicates_resolved_once(self, client, extract):
+        response = client.post('/api/resolve/batch', json={'urls': [
+            'https://youtube.com/watch?v=aaaaaaaaaaa',
+            'https://youtu.be/aaaaaaaaaaa',
+            'aaaaaaaaaaa',
+        ]})
+
+        assert response.status_code == 200
+        assert len(response.json()['results']) == 3
+        assert extract.call_count == 1
+
+    def test_per_item_errors(self, client, extract):
+        response = client.post('/api/resolve/batch', json={'urls': [
+            'https://google.com',
+            'badbadbadba',
+            'aaaaaaaaaaa',
+        ]})
+
+        data = response.json()
+        assert response.status_code == 200
+        assert data['results'][0]['success'] is False
+        assert 'Invalid YouTube URL' in data['results'][0]['error']
+        assert data['results'][1]['success'] is False
+        assert 'blocked' in data['results'][1]['error']
+        assert data['results'][2]['success'] is True
+        assert data['resolved'] == 1
+        assert data['failed'] == 2
+
+    def test_items_resolve_concurrently(self, client):
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def slow_extract(url, prefer_backend=None):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.05)
+            with lock:
+                state["active"] -= 1
+            return fake_extract(url)
+
+        urls = [f"video{i:06d}" for i in range(6)]
+        with patch('api.routes.extraction_manager.extract', side_effect=slow_extract):
+            response = client.post('/api/resolve/batch', json={'urls': urls})
+
+        assert response.json()['resolved'] == 6
+        assert state["peak"] > 1
+
+    def test_empty_batch_rejected(self, client):
+        response = client.post('/api/resolve/batch', json={'urls': []})
+        assert response.status_code == 422
+
+    def test_oversized_batch_rejected(self, client):
+        from config import config
+        urls = ['aaaaaaaaaaa'] * (config.server.batch_max_items + 1)
+        response = client.post('/api/resolve/batch', json={'urls': urls})
+        assert response.status_code == 422
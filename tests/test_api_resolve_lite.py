@@ -0,0 +1,102 @@
+"""Tests for the lite (embed-only) resolve mode."""
+
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from extraction_backends import BackendType, ExtractionResult, TrackInfo
+
+
+METADATA = ExtractionResult(
+    success=True,
+    backend_used=BackendType.YT_DLP,
+    track=TrackInfo(
+        id="dQw4w9WgXcQ",
+        title="Metadata Only",
+        duration=212,
+        audio_url="",
+        backend=BackendType.YT_DLP,
+        embed_url="https://www.youtube.com/embed/dQw4w9WgXcQ",
+        invidious_url="https://yewtu.be/embed/dQw4w9WgXcQ",
+    ),
+)
+
+
+class TestLiteResolve:
+    """Test POST /api/resolve?mode=lite."""
+
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+
+    @pytest.fixture
+    def manager(self):
+        with patch('api.routes.extraction_manager') as manager:
+            manager.extract_metadata.return_value = METADATA
+            yield manager
+
+    def test_query_param_skips_full_extraction(self, client, manager):
+        response = client.post('/api/resolve?mode=lite', json={
+            'url': 'https://youtu.be/dQw4w9WgXcQ'
+        })
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['title'] == 'Metadata Only'
+        assert data['embed_url'] == 'https://www.youtube.com/embed/dQw4w9WgXcQ'
+        assert data['audio_url'] == ''
+        manager.extract_metadata.assert_called_once_with('https://youtu.be/dQw4w9WgXcQ')
+        manager.extract.assert_not_called()
+
+    def test_header_selects_lite(self, client, manager):
+        response = client.post(
+            '/api/resolve',
+            json={'url': 'https://youtu.be/dQw4w9WgXcQ'},
+            headers={'X-Resolve-Mode': 'lite'}
+        )
+
+        assert response.status_code == 200
+        manager.extract.assert_not_called()
+
+    def test_default_is_full(self, client, manager):
+        manager.extract.return_value = METADATA
+
+        client.post('/api/resolve', json={'url': 'https://youtu.be/dQw4w9WgXcQ'})
+
+        manager.extract.assert_called_once()
+        manager.extract_metadata.assert_not_called()
+
+    def test_query_param_overrides_header(self, client, manager):
+        manager.extract.return_value = METADATA
+
+        client.post(
+            '/api/resolve?mode=full',
+            json={'url': 'https://youtu.be/dQw4w9WgXcQ'},
+            headers={'X-Resolve-Mode': 'lite'}
+        )
+
+        manager.extract.assert_called_once()
+
+    def test_invalid_mode(self, client, manager):
+        response = client.post('/api/resolve?mode=turbo', json={
+            'url': 'https://youtu.be/dQw4w9WgXcQ'
+        })
+        assert response.status_code == 422
+
+    def test_invalid_url(self, client, manager):
+        response = client.post('/api/resolve?mode=lite', json={'url': 'https://vimeo.com/1'})
+        assert response.status_code == 400
+        manager.extract_metadata.assert_not_called()
+
+    def test_extraction_failure(self, client, manager):
+        manager.extract_metadata.return_value = ExtractionResult(success=False, error="blocked")
+        response = client.post('/api/resolve?mode=lite', json={
+            'url': 'https://youtu.be/dQw4w9WgXcQ'
+        })
+        assert response.status_code == 500
+        assert 'blocked' in response.json()['detail']
@@ -0,0 +1,120 @@
+"""Tests for the progressive NDJSON resolve endpoint."""
+
+import json
+import threading
+
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from extraction_backends import BackendType, ExtractionResult, TrackInfo
+
+
+def make_track(audio_url="https://rr1.googlevideo.com/videoplayback?expire=1700000000"):
+    return TrackInfo(
+        id="abc123defgh",
+        title="Progressive",
+        duration=200,
+        audio_url=audio_url,
+        backend=BackendType.YT_DLP,
+        related=[{"id": "rel00000001", "title": "Next", "duration": 100}],
+        embed_url="https://www.youtube.com/embed/abc123defgh",
+        invidious_url="https://yewtu.be/embed/abc123defgh",
+        expires_at=1700000000 if audio_url else None,
+    )
+
+
+def read_events(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+class TestProgressiveResolve:
+    """Test POST /api/resolve/stream."""
+
+    @pytest.fixture
+    def client(self):
+        with patch('api.routes.extraction_manager.cached_metadata', return_value=None):
+            yield TestClient(app)
+
+    def test_metadata_arrives_before_stream(self, client):
+        """Metadata is emitted while the full extraction is still running."""
+        release = threading.Event()
+        metadata_sent = threading.Event()
+
+        def full_extract(url, prefer_backend=None):
+            # Only finish once metadata has already been produced
+            assert metadata_sent.wait(1)
+            release.wait(0.05)
+            return ExtractionResult(success=True, track=make_track())
+
+        def metadata_extract(url):
+            metadata_sent.set()
+            return ExtractionResult(success=True, track=make_track(audio_url=""))
+
+        with patch('api.routes.extraction_manager.extract', side_effect=full_extract), \
+                patch('api.routes.extraction_manager.extract_metadata', side_effect=metadata_extract):
+            response = client.post('/api/resolve/stream', json={
+                'url': 'https://youtube.com/watch?v=abc123defgh'
+            })
+
+        assert response.status_code == 200
+        assert response.headers['content-type'].startswith('application/x-ndjson')
+        events = read_events(response)
+        assert [e['event'] for e in events] == ['metadata', 'stream', 'related', 'done']
+        assert events[0]['title'] == 'Progressive'
+        assert events[0]['embed_url'] == 'https://www.youtube.com/embed/abc123defgh'
+        assert 'audio_url' not in events[0]
+        assert events[1]['audio_url'].startswith('https://rr1.googlevideo.com')
+        assert events[1]['expires_at'] == 1700000000
+        assert events[2]['related'][0]['id'] == 'rel00000001'
+
+    def test_metadata_from_full_extraction_when_metadata_fails(self, client):
+        with patch('api.routes.extraction_manager.extract',
+                   return_value=ExtractionResult(success=True, track=make_track())), \
+                patch('api.routes.extraction_manager.extract_metadata',
+                      return_value=ExtractionResult(success=False, error="nope")):
+            response = client.post('/api/resolve/stream', json={
+                'url': 'https://youtu.be/abc123defgh'
+            })
+
+        events = read_events(response)
+        assert [e['event'] for e in events] == ['metadata', 'stream', 'related', 'done']
+
+    def test_error_event_when_extraction_fails(self, client):
+        with patch('api.routes.extraction_manager.extract',
+                   return_value=ExtractionResult(success=False, error="blocked")), \
+                patch('api.routes.extraction_manager.extract_metadata',
+                      return_value=ExtractionResult(success=True, track=make_track(audio_url=""))):
+            response = client.post('/api/resolve/stream', json={
+                'url': 'https://youtu.be/abc123defgh'
+            })
+
+        events = read_events(response)
+        assert events[0]['event'] == 'metadata'
+        assert events[-1]['event'] == 'error'
+        assert 'blocked' in events[-1]['detail']
+
+    def test_cached_metadata_skips_metadata_extraction(self, client):
+        """A cached track costs one extraction at most, not two."""
+        with patch('api.routes.extraction_manager.cached_metadata',
+                   return_value=make_track(audio_url="")), \
+                patch('api.routes.extraction_manager.extract',
+                      return_value=ExtractionResult(success=True, track=make_track())), \
+                patch('api.routes.extraction_manager.extract_metadata') as metadata_extract:
+            response = client.post('/api/resolve/stream', json={
+                'url': 'https://youtu.be/abc123defgh'
+            })
+
+        events = read_events(response)
+        assert [e['event'] for e in events] == ['metadata', 'stream', 'related', 'done']
+        assert events[0]['title'] == 'Progressive'
+        metadata_extract.assert_not_called()
+
+    def test_invalid_url_rejected(self, client):
+        response = client.post('/api/resolve/stream', json={'url': 'https://google.com'})
+        assert response.status_code == 400
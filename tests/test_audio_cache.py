@@ -0,0 +1,306 @@
+"""Tests for the on-disk audio cache and the relay filling it."""
+
+import asyncio
+import os
+import threading
+import time
+
+import httpx
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from audio_cache import AudioCache, parse_range
+from audio_proxy import AudioRelay
+
+
+AUDIO = bytes(range(256)) * 40  # 10240 bytes
+VIDEO_ID = "dQw4w9WgXcQ"
+STREAM_URL = "https://gv.test/videoplayback?itag=251"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AudioCache(directory=str(tmp_path), max_bytes=1 << 20, play_bonus=3600)
+
+
+def fill_bytes(cache, video_id, data, total=None, offset=0, fmt="251"):
+    fill = cache.start_fill(video_id, fmt, "audio/webm", total or len(data), offset)
+    assert fill is not None
+    fill.write(data)
+    fill.close()
+
+
+def upstream():
+    """Mock googlevideo with Range support; records request Range headers."""
+    ranges = []
+
+    def handler(request):
+        byte_range = request.headers.get("range")
+        ranges.append(byte_range)
+        headers = {"content-type": "audio/webm", "accept-ranges": "bytes"}
+        if not byte_range:
+            data, status = AUDIO, 200
+        else:
+            start, end = parse_range(byte_range)
+            end = len(AUDIO) - 1 if end is None else end
+            data, status = AUDIO[start:end + 1], 206
+            headers["content-range"] = f"bytes {start}-{end}/{len(AUDIO)}"
+        headers["content-length"] = str(len(data))
+        return httpx.Response(status, headers=headers, stream=httpx.ByteStream(data))
+
+    return httpx.MockTransport(handler), ranges
+
+
+def make_relay(cache):
+    transport, ranges = upstream()
+
+    async def resolve(video_id, stale_url):
+        return STREAM_URL
+
+    relay = AudioRelay(resolve, chunk_size=1024, transport=transport, cache=cache)
+    return relay, ranges
+
+
+async def read(relay, headers, stop_after=None):
+    """Relay a request; stop_after simulates the client hanging up."""
+    stream = await relay.stream(VIDEO_ID, headers)
+    chunks = []
+    async for chunk in stream.body:
+        chunks.append(chunk)
+        if stop_after is not None and len(chunks) >= stop_after:
+            break
+    await stream.body.aclose()
+    return stream, b"".join(chunks)
+
+
+class TestParseRange:
+    """Range header parsing."""
+
+    @pytest.mark.parametrize("value,expected", [
+        ("bytes=0-", (0, None)),
+        ("bytes=100-199", (100, 199)),
+        ("bytes=-500", None),
+        ("bytes=0-1,5-9", None),
+        ("bytes=9-1", None),
+        ("items=0-1", None),
+    ])
+    def test_parse(self, value, expected):
+        assert parse_range(value) == expected
+
+
+class TestAudioCache:
+    """Files, budget and index."""
+
+    def test_complete_fill_is_renamed_into_place(self, cache, tmp_path):
+        fill_bytes(cache, VIDEO_ID, AUDIO)
+        entry = cache.lookup(VIDEO_ID)
+        assert entry.complete
+        assert entry.path == str(tmp_path / f"{VIDEO_ID}-251")
+        assert open(entry.path, "rb").read() == AUDIO
+        assert not os.path.exists(entry.path + ".part")
+        stats = cache.stats()
+        assert stats["files"] == 1
+        assert stats["bytes"] == len(AUDIO)
+        assert stats["hits"] == 1
+
+    def test_partial_fill_is_resumable(self, cache):
+        fill_bytes(cache, VIDEO_ID, AUDIO[:4000], total=len(AUDIO))
+        assert cache.lookup(VIDEO_ID) is None
+        part = cache.partial(VIDEO_ID)
+        assert (part.size, part.total, part.complete) == (4000, len(AUDIO), False)
+
+        fill_bytes(cache, VIDEO_ID, AUDIO[4000:], total=len(AUDIO), offset=4000)
+        entry = cache.lookup(VIDEO_ID)
+        assert open(entry.path, "rb").read() == AUDIO
+        assert cache.stats()["resumed_fills"] == 1
+
+    def test_resume_needs_recorded_prefix(self, cache):
+        fill_bytes(cache, VIDEO_ID, AUDIO[:4000], total=len(AUDIO))
+        assert cache.start_fill(VIDEO_ID, "251", "audio/webm", len(AUDIO), 3000) is None
+        assert cache.start_fill(VIDEO_ID, "251", "audio/webm", 999, 4000) is None
+
+    def test_one_fill_per_file(self, cache):
+        fill = cache.start_fill(VIDEO_ID, "251", "audio/webm", len(AUDIO))
+        assert cache.start_fill(VIDEO_ID, "251", "audio/webm", len(AUDIO)) is None
+        assert cache.partial(VIDEO_ID) is None
+        fill.close()
+        assert cache.partial(VIDEO_ID) is not None
+
+    def test_too_large_for_budget(self, tmp_path):
+        cache = AudioCache(directory=str(tmp_path), max_bytes=100)
+        assert cache.start_fill(VIDEO_ID, "251", "audio/webm", 101) is None
+
+    def test_concurrent_fills_reserve_budget(self, tmp_path):
+        cache = AudioCache(directory=str(tmp_path), max_bytes=250)
+        first = cache.start_fill("aaaaaaaaaaa", "251", "audio/webm", 150)
+        assert cache.start_fill("bbbbbbbbbbb", "251", "audio/webm", 150) is None
+        assert cache.stats()["reserved_bytes"] == 150
+        first.write(b"x" * 150)
+        first.close()
+        assert cache.stats()["reserved_bytes"] == 0
+
+    def test_run_uses_io_threads(self, cache):
+        name = asyncio.run(cache.run(lambda: threading.current_thread().name))
+        assert name.startswith("audio-cache")
+
+    def test_fill_of_cancelled_request_is_closed(self, cache):
+        def slow_start_fill():
+            time.sleep(0.05)
+            return cache.start_fill(VIDEO_ID, "251", "audio/webm", len(AUDIO))
+
+        async def scenario():
+            task = asyncio.ensure_future(cache.run(slow_start_fill))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            await asyncio.sleep(0.2)
+
+        asyncio.run(scenario())
+        # The orphaned fill was closed, so the key can be filled again
+        assert cache.start_fill(VIDEO_ID, "251", "audio/webm", len(AUDIO)) is not None
+
+    def test_evicts_lowest_score(self, tmp_path):
+        clock = FakeClock()
+        cache = AudioCache(directory=str(tmp_path), max_bytes=250, play_bonus=100, clock=clock)
+        ids = ["aaaaaaaaaaa", "bbbbbbbbbbb", "ccccccccccc"]
+        for i, video_id in enumerate(ids[:2]):
+            clock.now += 10
+            fill_bytes(cache, video_id, b"x" * 100)
+        # The older track is played: its bonus outweighs its age
+        clock.now += 10
+        cache.lookup(ids[0])
+
+        clock.now += 10
+        fill_bytes(cache, ids[2], b"x" * 100)
+
+        assert cache.lookup(ids[0]) is not None
+        assert cache.lookup(ids[1]) is None
+        assert cache.lookup(ids[2]) is not None
+        assert cache.stats()["evictions"] == 1
+        assert not os.path.exists(tmp_path / f"{ids[1]}-251")
+
+    def test_reconciles_index_with_files(self, tmp_path):
+        cache = AudioCache(directory=str(tmp_path), max_bytes=1 << 20)
+        fill_bytes(cache, VIDEO_ID, AUDIO[:4000], total=len(AUDIO))
+        fill_bytes(cache, "aaaaaaaaaaa", AUDIO)
+        cache.close()
+
+        # A crash left more bytes in the .part; a completed file vanished
+        with open(tmp_path / f"{VIDEO_ID}-251.part", "ab") as f:
+            f.write(AUDIO[4000:5000])
+        os.remove(tmp_path / "aaaaaaaaaaa-251")
+        (tmp_path / "bbbbbbbbbbb-251.part").write_bytes(b"orphan")
+        (tmp_path / "notes.txt").write_text("not ours")
+
+        cache = AudioCache(directory=str(tmp_path), max_bytes=1 << 20)
+        assert cache.partial(VIDEO_ID).size == 5000
+        assert cache.lookup("aaaaaaaaaaa") is None
+        assert not (tmp_path / "bbbbbbbbbbb-251.part").exists()
+        assert (tmp_path / "notes.txt").exists()
+
+
+class TestRelayFill:
+    """The relay writes what it streams into the cache."""
+
+    def test_full_play_fills_cache(self, cache):
+        relay, ranges = make_relay(cache)
+        stream, data = asyncio.run(read(relay, {"Range": "bytes=0-"}))
+        assert stream.status_code == 206
+        assert stream.headers["content-range"] == f"bytes 0-{len(AUDIO) - 1}/{len(AUDIO)}"
+        assert data == AUDIO
+        entry = cache.lookup(VIDEO_ID)
+        assert entry.fmt == "251"
+        assert open(entry.path, "rb").read() == AUDIO
+
+    def test_no_range_header_is_200(self, cache):
+        relay, _ = make_relay(cache)
+        stream, data = asyncio.run(read(relay, {}))
+        assert stream.status_code == 200
+        assert "content-range" not in stream.headers
+        assert stream.headers["content-length"] == str(len(AUDIO))
+        assert data == AUDIO
+
+    def test_interrupted_play_resumes(self, cache):
+        relay, ranges = make_relay(cache)
+        asyncio.run(read(relay, {"Range": "bytes=0-"}, stop_after=3))
+        part = cache.partial(VIDEO_ID)
+        assert part.size == 3072
+
+        stream, data = asyncio.run(read(relay, {"Range": "bytes=0-"}))
+        assert data == AUDIO
+        # Only the missing tail was fetched upstream
+        assert ranges[-1] == "bytes=3072-"
+        assert open(cache.lookup(VIDEO_ID).path, "rb").read() == AUDIO
+        assert cache.stats()["resumed_fills"] == 1
+
+    def test_range_inside_prefix_served_from_disk(self, cache):
+        relay, ranges = make_relay(cache)
+        asyncio.run(read(relay, {"Range": "bytes=0-"}, stop_after=3))
+        calls = len(ranges)
+
+        stream, data = asyncio.run(read(relay, {"Range": "bytes=100-199"}))
+        assert data == AUDIO[100:200]
+        assert stream.headers["content-range"] == f"bytes 100-199/{len(AUDIO)}"
+        assert len(ranges) == calls
+
+    def test_seek_past_prefix_is_relayed_without_fill(self, cache):
+        relay, ranges = make_relay(cache)
+        stream, data = asyncio.run(read(relay, {"Range": "bytes=5000-5099"}))
+        assert data == AUDIO[5000:5100]
+        assert ranges == ["bytes=5000-5099"]
+        assert cache.partial(VIDEO_ID) is None
+        assert cache.stats()["fills"] == 0
+
+
+class TestStreamEndpointCache:
+    """GET /api/stream serves complete files from disk."""
+
+    def test_cached_file_with_range(self, cache):
+        fill_bytes(cache, VIDEO_ID, AUDIO)
+        client = TestClient(app)
+        with patch('api.routes.audio_cache', cache), \
+                patch('api.routes.audio_relay', make_relay(cache)[0]):
+            response = client.get(f"/api/stream/{VIDEO_ID}", headers={"Range": "bytes=10-19"})
+        assert response.status_code == 206
+        assert response.content == AUDIO[10:20]
+        assert response.headers["content-range"] == f"bytes 10-19/{len(AUDIO)}"
+        assert response.headers["content-type"] == "audio/webm"
+
+    def test_only_requests_from_start_count_as_plays(self, cache):
+        fill_bytes(cache, VIDEO_ID, AUDIO)
+        client = TestClient(app)
+        with patch('api.routes.audio_cache', cache), \
+                patch('api.routes.audio_relay', make_relay(cache)[0]):
+            client.get(f"/api/stream/{VIDEO_ID}", headers={"Range": "bytes=0-"})
+            # Seeking and chunked reads within the same listen
+            for byte_range in ("bytes=4096-", "bytes=100-199", "bytes=-500"):
+                response = client.get(f"/api/stream/{VIDEO_ID}", headers={"Range": byte_range})
+                assert response.status_code == 206
+        plays = cache._db().execute("SELECT plays FROM audio").fetchone()[0]
+        assert plays == 1
+        assert cache.stats()["hits"] == 4
+
+    def test_miss_relays_and_fills(self, cache):
+        client = TestClient(app)
+        relay, ranges = make_relay(cache)
+        with patch('api.routes.audio_cache', cache), patch('api.routes.audio_relay', relay):
+            first = client.get(f"/api/stream/{VIDEO_ID}")
+            second = client.get(f"/api/stream/{VIDEO_ID}")
+        assert first.content == AUDIO
+        assert second.content == AUDIO
+        assert len(ranges) == 1
+        assert cache.stats()["hits"] == 1
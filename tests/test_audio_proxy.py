@@ -0,0 +1,216 @@
+"""Tests for the Range-aware audio relay."""
+
+import asyncio
+import threading
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from audio_proxy import AudioRelay, UpstreamError, resolve_stream_url
+from extraction_backends import ExtractionResult, TrackInfo
+
+
+AUDIO = bytes(range(256)) * 40  # 10240 bytes
+VIDEO_ID = "dQw4w9WgXcQ"
+
+
+def reply(status, headers, data=b""):
+    """Unread response, so the relay streams it like a real one."""
+    headers = dict(headers, **{"content-length": str(len(data))})
+    return httpx.Response(status, headers=headers, stream=httpx.ByteStream(data))
+
+
+def upstream(expired=()):
+    """Mock googlevideo: serves AUDIO with Range support; expired URLs 403."""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if str(request.url) in expired:
+            return reply(403, {})
+        byte_range = request.headers.get("range")
+        headers = {"content-type": "audio/webm", "accept-ranges": "bytes"}
+        if not byte_range:
+            return reply(200, headers, AUDIO)
+        start, _, end = byte_range.removeprefix("bytes=").partition("-")
+        start = int(start)
+        if start >= len(AUDIO):
+            return reply(416, {"content-range": f"bytes */{len(AUDIO)}"})
+        end = int(end) if end else len(AUDIO) - 1
+        headers["content-range"] = f"bytes {start}-{end}/{len(AUDIO)}"
+        return reply(206, headers, AUDIO[start:end + 1])
+
+    return httpx.MockTransport(handler), seen
+
+
+def make_relay(urls, expired=(), chunk_size=1024):
+    """Relay whose resolver hands out urls in order (recording stale URLs)."""
+    transport, seen = upstream(expired)
+    resolves = []
+
+    async def resolve(video_id, stale_url):
+        resolves.append((video_id, stale_url))
+        return urls[len(resolves) - 1]
+
+    relay = AudioRelay(resolve, chunk_size=chunk_size, timeout=5, max_connections=4,
+                       transport=transport)
+    return relay, resolves, seen
+
+
+async def relay_all(relay, headers):
+    response = await relay.open(VIDEO_ID, headers)
+    chunks = [chunk async for chunk in relay.iter_body(response)]
+    return response, chunks
+
+
+class TestAudioRelay:
+    """Relay behaviour against a mock upstream."""
+
+    def test_full_response_streamed_in_chunks(self):
+        relay, _, _ = make_relay(["https://gv.test/a"])
+        response, chunks = asyncio.run(relay_all(relay, {}))
+        assert response.status_code == 200
+        assert b"".join(chunks) == AUDIO
+        assert len(chunks) == 10
+        assert relay.stats()["bytes_relayed"] == len(AUDIO)
+        assert relay.stats()["active"] == 0
+
+    def test_range_forwarded(self):
+        relay, _, seen = make_relay(["https://gv.test/a"])
+        response, chunks = asyncio.run(relay_all(relay, {"Range": "bytes=100-199"}))
+        assert response.status_code == 206
+        assert b"".join(chunks) == AUDIO[100:200]
+        assert seen[0].headers["range"] == "bytes=100-199"
+        headers = relay.response_headers(response)
+        assert headers["content-range"] == f"bytes 100-199/{len(AUDIO)}"
+        assert headers["content-length"] == "100"
+        assert headers["accept-ranges"] == "bytes"
+
+    def test_unsatisfiable_range_passed_through(self):
+        relay, _, _ = make_relay(["https://gv.test/a"])
+        response, chunks = asyncio.run(relay_all(relay, {"Range": "bytes=999999-"}))
+        assert response.status_code == 416
+        assert b"".join(chunks) == b""
+
+    def test_reresolves_once_on_403(self):
+        relay, resolves, seen = make_relay(
+            ["https://gv.test/old", "https://gv.test/new"], expired={"https://gv.test/old"}
+        )
+        response, chunks = asyncio.run(relay_all(relay, {"Range": "bytes=0-9"}))
+        assert response.status_code == 206
+        assert b"".join(chunks) == AUDIO[:10]
+        assert resolves == [(VIDEO_ID, None), (VIDEO_ID, "https://gv.test/old")]
+        assert [str(r.url) for r in seen] == ["https://gv.test/old", "https://gv.test/new"]
+        assert seen[1].headers["range"] == "bytes=0-9"
+        assert relay.stats()["reresolves"] == 1
+
+    def test_fresh_url_rejected_too(self):
+        relay, resolves, _ = make_relay(
+            ["https://gv.test/old", "https://gv.test/new"],
+            expired={"https://gv.test/old", "https://gv.test/new"}
+        )
+        with pytest.raises(UpstreamError, match="403"):
+            asyncio.run(relay.open(VIDEO_ID, {}))
+        assert len(resolves) == 2
+        assert relay.stats()["upstream_errors"] == 1
+
+    def test_connection_error(self):
+        def handler(request):
+            raise httpx.ConnectError("refused")
+
+        async def resolve(video_id, stale_url):
+            return "https://gv.test/a"
+
+        relay = AudioRelay(resolve, transport=httpx.MockTransport(handler))
+        with pytest.raises(UpstreamError, match="refused"):
+            asyncio.run(relay.open(VIDEO_ID, {}))
+
+
+class TestResolveStreamUrl:
+    """Resolution through the extraction manager."""
+
+    def track(self, audio_url):
+        return ExtractionResult(success=True, track=TrackInfo(
+            id=VIDEO_ID, title="T", duration=1, audio_url=audio_url
+        ))
+
+    @patch('audio_proxy.extraction_manager')
+    def test_stale_cached_url_invalidated(self, mock_manager):
+        mock_manager.extract.side_effect = [self.track("https://old"), self.track("https://new")]
+        assert asyncio.run(resolve_stream_url(VIDEO_ID, "https://old")) == "https://new"
+        mock_manager.cache.invalidate.assert_called_once_with(VIDEO_ID)
+
+    @patch('audio_proxy.extraction_manager')
+    def test_invalidate_runs_off_event_loop(self, mock_manager):
+        # The track cache lock and SQLite DELETE must not stall the loop
+        threads = []
+        mock_manager.cache.invalidate.side_effect = lambda video_id: threads.append(
+            threading.current_thread()
+        )
+        mock_manager.extract.side_effect = [self.track("https://old"), self.track("https://new")]
+        asyncio.run(resolve_stream_url(VIDEO_ID, "https://old"))
+        assert threads and threads[0] is not threading.main_thread()
+
+    @patch('audio_proxy.extraction_manager')
+    def test_already_refreshed_url_kept(self, mock_manager):
+        # Another request re-extracted first: no second extraction
+        mock_manager.extract.return_value = self.track("https://new")
+        assert asyncio.run(resolve_stream_url(VIDEO_ID, "https://old")) == "https://new"
+        mock_manager.cache.invalidate.assert_not_called()
+        assert mock_manager.extract.call_count == 1
+
+    @patch('audio_proxy.extraction_manager')
+    def test_failure_raises(self, mock_manager):
+        mock_manager.extract.return_value = ExtractionResult(success=False, error="boom")
+        with pytest.raises(ValueError, match="boom"):
+            asyncio.run(resolve_stream_url(VIDEO_ID))
+
+
+class TestStreamEndpoint:
+    """GET /api/stream/{video_id}."""
+
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+
+    def test_partial_content(self, client):
+        relay, _, _ = make_relay(["https://gv.test/a"])
+        with patch('api.routes.audio_relay', relay):
+            response = client.get(f"/api/stream/{VIDEO_ID}", headers={"Range": "bytes=10-19"})
+        assert response.status_code == 206
+        assert response.content == AUDIO[10:20]
+        assert response.headers["content-range"] == f"bytes 10-19/{len(AUDIO)}"
+        assert response.headers["content-type"] == "audio/webm"
+        assert response.headers["x-accel-buffering"] == "no"
+
+    def test_full_content(self, client):
+        relay, _, _ = make_relay(["https://gv.test/a"])
+        with patch('api.routes.audio_relay', relay):
+            response = client.get(f"/api/stream/{VIDEO_ID}")
+        assert response.status_code == 200
+        assert response.content == AUDIO
+        assert response.headers["content-length"] == str(len(AUDIO))
+
+    def test_invalid_id(self, client):
+        response = client.get("/api/stream/not-an-id")
+        assert response.status_code == 400
+
+    def test_resolve_failure_is_bad_gateway(self, client):
+        relay = MagicMock()
+        relay.stream = AsyncMock(side_effect=ValueError("Extraction failed: unavailable"))
+        with patch('api.routes.audio_relay', relay):
+            response = client.get(f"/api/stream/{VIDEO_ID}")
+        assert response.status_code == 502
+        assert "unavailable" in response.json()["detail"]
+
+    def test_disabled(self, client):
+        with patch('api.routes.audio_relay', None):
+            response = client.get(f"/api/stream/{VIDEO_ID}")
+        assert response.status_code == 404
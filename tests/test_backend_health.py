@@ -0,0 +1,143 @@
+"""Tests for backend health tracking and circuit breakers."""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend_health import BackendHealth, CLOSED, HALF_OPEN, OPEN
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def health(clock):
+    return BackendHealth(
+        alpha=0.5, failure_threshold=3, open_seconds=30, min_samples=2, clock=clock
+    )
+
+
+class TestEWMA:
+    """Test latency and error-rate tracking."""
+
+    def test_first_sample_seeds_average(self, health):
+        health.record_success("a", 2.0)
+        stats = health.stats()["a"]
+        assert stats["latency_ms"] == 2000.0
+        assert stats["error_rate"] == 0.0
+
+    def test_averages_move_toward_new_samples(self, health):
+        health.record_success("a", 2.0)
+        health.record_failure("a", 4.0)
+        stats = health.stats()["a"]
+        assert stats["latency_ms"] == 3000.0
+        assert stats["error_rate"] == 0.5
+
+
+class TestOrdering:
+    """Test dynamic backend ordering."""
+
+    def test_static_order_until_enough_samples(self, health):
+        health.record_success("b", 0.1)
+        health.record_success("b", 0.1)
+        health.record_success("a", 5.0)
+        assert health.order(["a", "b"]) == ["a", "b"]
+
+    def test_sorted_by_expected_cost(self, health):
+        for _ in range(2):
+            health.record_success("a", 5.0)
+            health.record_success("b", 0.5)
+        assert health.order(["a", "b"]) == ["b", "a"]
+
+    def test_error_rate_raises_cost(self, health):
+        for _ in range(2):
+            health.record_success("a", 1.0)
+        health.record_success("b", 0.8)
+        health.record_failure("b", 0.8)
+        health.record_failure("b", 0.8)
+        # b: 0.8s at 75% errors costs more than a: 1.0s always succeeding
+        assert health.order(["a", "b"]) == ["a", "b"]
+
+    def test_open_breaker_goes_last(self, health):
+        for _ in range(3):
+            health.record_failure("a", 0.1)
+        assert health.order(["a", "b"]) == ["b", "a"]
+
+    def test_prefer_goes_first(self, health):
+        assert health.order(["a", "b"], prefer="b") == ["b", "a"]
+
+
+class TestCircuitBreaker:
+    """Test breaker state transitions."""
+
+    def test_opens_after_consecutive_failures(self, health):
+        health.record_failure("a", 1.0)
+        health.record_failure("a", 1.0)
+        assert health.allow("a") is True
+        health.record_failure("a", 1.0)
+
+        assert health.stats()["a"]["state"] == OPEN
+        assert health.is_open("a") is True
+        assert health.allow("a") is False
+        assert health.stats()["a"]["rejected"] == 1
+
+    def test_success_resets_failure_count(self, health):
+        health.record_failure("a", 1.0)
+        health.record_failure("a", 1.0)
+        health.record_success("a", 1.0)
+        health.record_failure("a", 1.0)
+        assert health.stats()["a"]["state"] == CLOSED
+
+    def test_half_open_allows_single_probe(self, health, clock):
+        for _ in range(3):
+            health.record_failure("a", 1.0)
+        clock.now += 30
+
+        assert health.is_open("a") is False
+        assert health.allow("a") is True
+        assert health.stats()["a"]["state"] == HALF_OPEN
+        # Probe in flight: everyone else is still rejected
+        assert health.allow("a") is False
+        assert health.is_open("a") is True
+
+    def test_probe_success_closes(self, health, clock):
+        for _ in range(3):
+            health.record_failure("a", 1.0)
+        clock.now += 30
+        health.allow("a")
+        health.record_success("a", 0.5)
+
+        assert health.stats()["a"]["state"] == CLOSED
+        assert health.allow("a") is True
+
+    def test_probe_failure_reopens(self, health, clock):
+        for _ in range(3):
+            health.record_failure("a", 1.0)
+        clock.now += 30
+        health.allow("a")
+        health.record_failure("a", 1.0)
+
+        stats = health.stats()["a"]
+        assert stats["state"] == OPEN
+        assert stats["opens"] == 2
+        assert health.allow("a") is False
+
+    def test_release_returns_unused_probe(self, health, clock):
+        for _ in range(3):
+            health.record_failure("a", 1.0)
+        clock.now += 30
+        assert health.allow("a") is True
+        health.release("a")
+        assert health.allow("a") is True
@@ -0,0 +1,193 @@
+"""Tests for the local full-text track catalog."""
+
+import sqlite3
+
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from catalog import TrackCatalog, fts_query
+from extraction_backends import BackendType, ExtractionResult, TrackInfo
+
+
+def make_track(video_id="dQw4w9WgXcQ", title="Rick Astley - Never Gonna Give You Up"):
+    return TrackInfo(
+        id=video_id,
+        title=title,
+        duration=213,
+        audio_url="https://example.com/audio",
+        backend=BackendType.YT_DLP
+    )
+
+
+def result(video_id, title, duration=100):
+    return {"id": video_id, "title": title, "duration": duration, "thumbnail": ""}
+
+
+@pytest.fixture
+def catalog():
+    cat = TrackCatalog(db_path=":memory:")
+    yield cat
+    cat.close()
+
+
+class TestCatalogReaders:
+    """Reads on a file database use their own read-only connections."""
+
+    def test_search_does_not_wait_for_writer(self, tmp_path):
+        cat = TrackCatalog(db_path=str(tmp_path / "catalog.db"))
+        cat.add_results([result("vid00000001", "Daft Punk - Around the World")])
+        cat.flush()
+        try:
+            # The writer holds its lock for a whole batch
+            with cat._lock:
+                assert cat.search("daft")[0]["id"] == "vid00000001"
+                assert cat.stats()["entries"] == 1
+        finally:
+            cat.close()
+
+    def test_reader_is_read_only(self, tmp_path):
+        cat = TrackCatalog(db_path=str(tmp_path / "catalog.db"))
+        try:
+            with pytest.raises(sqlite3.OperationalError):
+                cat._reader().execute("DELETE FROM tracks")
+        finally:
+            cat.close()
+
+
+class TestFtsQuery:
+    """Test MATCH expression building."""
+
+    def test_prefix_terms(self):
+        assert fts_query("Daft Punk") == '"daft"* "punk"*'
+
+    def test_operators_are_literal(self):
+        assert fts_query('lofi OR "x" NEAR(') == '"lofi"* "or"* "x"* "near"*'
+
+    def test_no_words(self):
+        assert fts_query("  -- ") is None
+
+
+class TestTrackCatalog:
+    """Test upserts and full-text lookup."""
+
+    def test_search_by_words_and_prefix(self, catalog):
+        catalog.add_results([
+            result("vid00000001", "Daft Punk - Around the World"),
+            result("vid00000002", "Daft Punk - One More Time"),
+            result("vid00000003", "Lofi Girl Radio"),
+        ])
+        catalog.flush()
+
+        ids = {r["id"] for r in catalog.search("daft pun")}
+        assert ids == {"vid00000001", "vid00000002"}
+        assert [r["id"] for r in catalog.search("world daft")] == ["vid00000001"]
+        assert catalog.search("nothing here") == []
+
+    def test_diacritics_folded(self, catalog):
+        catalog.add_results([result("vid00000001", "Beyoncé - Halo")])
+        catalog.flush()
+        assert catalog.search("beyonce")[0]["id"] == "vid00000001"
+
+    def test_upsert_updates_title_and_index(self, catalog):
+        catalog.add_results([result("vid00000001", "Old Title")])
+        catalog.add_results([result("vid00000001", "New Title")])
+        catalog.flush()
+
+        assert catalog.search("old") == []
+        assert catalog.search("new")[0]["title"] == "New Title"
+        assert catalog.stats()["entries"] == 1
+
+    def test_flat_entry_keeps_known_duration(self, catalog):
+        catalog.add_track(make_track())
+        catalog.add_results([result("dQw4w9WgXcQ", "Rick Astley - Never Gonna Give You Up", 0)])
+        catalog.flush()
+        assert catalog.search("rick")[0]["duration"] == 213
+
+    def test_plays_boost_ranking(self, catalog):
+        catalog.add_results([
+            result("vid00000001", "Song Remix"),
+            result("vid00000002", "Song Remix"),
+        ])
+        for _ in range(5):
+            catalog.add_track(make_track("vid00000002", "Song Remix"), played=True)
+        catalog.flush()
+
+        assert catalog.search("song remix")[0]["id"] == "vid00000002"
+
+    def test_prunes_beyond_capacity(self, catalog):
+        small = TrackCatalog(db_path=":memory:", max_entries=10)
+        small.PRUNE_EVERY = 5
+        small.add_results([result(f"vid{i:08d}", f"Track {i}") for i in range(30)])
+        small.flush()
+        assert small.stats()["entries"] <= 10
+        small.close()
+
+    def test_writes_do_not_block_when_queue_full(self):
+        small = TrackCatalog(db_path=":memory:", max_queue=1)
+        small._ensure_writer = lambda: None  # No writer: the queue stays full
+        small.add_results([result("vid00000001", "A"), result("vid00000002", "B")])
+        assert small.stats()["dropped_writes"] == 1
+        small.close()
+
+
+class TestLocalSearchEndpoint:
+    """Test /api/search?source=local."""
+
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+
+    def test_local_hit_skips_youtube(self, client, catalog):
+        catalog.add_results([result("vid00000001", "Daft Punk - Around the World")])
+        catalog.flush()
+        with patch('api.routes.catalog', catalog), \
+                patch('api.routes.search_cache', None), \
+                patch('api.routes.ytdlp_client') as ytdlp:
+            response = client.get('/api/search?q=daft punk&source=local')
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["source"] == "local"
+        assert body["results"][0]["id"] == "vid00000001"
+        ytdlp.search.assert_not_called()
+
+    def test_local_miss_falls_through(self, client, catalog):
+        with patch('api.routes.catalog', catalog), \
+                patch('api.routes.search_cache', None), \
+                patch('api.routes.ytdlp_client') as ytdlp:
+            ytdlp.search.return_value = [result("vid00000009", "Lofi Girl Radio")]
+            response = client.get('/api/search?q=lofi&source=local')
+
+        body = response.json()
+        assert body["source"] == "youtube"
+        assert body["results"][0]["id"] == "vid00000009"
+        # The YouTube answer is catalogued for next time
+        catalog.flush()
+        assert catalog.search("lofi")[0]["id"] == "vid00000009"
+
+    def test_default_source_is_youtube(self, client, catalog):
+        catalog.add_results([result("vid00000001", "Lofi Beats")])
+        catalog.flush()
+        with patch('api.routes.catalog', catalog), \
+                patch('api.routes.search_cache', None), \
+                patch('api.routes.ytdlp_client') as ytdlp:
+            ytdlp.search.return_value = []
+            response = client.get('/api/search?q=lofi')
+
+        assert response.json()["source"] == "youtube"
+        ytdlp.search.assert_called_once()
+
+    def test_resolve_catalogues_played_track(self, client, catalog):
+        with patch('api.routes.catalog', catalog), \
+                patch('api.routes.extraction_manager') as manager:
+            manager.extract.return_value = ExtractionResult(success=True, track=make_track())
+            client.post('/api/resolve', json={"url": "https://youtu.be/dQw4w9WgXcQ"})
+
+        catalog.flush()
+        assert catalog.search("never gonna")[0]["id"] == "dQw4w9WgXcQ"
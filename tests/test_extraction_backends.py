@@ -4,6 +4,8 @@ import pytest
 from unittest.mock import patch, MagicMock
 import sys
 import os
+import threading
+import time
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -56,6 +58,16 @@ class TestTrackInfo:
         )
         
         assert len(track.related) == 1
+    
+    def test_track_info_is_slotted(self):
+        track = TrackInfo(id="abc", title="Test", duration=180, audio_url="url")
+        assert not hasattr(track, '__dict__')
+        with pytest.raises(AttributeError):
+            track.unknown = 1
+    
+    def test_yt_dlp_client_shares_track_info(self):
+        import yt_dlp_client
+        assert yt_dlp_client.TrackInfo is TrackInfo
 
 
 class TestExtractionResult:
@@ -157,29 +169,35 @@ class TestInvidiousExtractionBackend:
         """Should return None for invalid."""
         assert backend._extract_video_id("https://google.com") is None
     
-    @patch('urllib.request.urlopen')
-    def test_extract_success(self, mock_urlopen, backend):
+    @staticmethod
+    def _mock_pool(handler):
+        """Instance pool whose HTTP client is served by handler(request)."""
+        import httpx
+        from invidious_pool import InvidiousInstancePool
+        
+        client = httpx.Client(transport=httpx.MockTransport(handler))
+        return InvidiousInstancePool(InvidiousExtractionBackend.INSTANCES, client=client)
+    
+    def test_extract_success(self):
         """Test successful extraction via Invidious."""
-        import json
+        import httpx
         
-        mock_response = MagicMock()
-        mock_response.read.return_value = json.dumps({
-            'title': 'Test Track',
-            'lengthSeconds': 180,  # Can be int or string
-            'videoId': 'abc123defgh',
-            'formatStreams': [
-                {'url': 'https://example.com/audio.webm', 'type': 'audio/webm; codecs="opus"'}
-            ],
-            'recommendedVideos': [
-                {'videoId': 'rel1', 'title': 'Related 1'}
-            ]
-        }).encode()
+        requests = []
         
-        mock_context = MagicMock()
-        mock_context.__enter__ = MagicMock(return_value=mock_response)
-        mock_context.__exit__ = MagicMock(return_value=False)
-        mock_urlopen.return_value = mock_context
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={
+                'title': 'Test Track',
+                'lengthSeconds': 180,  # Can be int or string
+                'formatStreams': [
+                    {'url': 'https://example.com/audio.webm', 'type': 'audio/webm; codecs="opus"'}
+                ],
+                'recommendedVideos': [
+                    {'videoId': 'rel1', 'title': 'Related 1'}
+                ]
+            })
         
+        backend = InvidiousExtractionBackend(pool=self._mock_pool(handler))
         track = backend.extract("https://youtube.com/watch?v=abc123defgh")
         
         assert track.id == "abc123defgh"
@@ -187,6 +205,34 @@ class TestInvidiousExtractionBackend:
         assert track.duration == 180
         assert track.backend == BackendType.INVIDIOUS
         assert track.codec == "opus"
+        assert track.related[0]['id'] == 'rel1'
+        # Only the mapped keys are requested
+        assert requests[0].url.path.endswith("/api/v1/videos/abc123defgh")
+        assert requests[0].url.params['fields'] == InvidiousExtractionBackend.VIDEO_FIELDS
+    
+    def test_extract_reuses_pooled_client(self):
+        """Repeat extractions go through the same keep-alive client."""
+        import httpx
+        
+        pool = self._mock_pool(lambda request: httpx.Response(200, json={'title': 'T'}))
+        backend = InvidiousExtractionBackend(pool=pool)
+        client = pool.client
+        
+        backend.extract("https://youtu.be/abc123defgh")
+        backend.extract("https://youtu.be/abc123defgh")
+        
+        assert pool.client is client
+    
+    def test_extract_not_found_keeps_instance_healthy(self):
+        """A missing video says nothing about the instance."""
+        import httpx
+        
+        pool = self._mock_pool(lambda request: httpx.Response(404))
+        backend = InvidiousExtractionBackend(pool=pool)
+        
+        with pytest.raises(ValueError):
+            backend.extract("https://youtu.be/abc123defgh")
+        assert pool.stats()["instances"][pool.instances[0]]["failures"] == 0
     
     def test_extract_invalid_url(self, backend):
         """Should raise ValueError for invalid URL."""
@@ -194,15 +240,12 @@ class TestInvidiousExtractionBackend:
             backend.extract("https://google.com")
         assert "Invalid YouTube URL" in str(exc_info.value)
     
-    @patch('urllib.request.urlopen')
-    def test_find_working_instance(self, mock_urlopen):
+    def test_find_working_instance(self):
         """Test finding working Invidious instance."""
-        mock_context = MagicMock()
-        mock_context.__enter__ = MagicMock(return_value=MagicMock(status=200))
-        mock_context.__exit__ = MagicMock(return_value=False)
-        mock_urlopen.return_value = mock_context
+        import httpx
         
-        backend = InvidiousExtractionBackend()
+        pool = self._mock_pool(lambda request: httpx.Response(200))
+        backend = InvidiousExtractionBackend(pool=pool)
         instance = backend.find_working_instance()
         
         assert instance is not None
@@ -290,3 +333,406 @@ class TestExtractionManager:
         
         health = manager.health_check()
         assert health["recommended_backend"] == BackendType.INVIDIOUS
+
+
+class TestExtractionCoalescing:
+    """Test single-flight coalescing in ExtractionManager."""
+    
+    @pytest.fixture
+    def manager(self):
+        manager = ExtractionManager()
+        manager._primary = MagicMock(spec=YTDLPExtractionBackend)
+        manager._primary.is_available.return_value = True
+        manager._fallback = MagicMock(spec=InvidiousExtractionBackend)
+        return manager
+    
+    def test_concurrent_resolves_share_one_extraction(self, manager):
+        """Different URL shapes for one video should share an extraction."""
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        
+        release = threading.Event()
+        track = TrackInfo(id="abc123defgh", title="Viral", duration=180, audio_url="url")
+        
+        def slow_extract(url):
+            release.wait(1)
+            return track
+        
+        manager._primary.extract.side_effect = slow_extract
+        urls = [
+            "https://youtube.com/watch?v=abc123defgh",
+            "https://youtu.be/abc123defgh",
+            "https://www.youtube.com/shorts/abc123defgh",
+            "https://www.youtube.com/embed/abc123defgh",
+        ]
+        
+        with ThreadPoolExecutor(max_workers=len(urls)) as pool:
+            futures = [pool.submit(manager.extract, url) for url in urls]
+            time.sleep(0.05)
+            release.set()
+            results = [f.result(timeout=1) for f in futures]
+        
+        assert manager._primary.extract.call_count == 1
+        assert all(r.success and r.track is track for r in results)
+        assert manager.stats()["singleflight"]["coalesced"] == 3
+    
+    def test_sequential_resolves_are_not_coalesced(self, manager):
+        manager._primary.extract.return_value = TrackInfo(
+            id="abc123defgh", title="T", duration=1, audio_url="url"
+        )
+        
+        manager.extract("https://youtu.be/abc123defgh")
+        manager.extract("https://youtu.be/abc123defgh")
+        
+        assert manager._primary.extract.call_count == 2
+        assert manager.stats()["singleflight"]["coalesced"] == 0
+
+
+class TestExtractionCache:
+    """Test the track cache in front of ExtractionManager.extract."""
+    
+    @pytest.fixture
+    def manager(self):
+        from track_cache import TrackCache
+        
+        manager = ExtractionManager(cache=TrackCache(db_path=""))
+        manager._primary = MagicMock(spec=YTDLPExtractionBackend)
+        manager._primary.is_available.return_value = True
+        manager._primary.extract.return_value = TrackInfo(
+            id="abc123defgh", title="Cached", duration=180, audio_url="url"
+        )
+        manager._fallback = MagicMock(spec=InvidiousExtractionBackend)
+        return manager
+    
+    def test_repeat_resolve_is_cache_hit(self, manager):
+        first = manager.extract("https://youtube.com/watch?v=abc123defgh")
+        second = manager.extract("https://youtu.be/abc123defgh")
+        
+        assert first.success and second.success
+        assert second.track.title == "Cached"
+        assert manager._primary.extract.call_count == 1
+        assert manager.stats()["cache"]["hits"]["memory"] == 1
+    
+    def test_failures_are_not_cached(self, manager):
+        manager._primary.extract.side_effect = Exception("blocked")
+        manager._fallback.is_available.return_value = False
+        
+        manager.extract("https://youtu.be/abc123defgh")
+        manager.extract("https://youtu.be/abc123defgh")
+        
+        assert manager._primary.extract.call_count == 2
+
+
+class TestStreamExpiry:
+    """Test stream URL expiry parsing and refresh-ahead."""
+    
+    @pytest.mark.parametrize("url,expected", [
+        ("https://rr1---sn-x.googlevideo.com/videoplayback?expire=1700000000&ei=abc", 1700000000),
+        ("https://rr1---sn-x.googlevideo.com/videoplayback?ei=abc&expire=1700000000", 1700000000),
+        ("https://manifest.googlevideo.com/api/manifest/dash/expire/1700000000/ei/abc", 1700000000),
+        ("https://example.com/audio.webm", None),
+        ("", None),
+    ])
+    def test_parse_stream_expiry(self, url, expected):
+        from extraction_backends import parse_stream_expiry
+        assert parse_stream_expiry(url) == expected
+    
+    @patch('yt_dlp.YoutubeDL')
+    def test_ytdlp_track_keeps_expiry(self, mock_youtube_dl):
+        mock_ydl_instance = MagicMock()
+        mock_youtube_dl.return_value.__enter__.return_value = mock_ydl_instance
+        mock_ydl_instance.extract_info.return_value = {
+            'id': 'abc123defgh',
+            'url': 'https://rr1.googlevideo.com/videoplayback?expire=1700000000',
+        }
+        
+        track = YTDLPExtractionBackend().extract("https://youtu.be/abc123defgh")
+        
+        assert track.expires_at == 1700000000
+    
+    def test_hot_hit_schedules_background_refresh(self):
+        import threading
+        from track_cache import TrackCache
+        
+        cache = TrackCache(db_path="")
+        manager = ExtractionManager(cache=cache)
+        manager._primary = MagicMock(spec=YTDLPExtractionBackend)
+        manager._primary.is_available.return_value = True
+        refreshed = threading.Event()
+        
+        def extract(url):
+            if manager._primary.extract.call_count > 1:
+                refreshed.set()
+            return TrackInfo(id="abc123defgh", title="Hot", duration=1, audio_url="url")
+        
+        manager._primary.extract.side_effect = extract
+        manager.extract("https://youtu.be/abc123defgh")
+        
+        with patch.object(cache, 'claim_refresh', return_value=True):
+            result = manager.extract("https://youtu.be/abc123defgh")
+        
+        # The caller is answered from cache; the refresh happens behind it
+        assert result.track.title == "Hot"
+        assert refreshed.wait(1)
+        manager.shutdown()
+
+
+class TestMetadataExtraction:
+    """Test the cheap metadata-only path."""
+    
+    @patch('yt_dlp.YoutubeDL')
+    def test_ytdlp_metadata_skips_processing(self, mock_youtube_dl):
+        mock_ydl_instance = MagicMock()
+        mock_youtube_dl.return_value.__enter__.return_value = mock_ydl_instance
+        mock_ydl_instance.extract_info.return_value = {
+            'id': 'abc123defgh',
+            'title': 'Metadata Only',
+            'duration': 240,
+        }
+        
+        track = YTDLPExtractionBackend().extract_metadata("https://youtu.be/abc123defgh")
+        
+        _, kwargs = mock_ydl_instance.extract_info.call_args
+        assert kwargs['process'] is False
+        opts = mock_youtube_dl.call_args[0][0]
+        assert opts['extractor_args']['youtube']['skip'] == ['dash', 'hls']
+        assert track.title == 'Metadata Only'
+        assert track.audio_url == ''
+        assert track.embed_url == 'https://www.youtube.com/embed/abc123defgh'
+    
+    def test_manager_serves_metadata_from_cache_with_stale_stream(self):
+        from track_cache import TrackCache
+        
+        cache = TrackCache(db_path="", stream_ttl=0)
+        manager = ExtractionManager(cache=cache)
+        manager._primary = MagicMock(spec=YTDLPExtractionBackend)
+        cache.put("abc123defgh", TrackInfo(
+            id="abc123defgh", title="Cached", duration=1, audio_url="url"
+        ))
+        
+        result = manager.extract_metadata("https://youtu.be/abc123defgh")
+        
+        assert result.success is True
+        assert result.track.title == "Cached"
+        assert result.track.audio_url == ""
+        manager._primary.extract_metadata.assert_not_called()
+    
+    def test_cached_metadata_never_extracts(self):
+        from track_cache import TrackCache
+        
+        manager = ExtractionManager(cache=TrackCache(db_path=""))
+        manager._primary = MagicMock(spec=YTDLPExtractionBackend)
+        
+        assert manager.cached_metadata("https://youtu.be/abc123defgh") is None
+        assert manager.cached_metadata("https://google.com") is None
+        manager._primary.extract_metadata.assert_not_called()
+        manager._primary.extract.assert_not_called()
+    
+    def test_metadata_never_replaces_full_cache_entry(self):
+        from track_cache import TrackCache
+        
+        cache = TrackCache(db_path="")
+        cache.put("abc123defgh", TrackInfo(
+            id="abc123defgh", title="Full", duration=1, audio_url="url"
+        ))
+        cache.put_metadata("abc123defgh", TrackInfo(
+            id="abc123defgh", title="Meta", duration=1, audio_url=""
+        ))
+        
+        assert cache.get("abc123defgh").audio_url == "url"
+    
+    def test_manager_metadata_falls_back(self):
+        manager = ExtractionManager()
+        manager._primary = MagicMock(spec=YTDLPExtractionBackend)
+        manager._primary.is_available.return_value = True
+        manager._primary.extract_metadata.side_effect = ValueError("blocked")
+        manager._fallback = MagicMock(spec=InvidiousExtractionBackend)
+        manager._fallback.is_available.return_value = True
+        manager._fallback.extract_metadata.return_value = TrackInfo(
+            id="abc123defgh", title="Invidious", duration=1, audio_url="",
+            backend=BackendType.INVIDIOUS
+        )
+        
+        result = manager.extract_metadata("https://youtu.be/abc123defgh")
+        
+        assert result.success is True
+        assert result.backend_used == BackendType.INVIDIOUS
+
+
+class TestHedgedExtraction:
+    """Test racing the Invidious fallback against a slow yt-dlp call."""
+    
+    @pytest.fixture
+    def manager(self):
+        from hedging import HedgePolicy
+        
+        manager = ExtractionManager(hedge=HedgePolicy(
+            enabled=True, initial_delay=0.05, min_samples=100
+        ))
+        manager._primary = MagicMock(spec=YTDLPExtractionBackend)
+        manager._primary.is_available.return_value = True
+        manager._fallback = MagicMock(spec=InvidiousExtractionBackend)
+        manager._fallback.is_available.return_value = True
+        yield manager
+        manager.shutdown()
+    
+    @staticmethod
+    def _track(title, backend):
+        return TrackInfo(id="abc123defgh", title=title, duration=1,
+                         audio_url="url", backend=backend)
+    
+    def test_fast_primary_is_not_hedged(self, manager):
+        manager._primary.extract.return_value = self._track("Primary", BackendType.YT_DLP)
+        
+        result = manager.extract("https://youtu.be/abc123defgh")
+        
+        assert result.backend_used == BackendType.YT_DLP
+        manager._fallback.extract.assert_not_called()
+        assert manager.stats()["hedging"]["unhedged"] == 1
+    
+    def test_slow_primary_loses_to_fallback(self, manager):
+        release = threading.Event()
+        
+        def slow_primary(url):
+            release.wait(5)
+            return self._track("Primary", BackendType.YT_DLP)
+        
+        manager._primary.extract.side_effect = slow_primary
+        manager._fallback.extract.return_value = self._track("Fallback", BackendType.INVIDIOUS)
+        
+        started = time.monotonic()
+        result = manager.extract("https://youtu.be/abc123defgh")
+        elapsed = time.monotonic() - started
+        release.set()
+        
+        assert result.backend_used == BackendType.INVIDIOUS
+        assert elapsed < 1
+        hedging = manager.stats()["hedging"]
+        assert hedging["hedged"] == 1
+        assert hedging["backends"]["invidious"]["wins"] == 1
+        assert hedging["backends"]["yt-dlp"]["losses"] == 1
+    
+    def test_slow_primary_still_wins_if_fallback_fails(self, manager):
+        def slow_primary(url):
+            time.sleep(0.2)
+            return self._track("Primary", BackendType.YT_DLP)
+        
+        manager._primary.extract.side_effect = slow_primary
+        manager._fallback.extract.side_effect = ValueError("instance down")
+        
+        result = manager.extract("https://youtu.be/abc123defgh")
+        
+        assert result.backend_used == BackendType.YT_DLP
+        assert manager.stats()["hedging"]["backends"]["yt-dlp"]["wins"] == 1
+    
+    def test_fast_primary_failure_uses_fallback(self, manager):
+        manager._primary.extract.side_effect = ValueError("blocked")
+        manager._fallback.extract.return_value = self._track("Fallback", BackendType.INVIDIOUS)
+        
+        result = manager.extract("https://youtu.be/abc123defgh")
+        
+        assert result.backend_used == BackendType.INVIDIOUS
+        assert manager.stats()["hedging"]["hedged"] == 0
+    
+    def test_both_fail(self, manager):
+        def slow_failure(url):
+            time.sleep(0.1)
+            raise ValueError("yt-dlp failed")
+        
+        manager._primary.extract.side_effect = slow_failure
+        manager._fallback.extract.side_effect = ValueError("instance down")
+        
+        result = manager.extract("https://youtu.be/abc123defgh")
+        
+        assert result.success is False
+        assert manager.stats()["hedging"]["hedged"] == 1
+
+
+class TestAdaptiveBackendOrder:
+    """Test circuit breakers and health-based ordering in ExtractionManager."""
+    
+    @pytest.fixture
+    def manager(self):
+        from backend_health import BackendHealth
+        
+        manager = ExtractionManager(health=BackendHealth(
+            failure_threshold=2, open_seconds=60, min_samples=1
+        ))
+        manager._primary = MagicMock(spec=YTDLPExtractionBackend)
+        manager._primary.is_available.return_value = True
+        manager._fallback = MagicMock(spec=InvidiousExtractionBackend)
+        manager._fallback.is_available.return_value = True
+        manager._fallback.extract.return_value = TrackInfo(
+            id="abc123defgh", title="Fallback", duration=1, audio_url="url",
+            backend=BackendType.INVIDIOUS
+        )
+        yield manager
+        manager.shutdown()
+    
+    def test_blocked_primary_is_skipped_once_breaker_opens(self, manager):
+        # Keep the static order so only the breaker decides
+        manager._health._min_samples = 100
+        manager._primary.extract.side_effect = ValueError("Sign in to confirm you're not a bot")
+        
+        for _ in range(5):
+            result = manager.extract("https://youtu.be/abc123defgh")
+            assert result.backend_used == BackendType.INVIDIOUS
+        
+        assert manager._primary.extract.call_count == 2
+        backends = manager.stats()["backends"]
+        assert backends["yt-dlp"]["state"] == "open"
+        assert backends["yt-dlp"]["opens"] == 1
+    
+    def test_faster_backend_is_tried_first(self, manager):
+        manager._health.record_success(BackendType.YT_DLP, 8.0)
+        manager._health.record_success(BackendType.INVIDIOUS, 0.5)
+        
+        result = manager.extract("https://youtu.be/abc123defgh")
+        
+        assert result.backend_used == BackendType.INVIDIOUS
+        manager._primary.extract.assert_not_called()
+    
+    def test_invalid_urls_do_not_trip_breakers(self, manager):
+        manager._primary.extract.side_effect = ValueError("Invalid YouTube URL")
+        manager._fallback.extract.side_effect = ValueError("Invalid YouTube URL")
+        
+        for _ in range(3):
+            assert manager.extract("not a url").success is False
+        
+        assert manager.stats()["backends"]["yt-dlp"]["state"] == "closed"
+        assert manager.stats()["backends"]["yt-dlp"]["samples"] == 0
+    
+    def test_invalid_url_does_not_hold_half_open_probe(self, manager):
+        clock = [1000.0]
+        manager._health._clock = lambda: clock[0]
+        for backend_type in (BackendType.YT_DLP, BackendType.INVIDIOUS):
+            manager._health.record_failure(backend_type, 1.0)
+            manager._health.record_failure(backend_type, 1.0)
+        clock[0] += 61
+        
+        manager._primary.extract.side_effect = ValueError("Invalid YouTube URL")
+        manager._fallback.extract.side_effect = ValueError("Invalid YouTube URL")
+        assert manager.extract("not a url at all").success is False
+        
+        # The unrecorded attempts gave their half-open probes back
+        manager._primary.extract.side_effect = None
+        manager._fallback.extract.side_effect = None
+        result = manager.extract("https://youtu.be/abc123defgh")
+        
+        assert result.success is True
+        assert manager.stats()["backends"]["yt-dlp"]["state"] == "closed"
+    
+    def test_metadata_skips_open_breaker(self, manager):
+        manager._primary.extract.side_effect = ValueError("blocked")
+        manager._fallback.extract_metadata.return_value = TrackInfo(
+            id="abc123defgh", title="Meta", duration=1, audio_url="",
+            backend=BackendType.INVIDIOUS
+        )
+        manager.extract("https://youtu.be/abc123defgh")
+        manager.extract("https://youtu.be/abc123defgh")
+        
+        result = manager.extract_metadata("https://youtu.be/abc123defgh")
+        
+        assert result.backend_used == BackendType.INVIDIOUS
+        manager._primary.extract_metadata.assert_not_called()
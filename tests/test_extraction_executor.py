@@ -0,0 +1,101 @@
+"""Tests for the bounded extraction executor."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extraction_executor import ExtractionExecutor
+
+
+class TestExtractionExecutor:
+    """Test ExtractionExecutor."""
+
+    @pytest.fixture
+    def executor(self):
+        executor = ExtractionExecutor(max_workers=2)
+        yield executor
+        executor.shutdown(wait=True)
+
+    async def test_runs_off_event_loop(self, executor):
+        """Work should run on a worker thread, not the loop thread."""
+        loop_thread = threading.get_ident()
+        worker_thread = await executor.run(threading.get_ident)
+        assert worker_thread != loop_thread
+
+    async def test_returns_result_and_passes_args(self, executor):
+        result = await executor.run(lambda a, b=0: a + b, 2, b=3)
+        assert result == 5
+
+    async def test_exception_propagates(self, executor):
+        def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            await executor.run(fail)
+
+        assert executor.stats()["failed"] == 1
+
+    async def test_enforces_max_concurrency(self, executor):
+        """No more than max_workers jobs should run at once."""
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def job():
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.05)
+            with lock:
+                state["active"] -= 1
+
+        await asyncio.gather(*(executor.run(job) for _ in range(6)))
+
+        assert state["peak"] == 2
+        assert executor.stats()["completed"] == 6
+
+    async def test_event_loop_stays_responsive(self, executor):
+        """A slow job must not block other coroutines."""
+        slow = asyncio.ensure_future(executor.run(time.sleep, 0.2))
+        started = time.monotonic()
+        await asyncio.sleep(0.01)
+        assert time.monotonic() - started < 0.1
+        await slow
+
+    async def test_reports_queue_depth_and_wait(self, executor):
+        """Jobs beyond capacity should show up as queued with wait time."""
+        release = threading.Event()
+        futures = [executor.submit(release.wait) for _ in range(3)]
+        time.sleep(0.05)
+
+        stats = executor.stats()
+        assert stats["running"] == 2
+        assert stats["queued"] == 1
+
+        release.set()
+        for future in futures:
+            future.result(timeout=1)
+
+        stats = executor.stats()
+        assert stats["queued"] == 0
+        assert stats["running"] == 0
+        assert stats["wait_ms"]["max"] > 0
+
+    def test_stats_structure(self, executor):
+        stats = executor.stats()
+        assert stats["max_workers"] == 2
+        assert set(stats["wait_ms"]) == {"avg", "p95", "max"}
+
+    def test_defaults_to_configured_limit(self):
+        from config import config
+
+        executor = ExtractionExecutor()
+        try:
+            assert executor.max_workers == config.ytdlp.max_concurrent_extracts
+        finally:
+            executor.shutdown()
@@ -0,0 +1,133 @@
+"""Tests for process-pool extraction workers."""
+
+import pytest
+from unittest.mock import MagicMock
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import extraction_workers
+from extraction_workers import ExtractionWorkerPool, extract_track_fields
+from extraction_backends import BackendType, YTDLPExtractionBackend
+
+
+def _double(value):
+    """Picklable worker job used against a real process pool."""
+    return value * 2, extraction_workers._current_rss()
+
+
+class TestExtractTrackFields:
+    """Test the function that runs inside worker processes."""
+
+    @pytest.fixture
+    def worker_ydl(self, monkeypatch):
+        ydl = MagicMock()
+        monkeypatch.setattr(extraction_workers, "_worker_ydl", ydl)
+        return ydl
+
+    def test_returns_trimmed_fields(self, worker_ydl):
+        """Only TrackInfo fields should leave the worker."""
+        worker_ydl.extract_info.return_value = {
+            'id': 'abc123defgh',
+            'title': 'Test Track',
+            'duration': 180,
+            'url': 'https://example.com/audio.webm',
+            'acodec': 'opus',
+            'formats': [{'format_id': str(i)} for i in range(50)],
+            'thumbnails': [{'url': 'thumb'}] * 20,
+        }
+
+        fields, rss = extract_track_fields("https://youtube.com/watch?v=abc123defgh")
+
+        assert fields['id'] == 'abc123defgh'
+        assert fields['audio_url'] == 'https://example.com/audio.webm'
+        assert 'formats' not in fields
+        assert 'thumbnails' not in fields
+        assert rss > 0
+
+    def test_reuses_worker_instance(self, worker_ydl):
+        worker_ydl.extract_info.return_value = {'id': 'abc123defgh'}
+
+        extract_track_fields("https://youtu.be/abc123defgh")
+        extract_track_fields("https://youtu.be/abc123defgh")
+
+        assert worker_ydl.extract_info.call_count == 2
+
+    def test_download_error_becomes_value_error(self, worker_ydl):
+        from yt_dlp.utils import DownloadError
+        worker_ydl.extract_info.side_effect = DownloadError("blocked")
+
+        with pytest.raises(ValueError) as exc_info:
+            extract_track_fields("https://youtu.be/abc123defgh")
+        assert "yt-dlp extraction failed" in str(exc_info.value)
+
+
+class TestBackendWithWorkerPool:
+    """Test YTDLPExtractionBackend in process mode."""
+
+    def test_extract_uses_worker_pool(self):
+        pool = MagicMock(spec=ExtractionWorkerPool)
+        pool.extract.return_value = {
+            'id': 'abc123defgh',
+            'title': 'Pooled Track',
+            'duration': 200,
+            'audio_url': 'https://example.com/audio.webm',
+            'codec': 'opus',
+            'related': [],
+            'embed_url': 'https://www.youtube.com/embed/abc123defgh',
+            'invidious_url': 'https://yewtu.be/embed/abc123defgh',
+        }
+        backend = YTDLPExtractionBackend(worker_pool=pool)
+
+        track = backend.extract("https://youtube.com/watch?v=abc123defgh")
+
+        pool.extract.assert_called_once_with("https://youtube.com/watch?v=abc123defgh")
+        assert track.title == 'Pooled Track'
+        assert track.backend == BackendType.YT_DLP
+
+    def test_thread_mode_has_no_pool(self):
+        assert YTDLPExtractionBackend().worker_pool is None
+
+
+class TestExtractionWorkerPool:
+    """Test ExtractionWorkerPool against real worker processes."""
+
+    def test_runs_job_in_worker(self):
+        pool = ExtractionWorkerPool({'quiet': True}, max_workers=1, max_rss_mb=0)
+        try:
+            assert pool.run(_double, 21) == 42
+            stats = pool.stats()
+            assert stats["jobs"] == 1
+            assert stats["peak_rss_mb"] > 0
+            assert stats["recycles"] == {"rss": 0, "crash": 0}
+        finally:
+            pool.shutdown(wait=True)
+
+    def test_recycles_pool_over_rss_ceiling(self):
+        pool = ExtractionWorkerPool({'quiet': True}, max_workers=1, max_rss_mb=1)
+        try:
+            assert pool.run(_double, 1) == 2
+            assert pool.stats()["recycles"]["rss"] == 1
+            assert pool.stats()["started"] is False
+
+            # A fresh pool is started transparently for the next job
+            assert pool.run(_double, 2) == 4
+            assert pool.stats()["jobs"] == 2
+        finally:
+            pool.shutdown(wait=True)
+
+    def test_pool_starts_lazily(self):
+        pool = ExtractionWorkerPool({'quiet': True}, max_workers=1)
+        assert pool.stats()["started"] is False
+        pool.shutdown()
+
+    def test_warm_starts_workers_without_counting_jobs(self):
+        pool = ExtractionWorkerPool({'quiet': True}, max_workers=1, max_rss_mb=0)
+        try:
+            pool.warm()
+            stats = pool.stats()
+            assert stats["started"] is True
+            assert stats["jobs"] == 0
+        finally:
+            pool.shutdown(wait=True)
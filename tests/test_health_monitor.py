@@ -0,0 +1,160 @@
+"""Tests for the background health monitor and health endpoints."""
+
+import threading
+import time
+
+import pytest
+from unittest.mock import MagicMock, patch
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from health_monitor import HealthMonitor
+from extraction_backends import ExtractionManager, YTDLPExtractionBackend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestHealthMonitor:
+    """Test snapshot caching."""
+
+    def test_unknown_before_first_check(self):
+        monitor = HealthMonitor(lambda: {"status": "healthy"}, interval=10)
+        snapshot = monitor.snapshot()
+        assert snapshot["status"] == "unknown"
+        assert snapshot["age_seconds"] is None
+        assert monitor.ready() is False
+
+    def test_snapshot_reports_age(self):
+        clock = FakeClock()
+        check = MagicMock(return_value={"status": "degraded"})
+        monitor = HealthMonitor(check, interval=10, clock=clock)
+
+        monitor.refresh()
+        clock.now += 4.5
+        snapshot = monitor.snapshot()
+
+        assert snapshot["status"] == "degraded"
+        assert snapshot["checked_at"] == 1000.0
+        assert snapshot["age_seconds"] == 4.5
+        assert snapshot["stale"] is False
+        assert monitor.ready() is True
+        # Reading the snapshot never re-runs the check
+        monitor.snapshot()
+        assert check.call_count == 1
+
+    def test_stale_snapshot_is_not_ready(self):
+        clock = FakeClock()
+        monitor = HealthMonitor(lambda: {"status": "healthy"}, interval=10, clock=clock)
+        monitor.refresh()
+        clock.now += 31
+        assert monitor.snapshot()["stale"] is True
+        assert monitor.ready() is False
+
+    def test_unhealthy_is_not_ready(self):
+        monitor = HealthMonitor(lambda: {"status": "unhealthy"}, interval=10)
+        monitor.refresh()
+        assert monitor.ready() is False
+
+    def test_check_exception_becomes_unhealthy(self):
+        def broken():
+            raise RuntimeError("boom")
+
+        monitor = HealthMonitor(broken, interval=10)
+        monitor.refresh()
+        assert monitor.snapshot()["status"] == "unhealthy"
+        assert monitor.snapshot()["error"] == "boom"
+
+    def test_background_thread_checks_immediately(self):
+        checked = threading.Event()
+
+        def check():
+            checked.set()
+            return {"status": "healthy"}
+
+        monitor = HealthMonitor(check, interval=60)
+        monitor.start()
+        try:
+            assert checked.wait(2)
+        finally:
+            monitor.stop()
+
+
+class TestHealthEndpoints:
+    """Test liveness/readiness and the cached extraction health route."""
+
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+
+    def test_liveness_never_checks_backends(self, client):
+        with patch('api.routes.extraction_manager.health_check') as mock_check:
+            response = client.get('/api/health/live')
+        assert response.status_code == 200
+        assert response.json()['status'] == 'alive'
+        mock_check.assert_not_called()
+
+    def test_readiness_follows_snapshot(self, client):
+        monitor = HealthMonitor(lambda: {"status": "degraded"}, interval=30)
+        with patch('api.routes.extraction_health_monitor', monitor):
+            assert client.get('/api/health/ready').status_code == 503
+            monitor.refresh()
+            response = client.get('/api/health/ready')
+        assert response.status_code == 200
+        assert response.json()['ready'] is True
+
+    def test_extraction_health_serves_snapshot(self, client):
+        slow = MagicMock(side_effect=lambda: time.sleep(5))
+        monitor = HealthMonitor(lambda: {"status": "healthy"}, interval=30)
+        monitor.refresh()
+        with patch('api.routes.extraction_health_monitor', monitor), \
+                patch('api.routes.extraction_manager.health_check', slow):
+            started = time.monotonic()
+            response = client.get('/api/health/extraction')
+            elapsed = time.monotonic() - started
+
+        assert elapsed < 1
+        assert response.json()['status'] == 'healthy'
+        assert response.json()['age_seconds'] is not None
+        slow.assert_not_called()
+
+
+class TestDeepHealthCheck:
+    """Test the deep check run by the monitor."""
+
+    @pytest.fixture
+    def manager(self):
+        manager = ExtractionManager()
+        manager._primary = MagicMock(spec=YTDLPExtractionBackend)
+        manager._primary.is_available.return_value = True
+        manager._fallback = MagicMock()
+        manager._fallback.is_available.return_value = True
+        yield manager
+        manager.shutdown()
+
+    def test_shallow_check_makes_no_probe(self, manager):
+        health = manager.health_check()
+        manager._primary.extract_metadata.assert_not_called()
+        assert health["status"] == "healthy"
+
+    def test_deep_check_probes_ytdlp(self, manager):
+        health = manager.health_check(deep=True)
+        manager._primary.extract_metadata.assert_called_once()
+        assert health["primary"]["available"] is True
+        assert "probe_ms" in health["primary"]
+
+    def test_deep_check_failure_degrades(self, manager):
+        manager._primary.extract_metadata.side_effect = ValueError("Sign in to confirm")
+        health = manager.health_check(deep=True)
+        assert health["status"] == "degraded"
+        assert health["primary"]["available"] is False
+        assert "Sign in" in health["primary"]["error"]
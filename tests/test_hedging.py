@@ -0,0 +1,76 @@
+"""Tests for the hedged extraction policy."""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hedging import HedgePolicy
+
+
+def make_policy(**overrides):
+    options = dict(
+        enabled=True, percentile=0.95, min_delay=0.5, max_delay=5.0,
+        initial_delay=2.0, min_samples=5, window=20
+    )
+    options.update(overrides)
+    return HedgePolicy(**options)
+
+
+class TestHedgeDelay:
+    """Test the learned hedge delay."""
+
+    def test_initial_delay_until_min_samples(self):
+        policy = make_policy()
+        for _ in range(4):
+            policy.record_latency(1.0)
+        assert policy.delay() == 2.0
+
+    def test_uses_percentile_of_recent_latencies(self):
+        policy = make_policy()
+        for latency in [1.0] * 19 + [3.0]:
+            policy.record_latency(latency)
+        # p95 of 20 samples lands on the slowest one
+        assert policy.delay() == 3.0
+
+    def test_delay_is_clamped(self):
+        fast = make_policy()
+        slow = make_policy()
+        for _ in range(10):
+            fast.record_latency(0.01)
+            slow.record_latency(60.0)
+        assert fast.delay() == 0.5
+        assert slow.delay() == 5.0
+
+    def test_window_drops_old_latencies(self):
+        policy = make_policy(window=5)
+        for _ in range(5):
+            policy.record_latency(4.0)
+        for _ in range(5):
+            policy.record_latency(1.0)
+        assert policy.delay() == 1.0
+
+
+class TestHedgeStats:
+    """Test win/loss accounting."""
+
+    def test_race_outcomes(self):
+        policy = make_policy()
+        policy.record_unhedged()
+        policy.record_race("invidious", "yt-dlp")
+        policy.record_race("yt-dlp", "invidious")
+        policy.record_race("invidious", "yt-dlp")
+        policy.record_race(None, None)
+
+        stats = policy.stats()
+        assert stats["unhedged"] == 1
+        assert stats["hedged"] == 4
+        assert stats["backends"]["invidious"] == {"wins": 2, "losses": 1}
+        assert stats["backends"]["yt-dlp"] == {"wins": 1, "losses": 2}
+
+    def test_defaults_from_config(self):
+        from config import config
+        policy = HedgePolicy()
+        assert policy.enabled == config.hedge.enabled
+        assert policy.stats()["delay_ms"] == config.hedge.initial_delay * 1000
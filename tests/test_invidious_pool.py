@@ -0,0 +1,194 @@
+"""Tests for the Invidious instance pool, against local stand-in servers."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from invidious_pool import InvidiousInstancePool
+from extraction_backends import BackendType, InvidiousExtractionBackend
+
+
+class FakeInvidious:
+    """Minimal Invidious API on 127.0.0.1 with a configurable delay/status."""
+
+    def __init__(self, delay: float = 0.0, status: int = 200):
+        self.delay = delay
+        self.status = status
+        self.requests = []
+        self.fields = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self, body: bytes = b""):
+                fake.requests.append((self.command, self.path))
+                time.sleep(fake.delay)
+                self.send_response(fake.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+
+            def do_HEAD(self):
+                self._respond()
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                video_id = url.path.rsplit("/", 1)[-1]
+                fake.fields.append(parse_qs(url.query).get("fields", [None])[0])
+                self._respond(json.dumps({
+                    "title": f"Served by {fake.url}",
+                    "lengthSeconds": 200,
+                    "formatStreams": [
+                        {"url": f"{fake.url}/audio/{video_id}", "type": 'audio/webm; codecs="opus"'}
+                    ],
+                }).encode())
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+        ).start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def servers():
+    started = {
+        "fast": FakeInvidious(),
+        "slow": FakeInvidious(delay=0.2),
+        "broken": FakeInvidious(status=503),
+    }
+    yield started
+    for server in started.values():
+        server.close()
+
+
+def make_pool(servers, **kwargs):
+    instances = [servers[name].url for name in ("slow", "broken", "fast")]
+    return InvidiousInstancePool(instances, probe_interval=60, probe_timeout=2, **kwargs)
+
+
+class TestProbing:
+    """Test background probing and ranking."""
+
+    def test_ranks_by_latency_and_drops_unhealthy(self, servers):
+        pool = make_pool(servers)
+        pool.probe_once()
+
+        assert pool.ranked() == [servers["fast"].url, servers["slow"].url]
+        stats = pool.stats()
+        assert stats["rounds"] == 1
+        assert stats["instances"][servers["broken"].url]["healthy"] is False
+        assert stats["instances"][servers["broken"].url]["last_error"]
+
+    def test_unreachable_instance_is_unhealthy(self, servers):
+        dead = FakeInvidious()
+        dead.close()
+        pool = InvidiousInstancePool([dead.url, servers["fast"].url], probe_timeout=1)
+        pool.probe_once()
+        assert pool.ranked() == [servers["fast"].url]
+
+    def test_no_healthy_instances(self, servers):
+        pool = InvidiousInstancePool([servers["broken"].url])
+        pool.probe_once()
+        assert pool.has_healthy() is False
+        assert pool.choose() is None
+
+    def test_background_prober(self, servers):
+        pool = make_pool(servers)
+        pool.start()
+        try:
+            deadline = time.monotonic() + 5
+            while pool.stats()["rounds"] == 0 and time.monotonic() < deadline:
+                time.sleep(0.02)
+            assert pool.ranked()[0] == servers["fast"].url
+        finally:
+            pool.stop()
+
+    def test_request_failures_demote_instance(self, servers):
+        pool = make_pool(servers)
+        pool.probe_once()
+        for _ in range(3):
+            pool.record(servers["fast"].url, 0.01, ok=False, error="timeout")
+        assert servers["fast"].url not in pool.ranked()
+
+
+class TestSelection:
+    """Test spreading load over healthy instances."""
+
+    def test_power_of_two_choices_prefers_faster(self):
+        values = iter([0.9, 0.1])
+        pool = InvidiousInstancePool(["a", "b"], rng=lambda: next(values))
+        pool.record("a", 0.1, ok=True)
+        pool.record("b", 0.5, ok=True)
+        assert pool.choose() == "a"
+
+    def test_spreads_load(self):
+        pool = InvidiousInstancePool(["a", "b", "c"])
+        for instance in ("a", "b", "c"):
+            pool.record(instance, 0.1, ok=True)
+        chosen = {pool.choose() for _ in range(200)}
+        # The slowest of the three only wins when drawn twice
+        assert chosen >= {"a", "b"}
+
+    def test_exclude(self):
+        pool = InvidiousInstancePool(["a", "b"])
+        assert pool.choose(exclude="a") == "b"
+
+
+class TestBackendWithPool:
+    """Test the Invidious backend using the pool instead of HEAD checks."""
+
+    def test_extract_uses_best_instance_without_head(self, servers):
+        pool = make_pool(servers)
+        pool.probe_once()
+        before = {name: len(server.requests) for name, server in servers.items()}
+        backend = InvidiousExtractionBackend(pool=pool)
+
+        assert backend.is_available() is True
+        track = backend.extract("https://youtu.be/abc123defgh")
+
+        assert track.backend == BackendType.INVIDIOUS
+        assert track.title in (f"Served by {servers['fast'].url}", f"Served by {servers['slow'].url}")
+        assert track.invidious_url.endswith("/embed/abc123defgh")
+        # Only the video request, no extra HEAD before it
+        new_requests = [
+            method
+            for name, server in servers.items()
+            for method, _ in server.requests[before[name]:]
+        ]
+        assert new_requests == ["GET"]
+        served = servers["fast"].fields + servers["slow"].fields
+        assert served == [InvidiousExtractionBackend.VIDEO_FIELDS]
+
+    def test_retries_on_another_instance(self, servers):
+        # Unprobed instances tie, so rng=0 picks the broken one first
+        pool = InvidiousInstancePool(
+            [servers["broken"].url, servers["fast"].url], rng=lambda: 0.0
+        )
+        backend = InvidiousExtractionBackend(pool=pool)
+
+        track = backend.extract("https://youtu.be/abc123defgh")
+
+        assert track.title == f"Served by {servers['fast'].url}"
+        assert pool.stats()["instances"][servers["broken"].url]["failures"] == 1
+
+    def test_unavailable_without_healthy_instances(self, servers):
+        pool = InvidiousInstancePool([servers["broken"].url])
+        pool.probe_once()
+        assert InvidiousExtractionBackend(pool=pool).is_available() is False
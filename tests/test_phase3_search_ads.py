@@ -72,25 +72,25 @@ class TestEmbedURLFields:
     
     def test_track_info_has_embed_url(self):
         """TrackInfo should have embed_url field."""
-        with open('extraction_backends.py', 'r') as f:
+        with open('track_info.py', 'r') as f:
             content = f.read()
         assert 'embed_url: str = None' in content
     
     def test_track_info_has_invidious_url(self):
         """TrackInfo should have invidious_url field."""
-        with open('extraction_backends.py', 'r') as f:
+        with open('track_info.py', 'r') as f:
             content = f.read()
         assert 'invidious_url: str = None' in content
     
     def test_youtube_embed_url_format(self):
         """YouTube embed URL should be correct format."""
-        with open('extraction_backends.py', 'r') as f:
+        with open('track_info.py', 'r') as f:
             content = f.read()
         assert "youtube_embed = f\"https://www.youtube.com/embed/{info['id']}\"" in content
     
     def test_invidious_embed_url_format(self):
         """Invidious embed URL should be correct format."""
-        with open('extraction_backends.py', 'r') as f:
+        with open('track_info.py', 'r') as f:
             content = f.read()
         assert "invidious_embed = f\"https://yewtu.be/embed/{info['id']}\"" in content
 
@@ -151,7 +151,7 @@ class TestExtractionBackendPriority:
     
     def test_youtube_embed_primary(self):
         """YouTube embed should be primary."""
-        with open('extraction_backends.py', 'r') as f:
+        with open('track_info.py', 'r') as f:
             content = f.read()
         # YouTube embed should be first
         assert "youtube_embed = f\"https://www.youtube.com/embed/{info['id']}\"" in content
@@ -159,7 +159,7 @@ class TestExtractionBackendPriority:
     
     def test_embed_in_track_info_order(self):
         """embed_url should come before invidious_url in TrackInfo."""
-        with open('extraction_backends.py', 'r') as f:
+        with open('track_info.py', 'r') as f:
             content = f.read()
         embed_pos = content.find('embed_url: str')
         invidious_pos = content.find('invidious_url: str')
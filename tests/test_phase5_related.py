@@ -12,7 +12,7 @@ class TestRelatedVideosData:
     
     def test_track_info_has_related_field(self):
         """TrackInfo should have related field."""
-        with open('extraction_backends.py', 'r') as f:
+        with open('track_info.py', 'r') as f:
             content = f.read()
         assert 'related: List[dict]' in content
     
@@ -30,7 +30,7 @@ class TestRelatedVideosData:
     
     def test_related_video_structure(self):
         """Related videos should have id, title, duration."""
-        with open('extraction_backends.py', 'r') as f:
+        with open('track_info.py', 'r') as f:
             content = f.read()
         assert "'id'" in content
         assert "'title'" in content
@@ -0,0 +1,252 @@
+"""Tests for the first-seconds pre-buffer and instant relay starts."""
+
+import asyncio
+
+import httpx
+from unittest.mock import MagicMock
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_cache import AudioCache, parse_range
+from audio_proxy import AudioRelay
+from extraction_backends import ExtractionResult, TrackInfo
+from prebuffer import AudioHead, HeadCache
+from prefetch import RelatedPrefetcher
+
+
+AUDIO = bytes(range(256)) * 40  # 10240 bytes
+VIDEO_ID = "dQw4w9WgXcQ"
+STREAM_URL = "https://gv.test/videoplayback?itag=251"
+HEAD = 2048
+
+
+def upstream(itag="251"):
+    """Mock googlevideo with Range support; records request Range headers."""
+    ranges = []
+
+    def handler(request):
+        byte_range = request.headers.get("range")
+        ranges.append(byte_range)
+        start, end = parse_range(byte_range) if byte_range else (0, None)
+        end = len(AUDIO) - 1 if end is None else end
+        data = AUDIO[start:end + 1]
+        headers = {
+            "content-type": "audio/webm",
+            "content-range": f"bytes {start}-{end}/{len(AUDIO)}",
+            "content-length": str(len(data)),
+        }
+        return httpx.Response(206, headers=headers, stream=httpx.ByteStream(data))
+
+    return handler, ranges
+
+
+def make_relay(heads, cache=None, resolved=None):
+    """Relay whose resolver waits for the resolved event, if given."""
+    handler, ranges = upstream()
+
+    async def resolve(video_id, stale_url):
+        if resolved is not None:
+            await resolved.wait()
+        return STREAM_URL
+
+    relay = AudioRelay(resolve, chunk_size=1024, transport=httpx.MockTransport(handler),
+                       cache=cache, heads=heads)
+    return relay, ranges
+
+
+def head_of(data=AUDIO, fmt="251"):
+    return AudioHead(fmt, "audio/webm", len(AUDIO), data[:HEAD])
+
+
+async def read(relay, headers):
+    stream = await relay.stream(VIDEO_ID, headers)
+    data = b"".join([chunk async for chunk in stream.body])
+    return stream, data
+
+
+class TestHeadCache:
+    """Storage, budget and fetch."""
+
+    def test_put_truncates_to_head_bytes(self):
+        heads = HeadCache(head_bytes=HEAD, max_bytes=1 << 20)
+        heads.put(VIDEO_ID, AudioHead("251", "audio/webm", len(AUDIO), AUDIO))
+        assert heads.get(VIDEO_ID).data == AUDIO[:HEAD]
+        assert heads.stats()["bytes"] == HEAD
+
+    def test_short_head_is_ignored(self):
+        heads = HeadCache(head_bytes=HEAD, max_bytes=1 << 20)
+        heads.put(VIDEO_ID, AudioHead("251", "audio/webm", len(AUDIO), AUDIO[:100]))
+        assert not heads.contains(VIDEO_ID)
+        # ... unless it is the whole track
+        heads.put(VIDEO_ID, AudioHead("251", "audio/webm", 100, AUDIO[:100]))
+        assert heads.contains(VIDEO_ID)
+
+    def test_lru_within_budget(self):
+        heads = HeadCache(head_bytes=HEAD, max_bytes=2 * HEAD)
+        ids = ["aaaaaaaaaaa", "bbbbbbbbbbb", "ccccccccccc"]
+        for video_id in ids[:2]:
+            heads.put(video_id, head_of())
+        heads.get(ids[0])
+        heads.put(ids[2], head_of())
+
+        assert heads.contains(ids[0])
+        assert not heads.contains(ids[1])
+        assert heads.contains(ids[2])
+        stats = heads.stats()
+        assert stats["bytes"] == 2 * HEAD
+        assert stats["evictions"] == 1
+
+    def test_fetch_requests_head_range(self):
+        handler, ranges = upstream()
+        heads = HeadCache(head_bytes=HEAD, max_bytes=1 << 20,
+                          transport=httpx.MockTransport(handler))
+        assert heads.fetch(VIDEO_ID, STREAM_URL)
+        assert ranges == [f"bytes=0-{HEAD - 1}"]
+        head = heads.get(VIDEO_ID)
+        assert head == AudioHead("251", "audio/webm", len(AUDIO), AUDIO[:HEAD])
+
+        # Already held: no second download
+        assert heads.fetch(VIDEO_ID, STREAM_URL)
+        assert len(ranges) == 1
+
+    def test_fetch_failure(self):
+        heads = HeadCache(head_bytes=HEAD, max_bytes=1 << 20, transport=httpx.MockTransport(
+            lambda request: httpx.Response(403)
+        ))
+        assert not heads.fetch(VIDEO_ID, STREAM_URL)
+        assert heads.stats()["fetch_failures"] == 1
+
+
+    def test_fetch_ignored_range_not_downloaded(self):
+        # Upstream answers 200 with the whole file: none of it is read
+        sent = []
+
+        def body():
+            for start in range(0, len(AUDIO), 1024):
+                sent.append(start)
+                yield AUDIO[start:start + 1024]
+
+        heads = HeadCache(head_bytes=HEAD, max_bytes=1 << 20, transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, content=body())
+        ))
+        assert not heads.fetch(VIDEO_ID, STREAM_URL)
+        assert sent == []
+        assert heads.stats()["fetch_failures"] == 1
+
+    def test_fetch_reads_at_most_head_bytes(self):
+        sent = []
+
+        def body():
+            for start in range(0, len(AUDIO), 1024):
+                sent.append(start)
+                yield AUDIO[start:start + 1024]
+
+        heads = HeadCache(head_bytes=HEAD, max_bytes=1 << 20, transport=httpx.MockTransport(
+            lambda request: httpx.Response(206, headers={
+                "content-range": f"bytes 0-{len(AUDIO) - 1}/{len(AUDIO)}"
+            }, content=body())
+        ))
+        assert heads.fetch(VIDEO_ID, STREAM_URL)
+        assert heads.get(VIDEO_ID).data == AUDIO[:HEAD]
+        assert len(sent) == HEAD // 1024
+
+
+class TestInstantStart:
+    """The relay answers from a head before the track is resolved."""
+
+    def test_head_sent_before_resolve(self):
+        heads = HeadCache(head_bytes=HEAD, max_bytes=1 << 20)
+        heads.put(VIDEO_ID, head_of())
+
+        async def scenario():
+            resolved = asyncio.Event()
+            relay, ranges = make_relay(heads, resolved=resolved)
+            stream = await relay.stream(VIDEO_ID, {"Range": "bytes=0-"})
+            body = stream.body.__aiter__()
+            first = [await body.__anext__(), await body.__anext__()]
+            assert not resolved.is_set()
+            resolved.set()
+            rest = [chunk async for chunk in body]
+            return stream, b"".join(first + rest), ranges, relay
+
+        stream, data, ranges, relay = asyncio.run(scenario())
+        assert stream.status_code == 206
+        assert stream.headers["content-range"] == f"bytes 0-{len(AUDIO) - 1}/{len(AUDIO)}"
+        assert data == AUDIO
+        # Upstream was only asked for what follows the head
+        assert ranges == [f"bytes={HEAD}-"]
+        assert relay.stats()["prefix_starts"] == 1
+
+    def test_range_inside_head_needs_no_upstream(self):
+        heads = HeadCache(head_bytes=HEAD, max_bytes=1 << 20)
+        heads.put(VIDEO_ID, head_of())
+        relay, ranges = make_relay(heads)
+        stream, data = asyncio.run(read(relay, {"Range": "bytes=100-199"}))
+        assert data == AUDIO[100:200]
+        assert ranges == []
+
+    def test_head_completes_disk_cache(self, tmp_path):
+        heads = HeadCache(head_bytes=HEAD, max_bytes=1 << 20)
+        heads.put(VIDEO_ID, head_of())
+        cache = AudioCache(directory=str(tmp_path), max_bytes=1 << 20)
+        relay, _ = make_relay(heads, cache=cache)
+        asyncio.run(read(relay, {"Range": "bytes=0-"}))
+        assert open(cache.lookup(VIDEO_ID).path, "rb").read() == AUDIO
+
+    def test_format_change_drops_head(self):
+        heads = HeadCache(head_bytes=HEAD, max_bytes=1 << 20)
+        heads.put(VIDEO_ID, head_of(fmt="140"))
+        relay, _ = make_relay(heads)
+        stream, data = asyncio.run(read(relay, {"Range": "bytes=0-"}))
+        # Headers were already sent: the body ends after the head
+        assert data == AUDIO[:HEAD]
+        assert not heads.contains(VIDEO_ID)
+        assert relay.stats()["upstream_errors"] == 1
+
+    def test_play_from_start_records_head(self):
+        heads = HeadCache(head_bytes=HEAD, max_bytes=1 << 20)
+        relay, ranges = make_relay(heads)
+        stream, data = asyncio.run(read(relay, {}))
+        assert stream.status_code == 200
+        assert data == AUDIO
+        assert ranges == ["bytes=0-"]
+        assert heads.get(VIDEO_ID) == head_of()
+
+
+class TestPrefetchPrebuffer:
+    """The prefetcher downloads heads of the tracks it resolves."""
+
+    def track(self):
+        return TrackInfo(id="rel00000001", title="T", duration=100, audio_url=STREAM_URL)
+
+    def test_prefetched_track_is_prebuffered(self):
+        heads = MagicMock()
+        heads.contains.return_value = False
+        heads.fetch.return_value = True
+        extract = MagicMock(return_value=ExtractionResult(success=True, track=self.track()))
+        prefetcher = RelatedPrefetcher(
+            extract=extract, is_cached=lambda video_id: True, load=lambda: 0.0,
+            budget_per_minute=10, heads=heads
+        )
+        # Cached, but without a head: still worth a prefetch
+        prefetcher.schedule([{"id": "rel00000001"}])
+        prefetcher._executor.shutdown(wait=True)
+
+        heads.fetch.assert_called_once_with("rel00000001", STREAM_URL)
+        assert prefetcher.stats()["prebuffered"] == 1
+
+    def test_cached_with_head_is_skipped(self):
+        heads = MagicMock()
+        heads.contains.return_value = True
+        extract = MagicMock()
+        prefetcher = RelatedPrefetcher(
+            extract=extract, is_cached=lambda video_id: True, load=lambda: 0.0,
+            budget_per_minute=10, heads=heads
+        )
+        prefetcher.schedule([{"id": "rel00000001"}])
+        prefetcher._executor.shutdown(wait=True)
+
+        extract.assert_not_called()
+        assert prefetcher.stats()["skipped_cached"] == 1
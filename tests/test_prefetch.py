@@ -0,0 +1,219 @@
+"""Tests for the related-track prefetcher."""
+
+import threading
+
+import pytest
+from unittest.mock import MagicMock, patch
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from prefetch import RelatedPrefetcher
+from extraction_backends import BackendType, ExtractionResult, TrackInfo
+from extraction_executor import ExtractionExecutor
+from track_cache import TrackCache
+
+
+RELATED = [
+    {"id": "rel00000001", "title": "One", "duration": 100},
+    {"id": "rel00000002", "title": "Two", "duration": 100},
+    {"id": "rel00000003", "title": "Three", "duration": 100},
+    {"id": "rel00000004", "title": "Four", "duration": 100},
+]
+
+
+def _track(video_id="dQw4w9WgXcQ", related=None):
+    return TrackInfo(
+        id=video_id,
+        title="Test Song",
+        duration=200,
+        audio_url="https://example.com/audio",
+        codec="opus",
+        backend=BackendType.YT_DLP,
+        related=related or []
+    )
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _prefetcher(extract=None, is_cached=None, load=None, **kwargs):
+    if extract is None:
+        extract = MagicMock(return_value=ExtractionResult(success=True, track=_track()))
+    prefetcher = RelatedPrefetcher(
+        extract=extract,
+        is_cached=is_cached or (lambda video_id: False),
+        load=load or (lambda: 0.0),
+        **kwargs
+    )
+    return prefetcher, extract
+
+
+def _drain(prefetcher):
+    """Wait for every queued prefetch to finish."""
+    prefetcher._executor.shutdown(wait=True)
+
+
+class TestRelatedPrefetcher:
+    """Test scheduling, budget and load shedding."""
+
+    def test_prefetches_top_k(self):
+        prefetcher, extract = _prefetcher(top_k=2, budget_per_minute=10)
+        assert prefetcher.schedule(RELATED) == 2
+        _drain(prefetcher)
+
+        urls = sorted(call.args[0] for call in extract.call_args_list)
+        assert urls == [
+            "https://www.youtube.com/watch?v=rel00000001",
+            "https://www.youtube.com/watch?v=rel00000002",
+        ]
+        assert prefetcher.stats()["prefetched"] == 2
+        assert prefetcher.stats()["pending"] == 0
+
+    def test_skips_invalid_and_duplicate_ids(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def extract(url):
+            started.set()
+            release.wait(5)
+            return ExtractionResult(success=True, track=_track())
+
+        prefetcher, _ = _prefetcher(extract=extract, top_k=3, workers=1)
+        assert prefetcher.schedule([{"id": "rel00000001"}, {"id": "bad"}, {}]) == 1
+        started.wait(5)
+        # Still in flight: the same related track is not queued twice
+        assert prefetcher.schedule([{"id": "rel00000001"}]) == 0
+        release.set()
+        _drain(prefetcher)
+        assert prefetcher.stats()["scheduled"] == 1
+
+    def test_skips_cached_tracks(self):
+        prefetcher, extract = _prefetcher(is_cached=lambda video_id: True)
+        prefetcher.schedule(RELATED)
+        _drain(prefetcher)
+
+        extract.assert_not_called()
+        assert prefetcher.stats()["skipped_cached"] == 3
+
+    def test_yields_to_interactive_load(self):
+        prefetcher, extract = _prefetcher(load=lambda: 0.9, max_interactive_load=0.5)
+        prefetcher.schedule(RELATED)
+        _drain(prefetcher)
+
+        extract.assert_not_called()
+        assert prefetcher.stats()["skipped_busy"] == 3
+
+    def test_budget_limits_extractions(self):
+        clock = FakeClock()
+        prefetcher, extract = _prefetcher(top_k=4, budget_per_minute=2, clock=clock)
+        prefetcher.schedule(RELATED)
+        _drain(prefetcher)
+
+        assert extract.call_count == 2
+        assert prefetcher.stats()["skipped_budget"] == 2
+
+    def test_budget_refills_over_time(self):
+        clock = FakeClock()
+        prefetcher, extract = _prefetcher(top_k=1, budget_per_minute=1, clock=clock)
+        bucket = prefetcher._budget
+        assert bucket.take() is True
+        assert bucket.take() is False
+        clock.now += 60
+        assert bucket.take() is True
+
+    def test_drops_when_queue_full(self):
+        release = threading.Event()
+
+        def extract(url):
+            release.wait(5)
+            return ExtractionResult(success=True, track=_track())
+
+        prefetcher, _ = _prefetcher(extract=extract, top_k=4, max_pending=2)
+        assert prefetcher.schedule(RELATED) == 2
+        release.set()
+        _drain(prefetcher)
+        assert prefetcher.stats()["dropped"] == 2
+
+    def test_failures_are_counted_not_raised(self):
+        extract = MagicMock(side_effect=RuntimeError("boom"))
+        prefetcher, _ = _prefetcher(extract=extract, top_k=1)
+        prefetcher.schedule(RELATED)
+        _drain(prefetcher)
+        assert prefetcher.stats()["failed"] == 1
+
+    def test_schedule_after_shutdown_is_noop(self):
+        prefetcher, extract = _prefetcher()
+        prefetcher.shutdown()
+        assert prefetcher.schedule(RELATED) == 0
+        assert prefetcher.stats()["pending"] == 0
+
+
+class TestLoadAndCacheProbes:
+    """Test the side-effect-free signals the prefetcher relies on."""
+
+    def test_executor_load(self):
+        executor = ExtractionExecutor(max_workers=4)
+        assert executor.load() == 0.0
+        executor._running = 1
+        executor._queued = 1
+        assert executor.load() == 0.5
+        executor.shutdown()
+
+    def test_cache_contains_does_not_count(self, tmp_path):
+        cache = TrackCache(db_path=str(tmp_path / "cache.db"))
+        assert cache.contains("dQw4w9WgXcQ") is False
+        cache.put("dQw4w9WgXcQ", _track())
+        assert cache.contains("dQw4w9WgXcQ") is True
+
+        stats = cache.stats()
+        assert stats["hits"] == {"memory": 0, "disk": 0}
+        assert stats["misses"] == 0
+        cache.close()
+
+    def test_cache_contains_requires_stream(self, tmp_path):
+        cache = TrackCache(db_path=str(tmp_path / "cache.db"))
+        track = _track()
+        track.audio_url = ''
+        cache.put_metadata("dQw4w9WgXcQ", track)
+        assert cache.contains("dQw4w9WgXcQ") is False
+        cache.close()
+
+
+class TestResolvePrefetchHook:
+    """Test that resolves schedule their related tracks."""
+
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+
+    def test_resolve_schedules_related(self, client):
+        track = _track(related=RELATED)
+        with patch('api.routes.extraction_manager') as manager, \
+             patch('api.routes.related_prefetcher') as prefetcher:
+            manager.extract.return_value = ExtractionResult(success=True, track=track)
+            response = client.post(
+                "/api/resolve", json={"url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ"}
+            )
+
+        assert response.status_code == 200
+        prefetcher.schedule.assert_called_once_with(RELATED)
+
+    def test_failed_resolve_schedules_nothing(self, client):
+        with patch('api.routes.extraction_manager') as manager, \
+             patch('api.routes.related_prefetcher') as prefetcher:
+            manager.extract.return_value = ExtractionResult(success=False, error="nope")
+            response = client.post(
+                "/api/resolve", json={"url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ"}
+            )
+
+        assert response.status_code == 500
+        prefetcher.schedule.assert_not_called()
@@ -0,0 +1,230 @@
+"""Tests for the search result cache."""
+
+import json
+import threading
+import time
+
+import pytest
+from unittest.mock import MagicMock, patch
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from search_cache import SearchCache, normalize_query
+
+
+def parse_sse(text):
+    """[(event, data)] from a Server-Sent Events body."""
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def fake_search(total=100):
+    """Upstream stand-in returning up to `total` results."""
+    return MagicMock(side_effect=lambda query, limit: [
+        {"id": f"vid{i:08d}", "title": f"{query} {i}", "duration": 100}
+        for i in range(min(limit, total))
+    ])
+
+
+class TestNormalizeQuery:
+    """Test cache key normalization."""
+
+    @pytest.mark.parametrize("a,b", [
+        ("Daft Punk", "daft punk"),
+        ("  lofi   beats\t", "lofi beats"),
+        ("STRASSE", "straße"),
+        ("ｌｏｆｉ", "lofi"),
+        ("café", "café"),
+    ])
+    def test_equivalent(self, a, b):
+        assert normalize_query(a) == normalize_query(b)
+
+    def test_distinct(self):
+        assert normalize_query("daft punk") != normalize_query("daftpunk")
+
+
+class TestSearchCache:
+    """Test caching, limit subsetting and coalescing."""
+
+    def test_repeat_query_is_cached(self):
+        search = fake_search()
+        cache = SearchCache(search, fetch_limit=20)
+
+        first = cache.search("Daft Punk", 10)
+        second = cache.search("  daft   PUNK ", 10)
+
+        assert first == second
+        search.assert_called_once_with("daft punk", 20)
+        assert cache.stats()["hits"] == 1
+
+    def test_smaller_limit_served_from_larger(self):
+        search = fake_search()
+        cache = SearchCache(search, fetch_limit=5)
+
+        assert len(cache.search("lofi", 20)) == 20
+        assert len(cache.search("lofi", 10)) == 10
+        assert search.call_count == 1
+
+    def test_larger_limit_refetches(self):
+        search = fake_search()
+        cache = SearchCache(search, fetch_limit=20)
+
+        cache.search("lofi", 10)
+        assert len(cache.search("lofi", 40)) == 40
+        assert search.call_count == 2
+        # The bigger result now serves both
+        cache.search("lofi", 30)
+        assert search.call_count == 2
+
+    def test_short_result_serves_any_limit(self):
+        search = fake_search(total=3)
+        cache = SearchCache(search, fetch_limit=20)
+
+        cache.search("rare query", 10)
+        assert len(cache.search("rare query", 50)) == 3
+        assert search.call_count == 1
+
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        search = fake_search()
+        cache = SearchCache(search, ttl=60, clock=clock)
+
+        cache.search("lofi", 10)
+        clock.now += 61
+        cache.search("lofi", 10)
+        assert search.call_count == 2
+
+    def test_lru_eviction(self):
+        search = fake_search()
+        cache = SearchCache(search, max_entries=2)
+
+        cache.search("a query", 10)
+        cache.search("b query", 10)
+        cache.search("a query", 10)  # a is now most recent
+        cache.search("c query", 10)  # evicts b
+        cache.search("a query", 10)
+        cache.search("b query", 10)
+
+        assert search.call_count == 4
+        assert cache.stats()["evictions"] == 2
+
+    def test_empty_results_not_cached(self):
+        search = MagicMock(return_value=[])
+        cache = SearchCache(search)
+
+        cache.search("nothing", 10)
+        cache.search("nothing", 10)
+        assert search.call_count == 2
+
+    def test_concurrent_searches_coalesce(self):
+        release = threading.Event()
+        calls = []
+
+        def slow_search(query, limit):
+            calls.append(query)
+            release.wait(5)
+            return [{"id": "vid00000000", "title": query, "duration": 1}]
+
+        cache = SearchCache(slow_search)
+        results = []
+        threads = [
+            threading.Thread(target=lambda q=q: results.append(cache.search(q, 10)))
+            for q in ("Lofi", "lofi", " LOFI ")
+        ]
+        for t in threads:
+            t.start()
+        # Let every thread join the flight before the leader returns
+        deadline = time.monotonic() + 5
+        while cache.stats()["singleflight"]["coalesced"] < 2 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+        for t in threads:
+            t.join(5)
+
+        assert calls == ["lofi"]
+        assert len(results) == 3
+
+
+class TestSearchEndpointCache:
+    """Test /api/search goes through the cache."""
+
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+
+    def test_endpoint_uses_cache(self, client):
+        search = fake_search()
+        with patch('api.routes.search_cache', SearchCache(search)):
+            first = client.get('/api/search?q=Daft%20Punk&limit=5')
+            second = client.get('/api/search?q=daft%20punk&limit=3')
+
+        assert first.status_code == 200
+        assert len(first.json()["results"]) == 5
+        assert len(second.json()["results"]) == 3
+        assert search.call_count == 1
+
+    def test_stream_emits_results_then_done(self, client):
+        cache = SearchCache(fake_search())
+        items = [{"id": f"vid{i:08d}", "title": "t", "duration": 1, "thumbnail": ""} for i in range(3)]
+        with patch('api.routes.search_cache', cache), \
+                patch('api.routes.ytdlp_client') as ytdlp:
+            ytdlp.iter_search.return_value = (item for item in items)
+            response = client.get('/api/search/stream?q=Lofi&limit=3')
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_sse(response.text)
+        assert [name for name, _ in events] == ["result"] * 3 + ["done"]
+        assert events[0][1]["id"] == "vid00000000"
+        assert events[-1][1] == {"count": 3, "cached": False}
+        # Completed stream is cached for both endpoints
+        assert cache.search("lofi", 3) == items
+
+    def test_stream_replays_cache(self, client):
+        search = fake_search()
+        cache = SearchCache(search)
+        cache.search("lofi", 10)
+        with patch('api.routes.search_cache', cache), \
+                patch('api.routes.ytdlp_client') as ytdlp:
+            response = client.get('/api/search/stream?q=LOFI&limit=5')
+
+        events = parse_sse(response.text)
+        assert len(events) == 6
+        assert events[-1][1] == {"count": 5, "cached": True}
+        ytdlp.iter_search.assert_not_called()
+
+    def test_stream_error_event(self, client):
+        def failing(query, limit):
+            yield {"id": "vid00000000", "title": "t", "duration": 1, "thumbnail": ""}
+            raise ValueError("Search failed: blocked")
+
+        with patch('api.routes.search_cache', None), \
+                patch('api.routes.ytdlp_client') as ytdlp:
+            ytdlp.iter_search.side_effect = failing
+            response = client.get('/api/search/stream?q=lofi')
+
+        events = parse_sse(response.text)
+        assert [name for name, _ in events] == ["result", "error"]
+        assert "blocked" in events[-1][1]["detail"]
+
+    def test_stream_short_query(self, client):
+        assert client.get('/api/search/stream?q=a').status_code == 400
+
+    def test_stats_include_search(self, client):
+        with patch('api.routes.search_cache', SearchCache(fake_search())):
+            response = client.get('/api/stats')
+        assert "hit_ratio" in response.json()["search"]
@@ -0,0 +1,76 @@
+"""Tests for single-flight call coalescing."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test SingleFlight."""
+
+    @pytest.fixture
+    def flight(self):
+        return SingleFlight()
+
+    def test_single_call_runs_fn(self, flight):
+        result, shared = flight.do("key", lambda: 42)
+        assert result == 42
+        assert shared is False
+
+    def test_concurrent_calls_are_coalesced(self, flight):
+        """Only one call per key should run while it is in flight."""
+        calls = []
+        release = threading.Event()
+
+        def work():
+            calls.append(1)
+            release.wait(1)
+            return "shared"
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            futures = [pool.submit(flight.do, "vid", work) for _ in range(5)]
+            time.sleep(0.05)
+            release.set()
+            results = [f.result(timeout=1) for f in futures]
+
+        assert len(calls) == 1
+        assert all(result == "shared" for result, _ in results)
+        assert sum(1 for _, shared in results if shared) == 4
+        assert flight.stats() == {"in_flight": 0, "executed": 1, "coalesced": 4}
+
+    def test_different_keys_run_independently(self, flight):
+        assert flight.do("a", lambda: 1)[0] == 1
+        assert flight.do("b", lambda: 2)[0] == 2
+        assert flight.stats()["executed"] == 2
+
+    def test_error_is_shared_with_followers(self, flight):
+        release = threading.Event()
+
+        def fail():
+            release.wait(1)
+            raise ValueError("extraction failed")
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(flight.do, "vid", fail) for _ in range(3)]
+            time.sleep(0.05)
+            release.set()
+            for future in futures:
+                with pytest.raises(ValueError):
+                    future.result(timeout=1)
+
+        assert flight.stats()["in_flight"] == 0
+
+    def test_key_is_released_after_completion(self, flight):
+        """A later call should run again rather than reuse old results."""
+        flight.do("vid", lambda: 1)
+        result, shared = flight.do("vid", lambda: 2)
+        assert result == 2
+        assert shared is False
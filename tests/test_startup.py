@@ -0,0 +1,153 @@
+"""Tests for startup timings, lazy yt-dlp import and pre-warm."""
+
+import subprocess
+
+import pytest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import yt_dlp_client
+from startup import StartupTimings, prewarm, start_prewarm
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestStartupTimings:
+    """Milestones and phase durations."""
+
+    def test_milestones_since_origin(self):
+        clock = FakeClock()
+        timings = StartupTimings(origin=99.5, clock=clock)
+        timings.mark("imported")
+        clock.now = 101.0
+        timings.mark("ready")
+        assert timings.stats()["milestones_ms"] == {"imported": 500.0, "ready": 1500.0}
+
+    def test_phase_records_duration(self):
+        clock = FakeClock()
+        timings = StartupTimings(clock=clock)
+        with timings.phase("yt_dlp_import"):
+            clock.now += 0.25
+        stats = timings.stats()
+        assert stats["phases_ms"] == {"yt_dlp_import": 250.0}
+        assert stats["errors"] == {}
+
+    def test_phase_records_and_reraises_errors(self):
+        timings = StartupTimings()
+        with pytest.raises(RuntimeError):
+            with timings.phase("player_js"):
+                raise RuntimeError("offline")
+        stats = timings.stats()
+        assert stats["errors"] == {"player_js": "offline"}
+        assert "player_js" in stats["phases_ms"]
+
+    def test_initial_state_pending(self):
+        assert StartupTimings().stats()["prewarm"] == "pending"
+
+
+class TestPrewarm:
+    """Background yt-dlp warm-up."""
+
+    @patch('yt_dlp_client.YoutubeDL')
+    def test_all_phases(self, mock_ydl):
+        ydl = mock_ydl.return_value
+        pool = MagicMock()
+        timings = StartupTimings()
+
+        prewarm(timings, worker_pool=pool, probe_video="dQw4w9WgXcQ")
+
+        stats = timings.stats()
+        assert stats["prewarm"] == "done"
+        assert set(stats["phases_ms"]) == {
+            "yt_dlp_import", "yt_dlp_extractors", "worker_pool", "player_js"
+        }
+        assert "prewarmed" in stats["milestones_ms"]
+        assert ydl.get_info_extractor.call_count == 3
+        # Format selection is fixed at construction; params edits are ignored
+        assert mock_ydl.call_args.args[0]['format'] == 'bestaudio'
+        pool.warm.assert_called_once()
+        ydl.extract_info.assert_called_once_with(
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ", download=False
+        )
+        ydl.close.assert_called_once()
+
+    @patch('yt_dlp_client.YoutubeDL')
+    def test_player_phase_optional(self, mock_ydl):
+        timings = StartupTimings()
+        prewarm(timings)
+        assert set(timings.stats()["phases_ms"]) == {"yt_dlp_import", "yt_dlp_extractors"}
+        mock_ydl.return_value.extract_info.assert_not_called()
+
+    @patch('yt_dlp_client.YoutubeDL')
+    def test_failure_recorded_not_raised(self, mock_ydl):
+        mock_ydl.return_value.extract_info.side_effect = Exception("HTTP Error 429")
+        timings = StartupTimings()
+
+        prewarm(timings, probe_video="dQw4w9WgXcQ")
+
+        stats = timings.stats()
+        assert stats["prewarm"] == "failed"
+        assert stats["errors"] == {"player_js": "HTTP Error 429"}
+        assert "prewarmed" not in stats["milestones_ms"]
+        mock_ydl.return_value.close.assert_called_once()
+
+    def test_disabled(self):
+        timings = StartupTimings()
+        with patch('startup.config.ytdlp.prewarm', False):
+            assert start_prewarm(timings) is None
+        assert timings.stats()["prewarm"] == "disabled"
+
+    @patch('yt_dlp_client.YoutubeDL')
+    def test_start_runs_in_background(self, mock_ydl):
+        timings = StartupTimings()
+        with patch('startup.config.ytdlp.prewarm', True), \
+                patch('startup.config.ytdlp.prewarm_player', False):
+            thread = start_prewarm(timings)
+        assert thread.daemon
+        thread.join(timeout=5)
+        assert timings.stats()["prewarm"] == "done"
+        mock_ydl.return_value.extract_info.assert_not_called()
+
+
+class TestLazyImport:
+    """yt-dlp stays off the import path of the app."""
+
+    def test_main_does_not_import_yt_dlp(self):
+        result = subprocess.run(
+            [sys.executable, "-c", "import main, sys; print('yt_dlp' in sys.modules)"],
+            cwd=ROOT, capture_output=True, text=True, timeout=60,
+            env={**os.environ, "PREFETCH_ENABLED": "false", "CATALOG_DB_PATH": ":memory:"}
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == "False"
+
+    @pytest.mark.parametrize("module", ["yt_dlp_client", "extraction_workers"])
+    def test_low_level_modules_skip_extraction_manager(self, module):
+        # Workers and the client build tracks without the manager's globals
+        result = subprocess.run(
+            [sys.executable, "-c",
+             f"import {module}, sys; print('extraction_backends' in sys.modules)"],
+            cwd=ROOT, capture_output=True, text=True, timeout=60
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == "False"
+
+    def test_names_resolve_on_access(self):
+        from yt_dlp.utils import DownloadError
+        assert yt_dlp_client.DownloadError is DownloadError
+
+    @patch('yt_dlp_client.YoutubeDL')
+    def test_patched_name_is_kept(self, mock_ydl):
+        assert yt_dlp_client._load_yt_dlp() is mock_ydl
@@ -0,0 +1,127 @@
+"""Tests for the search suggestion index."""
+
+import time
+
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from suggest_index import SuggestIndex
+
+
+class TestSuggestIndex:
+    """Test prefix lookup, weighting and bounds."""
+
+    def test_prefix_match(self):
+        index = SuggestIndex()
+        index.add("Daft Punk")
+        index.add("Daft Punk - Around the World")
+        index.add("Dave Brubeck")
+
+        assert set(index.suggest("daft")) == {"Daft Punk", "Daft Punk - Around the World"}
+        assert "Dave Brubeck" in index.suggest("da", limit=10)
+        assert index.suggest("zzz") == []
+
+    def test_normalized_lookup(self):
+        index = SuggestIndex()
+        index.add("Café  del   Mar")
+        assert index.suggest("CAFÉ DEL") == ["Café del Mar"]
+
+    def test_popularity_order(self):
+        index = SuggestIndex()
+        index.add("lofi beats", 1)
+        index.add("lofi hip hop", 5)
+        index.add("lofi girl", 3)
+
+        assert index.suggest("lofi") == ["lofi hip hop", "lofi girl", "lofi beats"]
+        assert index.suggest("lofi", limit=1) == ["lofi hip hop"]
+
+    def test_repeated_terms_accumulate(self):
+        index = SuggestIndex()
+        index.add("lofi girl", 2)
+        for _ in range(3):
+            index.add("LOFI BEATS")
+
+        assert index.suggest("lofi") == ["LOFI BEATS", "lofi girl"]
+        assert index.stats()["terms"] == 2
+
+    def test_record_search_weights_query_over_results(self):
+        index = SuggestIndex()
+        index.record_search("daft punk", [{"title": "Daft Punk - One More Time"}])
+        index.record_play("Daft Punk - Get Lucky")
+
+        assert index.suggest("daft") == [
+            "daft punk", "Daft Punk - Get Lucky", "Daft Punk - One More Time"
+        ]
+
+    def test_bounded_memory(self):
+        index = SuggestIndex(max_terms=100)
+        for i in range(500):
+            index.add(f"term {i:04d}", weight=i)
+
+        assert index.stats()["terms"] <= 100
+        assert index.stats()["evictions"] >= 400
+        # Heaviest terms survive
+        assert index.suggest("term 0499") == ["term 0499"]
+        assert index.suggest("term 0000") == []
+
+    def test_scan_limit_bounds_short_prefixes(self):
+        index = SuggestIndex(scan_limit=10)
+        for i in range(100):
+            index.add(f"aa {i:03d}")
+        assert len(index.suggest("aa", limit=50)) == 10
+
+    def test_ignores_tiny_terms(self):
+        index = SuggestIndex()
+        index.add("")
+        index.add("a")
+        assert index.stats()["terms"] == 0
+
+    def test_lookup_is_sub_millisecond(self):
+        index = SuggestIndex(max_terms=20000)
+        for i in range(20000):
+            index.add(f"artist {i % 500} song {i}", weight=i % 7)
+
+        started = time.perf_counter()
+        for i in range(1000):
+            index.suggest(f"artist {i % 500}")
+        per_lookup = (time.perf_counter() - started) / 1000
+        assert per_lookup < 0.001
+
+
+class TestSuggestEndpoint:
+    """Test GET /api/suggest and index feeding."""
+
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+
+    def test_suggest_endpoint(self, client):
+        index = SuggestIndex()
+        index.add("daft punk", 3)
+        with patch('api.routes.suggest_index', index):
+            response = client.get('/api/suggest?q=Daft')
+
+        assert response.status_code == 200
+        assert response.json() == {"query": "Daft", "suggestions": ["daft punk"]}
+
+    def test_empty_query(self, client):
+        response = client.get('/api/suggest?q=')
+        assert response.status_code == 200
+        assert response.json()["suggestions"] == []
+
+    def test_search_feeds_index(self, client):
+        index = SuggestIndex()
+        results = [{"id": "vid00000000", "title": "Lofi Girl Radio", "duration": 0}]
+        with patch('api.routes.suggest_index', index), \
+                patch('api.routes.search_cache', None), \
+                patch('api.routes.ytdlp_client') as ytdlp:
+            ytdlp.search.return_value = results
+            client.get('/api/search?q=lofi radio')
+
+        assert index.suggest("lofi") == ["lofi radio", "Lofi Girl Radio"]
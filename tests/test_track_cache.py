@@ -0,0 +1,239 @@
+"""Tests for the two-tier track metadata cache."""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extraction_backends import BackendType, TrackInfo
+from track_cache import TrackCache
+
+
+class FakeClock:
+    """Manually advanced wall clock."""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_track(video_id: str = "abc123defgh", audio_url: str = "https://example.com/a"):
+    return TrackInfo(
+        id=video_id,
+        title=f"Track {video_id}",
+        duration=180,
+        audio_url=audio_url,
+        backend=BackendType.YT_DLP,
+        related=[{"id": "rel1", "title": "Related", "duration": 120}],
+        embed_url=f"https://www.youtube.com/embed/{video_id}",
+        invidious_url=f"https://yewtu.be/embed/{video_id}",
+    )
+
+
+class TestTrackCache:
+    """Test TrackCache."""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def cache(self, tmp_path, clock):
+        cache = TrackCache(
+            memory_entries=2,
+            metadata_ttl=300,
+            stream_ttl=60,
+            db_path=str(tmp_path / "tracks.db"),
+            clock=clock,
+        )
+        yield cache
+        cache.close()
+
+    def test_miss_then_memory_hit(self, cache):
+        assert cache.get("abc123defgh") is None
+        cache.put("abc123defgh", make_track())
+
+        track = cache.get("abc123defgh")
+
+        assert track.title == "Track abc123defgh"
+        stats = cache.stats()
+        assert stats["hits"]["memory"] == 1
+        assert stats["misses"] == 1
+
+    def test_lru_eviction(self, cache):
+        """Least recently used entry should be evicted from memory."""
+        cache.put("aaaaaaaaaaa", make_track("aaaaaaaaaaa"))
+        cache.put("bbbbbbbbbbb", make_track("bbbbbbbbbbb"))
+        cache.get("aaaaaaaaaaa")
+        cache.put("ccccccccccc", make_track("ccccccccccc"))
+
+        stats = cache.stats()
+        assert stats["memory_entries"] == 2
+        assert stats["evictions"]["memory"] == 1
+
+        # Evicted entry is still served from the disk tier
+        assert cache.get("bbbbbbbbbbb") is not None
+        assert cache.stats()["hits"]["disk"] == 1
+
+    def test_disk_tier_survives_restart(self, tmp_path, clock):
+        path = str(tmp_path / "tracks.db")
+        first = TrackCache(db_path=path, clock=clock)
+        first.put("abc123defgh", make_track())
+        first.close()
+
+        second = TrackCache(db_path=path, clock=clock)
+        track = second.get("abc123defgh")
+        second.close()
+
+        assert track.id == "abc123defgh"
+        assert track.backend == BackendType.YT_DLP
+        assert track.related[0]["id"] == "rel1"
+
+    def test_stream_ttl_shorter_than_metadata(self, cache, clock):
+        """Expired audio_url is a miss unless only metadata is needed."""
+        cache.put("abc123defgh", make_track())
+        clock.now += 120
+
+        assert cache.get("abc123defgh") is None
+        assert cache.stats()["stale_streams"] == 1
+
+        track = cache.get("abc123defgh", require_stream=False)
+        assert track.title == "Track abc123defgh"
+        assert track.audio_url == ""
+
+    def test_metadata_expiry(self, cache, clock):
+        cache.put("abc123defgh", make_track())
+        clock.now += 301
+
+        assert cache.get("abc123defgh", require_stream=False) is None
+        assert cache.stats()["expired"] == 1
+
+    def test_track_without_audio_url_is_metadata_only(self, cache):
+        cache.put("abc123defgh", make_track(audio_url=""))
+
+        assert cache.get("abc123defgh") is None
+        assert cache.get("abc123defgh", require_stream=False) is not None
+
+    def test_metadata_keeps_full_entry_on_disk(self, cache):
+        """A full entry evicted from memory is not replaced by metadata."""
+        cache.put("abc123defgh", make_track())
+        cache.put("bbbbbbbbbbb", make_track("bbbbbbbbbbb"))
+        cache.put("ccccccccccc", make_track("ccccccccccc"))
+
+        cache.put_metadata("abc123defgh", make_track(audio_url=""))
+
+        assert cache.get("abc123defgh").audio_url == "https://example.com/a"
+
+    def test_metadata_replaces_stale_disk_entry(self, cache, clock):
+        cache.put("abc123defgh", make_track())
+        cache.put("bbbbbbbbbbb", make_track("bbbbbbbbbbb"))
+        cache.put("ccccccccccc", make_track("ccccccccccc"))
+        clock.now += 120
+
+        cache.put_metadata("abc123defgh", make_track(audio_url=""))
+        clock.now += 250
+
+        # The new metadata-only entry outlives the old one's metadata TTL
+        assert cache.get("abc123defgh", require_stream=False) is not None
+
+    def test_invalidate(self, cache):
+        cache.put("abc123defgh", make_track())
+        cache.invalidate("abc123defgh")
+        assert cache.get("abc123defgh", require_stream=False) is None
+
+    def test_memory_only_when_db_disabled(self, clock):
+        cache = TrackCache(db_path="", clock=clock)
+        cache.put("abc123defgh", make_track())
+        assert cache.get("abc123defgh") is not None
+        assert cache.stats()["disk_enabled"] is False
+
+    def test_disk_prune_caps_rows(self, tmp_path, clock):
+        cache = TrackCache(
+            memory_entries=0, disk_entries=5,
+            db_path=str(tmp_path / "tracks.db"), clock=clock
+        )
+        cache.PRUNE_EVERY = 10
+        for i in range(10):
+            clock.now += 1
+            cache.put(f"video{i:06d}", make_track(f"video{i:06d}"))
+
+        assert cache.stats()["evictions"]["disk"] == 5
+        assert cache.get("video000000") is None
+        assert cache.get("video000009") is not None
+        cache.close()
+
+
+class TestRefreshAhead:
+    """Test expiry-aware refresh-ahead decisions."""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    def make_cache(self, clock, rng=lambda: 0.5):
+        cache = TrackCache(
+            metadata_ttl=3600, stream_ttl=60, db_path="", clock=clock, rng=rng
+        )
+        cache._expiry_margin = 60
+        cache._refresh_min_hits = 3
+        cache._refresh_min_lead = 10.0
+        cache._refresh_beta = 1.0
+        return cache
+
+    def hot_track(self, cache, clock, expires_in):
+        track = make_track(audio_url=f"https://rr1.googlevideo.com/videoplayback?expire={int(clock.now + expires_in)}&itag=251")
+        track.expires_at = int(clock.now + expires_in)
+        cache.put("abc123defgh", track)
+        for _ in range(3):
+            cache.get("abc123defgh")
+        return track
+
+    def test_stream_expiry_taken_from_url(self, clock):
+        cache = self.make_cache(clock)
+        self.hot_track(cache, clock, expires_in=6 * 3600)
+
+        # stream_ttl (60s) is ignored when the URL states its own expiry
+        clock.now += 600
+        assert cache.get("abc123defgh") is not None
+
+        # ... but the margin before the real expiry is honoured
+        clock.now += 6 * 3600 - 600 - 59
+        assert cache.get("abc123defgh") is None
+
+    def test_cold_entries_are_not_refreshed(self, clock):
+        cache = self.make_cache(clock)
+        track = make_track()
+        cache.put("abc123defgh", track)
+        clock.now += 59
+        assert cache.claim_refresh("abc123defgh") is False
+
+    def test_hot_entry_far_from_expiry_not_refreshed(self, clock):
+        cache = self.make_cache(clock)
+        self.hot_track(cache, clock, expires_in=3600)
+        assert cache.claim_refresh("abc123defgh") is False
+
+    def test_hot_entry_near_expiry_claimed_once(self, clock):
+        cache = self.make_cache(clock)
+        self.hot_track(cache, clock, expires_in=3600)
+        clock.now += 3600 - 60 - 5  # 5s before the margin-adjusted expiry
+
+        assert cache.claim_refresh("abc123defgh") is True
+        assert cache.claim_refresh("abc123defgh") is False
+        assert cache.stats()["refreshes"] == 1
+
+        cache.release_refresh("abc123defgh")
+        assert cache.claim_refresh("abc123defgh") is True
+
+    def test_refresh_timing_is_randomized(self, clock):
+        """The same entry state refreshes or not depending on the draw."""
+        early = self.make_cache(clock, rng=lambda: 0.99)  # long lead
+        late = self.make_cache(clock, rng=lambda: 0.01)   # short lead
+        for cache in (early, late):
+            self.hot_track(cache, clock, expires_in=3600)
+        clock.now += 3600 - 60 - 30  # 30s before expiry
+
+        assert early.claim_refresh("abc123defgh") is True
+        assert late.claim_refresh("abc123defgh") is False
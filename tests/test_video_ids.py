@@ -0,0 +1,104 @@
+"""Tests for the canonical video ID parser."""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from video_ids import parse_playlist_url, parse_video_id, watch_url
+
+
+class TestParseVideoId:
+    """Test every supported URL shape."""
+
+    @pytest.mark.parametrize("value", [
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "http://youtube.com/watch?v=dQw4w9WgXcQ",
+        "youtube.com/watch?v=dQw4w9WgXcQ",
+        "https://m.youtube.com/watch?v=dQw4w9WgXcQ",
+        "https://music.youtube.com/watch?v=dQw4w9WgXcQ&list=RDAMVMdQw4w9WgXcQ",
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=30s",
+        "https://www.youtube.com/watch?feature=share&v=dQw4w9WgXcQ",
+        "https://www.youtube.com/watch?app=desktop&list=PL123&v=dQw4w9WgXcQ#t=5",
+        "https://www.youtube.com/embed/dQw4w9WgXcQ?autoplay=1",
+        "https://www.youtube-nocookie.com/embed/dQw4w9WgXcQ",
+        "https://www.youtube.com/v/dQw4w9WgXcQ",
+        "https://youtube.com/shorts/dQw4w9WgXcQ?si=abc",
+        "https://www.youtube.com/live/dQw4w9WgXcQ",
+        "https://youtu.be/dQw4w9WgXcQ?si=share",
+        "youtu.be/dQw4w9WgXcQ",
+        "dQw4w9WgXcQ",
+        "  https://youtu.be/dQw4w9WgXcQ\n",
+    ])
+    def test_supported_shapes(self, value):
+        assert parse_video_id(value) == "dQw4w9WgXcQ"
+
+    @pytest.mark.parametrize("value", [
+        None,
+        "",
+        "not a url",
+        "https://www.google.com/watch?v=dQw4w9WgXcQ",
+        "https://vimeo.com/123456",
+        "https://youtube.com/watch?v=",
+        "https://youtube.com/watch?v=short",
+        "https://youtube.com/watch?v=dQw4w9WgXcQextra",
+        "https://youtube.com/watch?list=dQw4w9WgXcQ",
+        "dQw4w9WgXc",
+        "dQw4w9WgXcQ1",
+    ])
+    def test_rejects(self, value):
+        assert parse_video_id(value) is None
+
+    def test_watch_url_round_trip(self):
+        assert parse_video_id(watch_url("dQw4w9WgXcQ")) == "dQw4w9WgXcQ"
+
+
+class TestParsePlaylistUrl:
+    """Test playlist and channel URL normalization."""
+
+    @pytest.mark.parametrize("value,expected", [
+        ("https://www.youtube.com/playlist?list=PLabc_-123",
+         "https://www.youtube.com/playlist?list=PLabc_-123"),
+        ("https://music.youtube.com/playlist?list=OLAK5uy_abc",
+         "https://www.youtube.com/playlist?list=OLAK5uy_abc"),
+        ("https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PLabc",
+         "https://www.youtube.com/playlist?list=PLabc"),
+        ("https://www.youtube.com/@SomeArtist",
+         "https://www.youtube.com/@SomeArtist/videos"),
+        ("https://www.youtube.com/@SomeArtist/featured",
+         "https://www.youtube.com/@SomeArtist/videos"),
+        ("https://www.youtube.com/@SomeArtist/streams?view=0",
+         "https://www.youtube.com/@SomeArtist/streams"),
+        ("https://www.youtube.com/channel/UCuAXFkgsw1L7xaCfnd5JJOw",
+         "https://www.youtube.com/channel/UCuAXFkgsw1L7xaCfnd5JJOw/videos"),
+        ("youtube.com/user/legacyname",
+         "https://www.youtube.com/user/legacyname/videos"),
+    ])
+    def test_supported_shapes(self, value, expected):
+        assert parse_playlist_url(value) == expected
+
+    @pytest.mark.parametrize("value", [
+        None,
+        "",
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "https://youtu.be/dQw4w9WgXcQ",
+        "https://www.youtube.com/feed/trending",
+        "https://www.youtube.com/@SomeArtist/community",
+        "https://www.google.com/playlist?list=PLabc",
+    ])
+    def test_rejects(self, value):
+        assert parse_playlist_url(value) is None
+
+
+class TestSharedByEntryPoints:
+    """Every entry point agrees with the canonical parser."""
+
+    def test_client_and_backends(self):
+        from yt_dlp_client import YTDLPCClient
+        from extraction_backends import InvidiousExtractionBackend, YTDLPExtractionBackend
+
+        url = "https://music.youtube.com/watch?v=dQw4w9WgXcQ"
+        assert YTDLPCClient().extract_video_id(url) == "dQw4w9WgXcQ"
+        assert YTDLPExtractionBackend()._extract_video_id(url) == "dQw4w9WgXcQ"
+        assert InvidiousExtractionBackend()._extract_video_id(url) == "dQw4w9WgXcQ"
@@ -101,6 +101,7 @@ class TestYTDLPCClient:
         assert result.duration == 213
         assert result.audio_url == 'https://rr1---sn-xxxxx.googlevideo.com/...'
         assert len(result.related) == 2
+        assert result.embed_url == 'https://www.youtube.com/embed/dQw4w9WgXcQ'
     
     def test_resolve_track_invalid_url(self, client):
         """Test that invalid URL raises ValueError."""
@@ -162,6 +163,144 @@ class TestYTDLPCClient:
         
         results = client.search("test")
         assert results == []
+    
+    @patch('yt_dlp_client.YoutubeDL')
+    def test_iter_search_is_lazy(self, mock_youtube_dl, client):
+        """Results are yielded while yt-dlp's entries generator runs."""
+        pulled = []
+        
+        def entries():
+            for i in range(5):
+                pulled.append(i)
+                yield {'id': f'video{i}', 'title': f'Song {i}', 'duration': None}
+        
+        mock_youtube_dl.return_value.extract_info.return_value = {'entries': entries()}
+        results = client.iter_search("lofi beats", limit=3)
+        
+        first = next(results)
+        assert first == {'id': 'video0', 'title': 'Song 0', 'duration': 0, 'thumbnail': ''}
+        assert pulled == [0]
+        assert [r['id'] for r in results] == ['video1', 'video2']
+        assert mock_youtube_dl.return_value.extract_info.call_args.kwargs['process'] is False
+        mock_youtube_dl.return_value.close.assert_called_once()
+    
+    @patch('yt_dlp_client.YoutubeDL')
+    def test_iter_search_error(self, mock_youtube_dl, client):
+        from yt_dlp.utils import DownloadError
+        mock_youtube_dl.return_value.extract_info.side_effect = DownloadError("blocked")
+        
+        with pytest.raises(ValueError):
+            list(client.iter_search("test"))
+        mock_youtube_dl.return_value.close.assert_called_once()
+
+
+class TestOpenPlaylist:
+    """Test flat, paged playlist enumeration."""
+    
+    @pytest.fixture
+    def client(self):
+        return YTDLPCClient()
+    
+    @staticmethod
+    def _info(entries):
+        return {
+            '_type': 'playlist',
+            'id': 'PLabc',
+            'title': 'Mix',
+            'uploader': 'Someone',
+            'entries': entries,
+        }
+    
+    @staticmethod
+    def _entries(count):
+        for i in range(count):
+            yield {'_type': 'url', 'id': f'vid{i:08d}', 'title': f'Song {i}', 'duration': 100 + i}
+    
+    @patch('yt_dlp_client.YoutubeDL')
+    def test_pages_lazily(self, mock_youtube_dl, client):
+        """Entries are pulled from yt-dlp's generator one page at a time."""
+        pulled = []
+        
+        def entries():
+            for entry in self._entries(5):
+                pulled.append(entry['id'])
+                yield entry
+        
+        mock_youtube_dl.return_value.extract_info.return_value = self._info(entries())
+        pager = client.open_playlist("https://www.youtube.com/playlist?list=PLabc", page_size=2)
+        
+        kwargs = mock_youtube_dl.return_value.extract_info.call_args.kwargs
+        assert kwargs['process'] is False
+        assert pager.title == 'Mix'
+        assert pulled == []
+        
+        first = pager.next_page()
+        assert [e['id'] for e in first] == ['vid00000000', 'vid00000001']
+        assert first[0]['url'] == 'https://www.youtube.com/watch?v=vid00000000'
+        assert len(pulled) == 2
+        
+        assert len(pager.next_page()) == 2
+        assert len(pager.next_page()) == 1
+        assert pager.next_page() == []
+        assert pager.count == 5
+        assert pager.truncated is False
+        
+        pager.close()
+        mock_youtube_dl.return_value.close.assert_called_once()
+    
+    @patch('yt_dlp_client.YoutubeDL')
+    def test_max_entries_truncates(self, mock_youtube_dl, client):
+        mock_youtube_dl.return_value.extract_info.return_value = self._info(self._entries(10))
+        pager = client.open_playlist(
+            "https://www.youtube.com/playlist?list=PLabc", page_size=50, max_entries=3
+        )
+        
+        assert len(pager.next_page()) == 3
+        assert pager.next_page() == []
+        assert pager.truncated is True
+    
+    @patch('yt_dlp_client.YoutubeDL')
+    def test_skips_non_video_entries(self, mock_youtube_dl, client):
+        entries = [
+            {'id': 'PLnested', 'title': 'Nested playlist'},
+            {'id': 'vid00000001', 'title': 'Song', 'duration': None},
+        ]
+        mock_youtube_dl.return_value.extract_info.return_value = self._info(entries)
+        pager = client.open_playlist("https://www.youtube.com/@artist")
+        
+        page = pager.next_page()
+        assert [e['id'] for e in page] == ['vid00000001']
+        assert page[0]['duration'] == 0
+        assert pager.skipped == 1
+        assert mock_youtube_dl.return_value.extract_info.call_args.args[0] == (
+            "https://www.youtube.com/@artist/videos"
+        )
+    
+    @patch('yt_dlp_client.YoutubeDL')
+    def test_follows_channel_redirect(self, mock_youtube_dl, client):
+        mock_youtube_dl.return_value.extract_info.side_effect = [
+            {'_type': 'url', 'url': 'https://www.youtube.com/channel/UCx/videos'},
+            self._info([]),
+        ]
+        pager = client.open_playlist("https://www.youtube.com/c/legacy")
+        
+        assert pager.id == 'PLabc'
+        assert mock_youtube_dl.return_value.extract_info.call_count == 2
+    
+    def test_rejects_video_url(self, client):
+        with pytest.raises(ValueError) as exc_info:
+            client.open_playlist("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+        assert "Invalid YouTube playlist" in str(exc_info.value)
+    
+    @patch('yt_dlp_client.YoutubeDL')
+    def test_download_error_closes(self, mock_youtube_dl, client):
+        from yt_dlp.utils import DownloadError
+        mock_youtube_dl.return_value.extract_info.side_effect = DownloadError("gone")
+        
+        with pytest.raises(ValueError) as exc_info:
+            client.open_playlist("https://www.youtube.com/playlist?list=PLgone")
+        assert "Failed to load playlist" in str(exc_info.value)
+        mock_youtube_dl.return_value.close.assert_called_once()
 
 
 class TestTrackInfo:
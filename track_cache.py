@@ -0,0 +1,402 @@
+"""
+Two-tier track metadata cache.
+
+Sits in front of ExtractionManager.extract so replaying a track does not
+run a fresh yt-dlp extraction:
+
+- Tier 1: size-bounded in-process LRU (OrderedDict)
+- Tier 2: persistent SQLite table that survives restarts
+
+Stable metadata (title, duration, related, embed URLs) and the short-lived
+direct ``audio_url`` carry separate expiry times. The stream expiry comes
+from the URL's own ``expire=`` parameter when present. A stale stream URL
+is never handed out: callers that need it get a miss, metadata-only
+callers get the track with ``audio_url`` blanked.
+
+Popular entries are refreshed ahead of expiry. ``claim_refresh`` uses
+probabilistic early expiration (XFetch): each hit refreshes with a
+probability that rises as expiry approaches, so many hot keys do not all
+re-extract in the same second.
+"""
+
+import dataclasses
+import json
+import math
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from config import config
+from track_info import BackendType, TrackInfo
+
+
+@dataclasses.dataclass
+class CachedTrack:
+    """A cached TrackInfo with per-part expiry (wall-clock seconds)."""
+    track: object
+    metadata_expires_at: float
+    stream_expires_at: float
+    cost: float = 0.0  # Seconds the extraction took (refresh-ahead lead)
+    hits: int = 0
+    refreshing: bool = False
+
+    def expires_at(self) -> float:
+        """Earliest expiry of the parts this entry actually holds."""
+        if not self.track.audio_url:
+            return self.metadata_expires_at
+        return min(self.metadata_expires_at, self.stream_expires_at)
+
+
+def _encode(track) -> str:
+    fields = dataclasses.asdict(track)
+    fields['backend'] = track.backend.value
+    return json.dumps(fields, separators=(',', ':'))
+
+
+def _decode(payload: str):
+    fields = json.loads(payload)
+    fields['backend'] = BackendType(fields['backend'])
+    return TrackInfo(**fields)
+
+
+class TrackCache:
+    """In-memory LRU backed by SQLite, keyed by video ID."""
+
+    # Prune expired/overflow rows from SQLite every N writes
+    PRUNE_EVERY = 100
+
+    def __init__(
+        self,
+        memory_entries: Optional[int] = None,
+        metadata_ttl: Optional[int] = None,
+        stream_ttl: Optional[int] = None,
+        db_path: Optional[str] = None,
+        disk_entries: Optional[int] = None,
+        clock: Callable[[], float] = time.time,
+        rng: Callable[[], float] = random.random
+    ):
+        """
+        Initialize cache. The SQLite file is opened on first use.
+
+        Args:
+            memory_entries: Max tracks kept in the in-process LRU
+            metadata_ttl: Seconds title/duration/related stay valid
+            stream_ttl: Seconds a direct audio_url stays valid
+            db_path: SQLite file path ("" disables the disk tier)
+            disk_entries: Max rows kept in SQLite
+            clock: Time source (wall clock, so disk expiry survives restarts)
+            rng: Uniform [0, 1) source for refresh-ahead jitter
+        """
+        cfg = config.cache
+        self._memory_entries = cfg.memory_entries if memory_entries is None else memory_entries
+        self._metadata_ttl = cfg.metadata_ttl if metadata_ttl is None else metadata_ttl
+        self._stream_ttl = cfg.stream_ttl if stream_ttl is None else stream_ttl
+        self._db_path = cfg.db_path if db_path is None else db_path
+        self._disk_entries = cfg.disk_entries if disk_entries is None else disk_entries
+        self._expiry_margin = cfg.stream_expiry_margin
+        self._refresh_min_hits = cfg.refresh_min_hits
+        self._refresh_min_lead = cfg.refresh_min_lead
+        self._refresh_beta = cfg.refresh_beta
+        self._clock = clock
+        self._rng = rng
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, CachedTrack]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes = 0
+
+        self._hits_memory = 0
+        self._hits_disk = 0
+        self._misses = 0
+        self._stale_streams = 0
+        self._expired = 0
+        self._evictions_memory = 0
+        self._evictions_disk = 0
+        self._refreshes = 0
+
+    # ---------- SQLite tier ----------
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        """Open the SQLite tier lazily (caller holds the lock)."""
+        if not self._db_path:
+            return None
+        if self._conn is None:
+            directory = os.path.dirname(self._db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self._db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tracks ("
+                " video_id TEXT PRIMARY KEY,"
+                " payload TEXT NOT NULL,"
+                " metadata_expires_at REAL NOT NULL,"
+                " stream_expires_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS tracks_updated ON tracks(updated_at)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _disk_get(self, video_id: str) -> Optional[CachedTrack]:
+        db = self._db()
+        if db is None:
+            return None
+        row = db.execute(
+            "SELECT payload, metadata_expires_at, stream_expires_at"
+            " FROM tracks WHERE video_id = ?",
+            (video_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return CachedTrack(_decode(row[0]), row[1], row[2])
+
+    def _disk_put(self, video_id: str, entry: CachedTrack):
+        db = self._db()
+        if db is None:
+            return
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO tracks VALUES (?, ?, ?, ?, ?)",
+                (video_id, _encode(entry.track), entry.metadata_expires_at,
+                 entry.stream_expires_at, self._clock())
+            )
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self._disk_prune(db)
+
+    def _disk_delete(self, video_id: str):
+        db = self._db()
+        if db is not None:
+            with db:
+                db.execute("DELETE FROM tracks WHERE video_id = ?", (video_id,))
+
+    def _disk_prune(self, db: sqlite3.Connection):
+        """Drop expired rows, then the oldest rows beyond disk_entries."""
+        with db:
+            expired = db.execute(
+                "DELETE FROM tracks WHERE metadata_expires_at <= ?",
+                (self._clock(),)
+            ).rowcount
+            overflow = db.execute(
+                "DELETE FROM tracks WHERE video_id IN ("
+                " SELECT video_id FROM tracks ORDER BY updated_at DESC"
+                " LIMIT -1 OFFSET ?)",
+                (self._disk_entries,)
+            ).rowcount
+        self._evictions_disk += expired + overflow
+
+    # ---------- Memory tier ----------
+
+    def _memory_put(self, video_id: str, entry: CachedTrack):
+        if self._memory_entries <= 0:
+            return
+        self._memory[video_id] = entry
+        self._memory.move_to_end(video_id)
+        while len(self._memory) > self._memory_entries:
+            self._memory.popitem(last=False)
+            self._evictions_memory += 1
+
+    # ---------- Public API ----------
+
+    def get(self, video_id: str, require_stream: bool = True):
+        """
+        Look up a track.
+
+        Args:
+            video_id: 11-character YouTube video ID
+            require_stream: If True, only return tracks whose audio_url is
+                still fresh; otherwise return metadata with a blank
+                audio_url when the stream URL has expired
+
+        Returns:
+            TrackInfo or None on miss
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._memory.get(video_id)
+            from_disk = False
+            if entry is None:
+                entry = self._disk_get(video_id)
+                from_disk = entry is not None
+
+            if entry is None or entry.metadata_expires_at <= now:
+                if entry is not None:
+                    self._memory.pop(video_id, None)
+                    self._disk_delete(video_id)
+                    self._expired += 1
+                self._misses += 1
+                return None
+
+            stream_fresh = entry.stream_expires_at > now
+            if not stream_fresh and require_stream:
+                self._stale_streams += 1
+                self._misses += 1
+                return None
+
+            entry.hits += 1
+            if from_disk:
+                self._hits_disk += 1
+                self._memory_put(video_id, entry)
+            else:
+                self._hits_memory += 1
+                self._memory.move_to_end(video_id)
+
+            if stream_fresh:
+                return entry.track
+            return dataclasses.replace(entry.track, audio_url='')
+
+    def contains(self, video_id: str) -> bool:
+        """
+        Whether a track with a fresh stream URL is cached.
+
+        Unlike get(), this does not count as a hit or miss and does not
+        touch LRU order, so background callers do not skew either.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._memory.get(video_id)
+            if entry is None:
+                entry = self._disk_get(video_id)
+            return (
+                entry is not None
+                and entry.metadata_expires_at > now
+                and entry.stream_expires_at > now
+            )
+
+    def _entry(self, track, cost: float) -> CachedTrack:
+        now = self._clock()
+        if not track.audio_url:
+            stream_expires_at = now
+        elif track.expires_at:
+            stream_expires_at = track.expires_at - self._expiry_margin
+        else:
+            stream_expires_at = now + self._stream_ttl
+        return CachedTrack(
+            track=track,
+            metadata_expires_at=now + self._metadata_ttl,
+            stream_expires_at=stream_expires_at,
+            cost=cost
+        )
+
+    def put(self, video_id: str, track, cost: float = 0.0):
+        """
+        Store a freshly extracted track in both tiers.
+
+        Args:
+            video_id: 11-character YouTube video ID
+            track: TrackInfo to cache
+            cost: Seconds the extraction took (sizes the refresh-ahead lead)
+        """
+        entry = self._entry(track, cost)
+        with self._lock:
+            self._memory_put(video_id, entry)
+            self._disk_put(video_id, entry)
+
+    def put_metadata(self, video_id: str, track):
+        """
+        Store a metadata-only track unless the track is already cached.
+
+        A metadata extraction racing a full extraction must never replace
+        the full entry (and its fresh audio_url), whichever tier holds it.
+        """
+        entry = self._entry(track, 0.0)
+        now = self._clock()
+        with self._lock:
+            if video_id in self._memory:
+                return
+            stored = self._disk_get(video_id)
+            if (stored is not None and stored.track.audio_url
+                    and stored.expires_at() > now):
+                return
+            self._memory_put(video_id, entry)
+            self._disk_put(video_id, entry)
+
+    def claim_refresh(self, video_id: str) -> bool:
+        """
+        Decide whether a hot entry should be re-extracted now.
+
+        Entries with fewer than ``refresh_min_hits`` hits are left to
+        expire. For hot entries the refresh fires once
+        ``now + lead >= expiry``, where ``lead`` is an exponentially
+        distributed head start scaled by the extraction cost (XFetch).
+        Returns True at most once per entry, so the caller can schedule
+        the refresh without duplicates.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._memory.get(video_id)
+            if entry is None or entry.refreshing or entry.hits < self._refresh_min_hits:
+                return False
+            delta = max(entry.cost, self._refresh_min_lead)
+            lead = -delta * self._refresh_beta * math.log(1.0 - self._rng())
+            if now + lead < entry.expires_at():
+                return False
+            entry.refreshing = True
+            self._refreshes += 1
+            return True
+
+    def release_refresh(self, video_id: str):
+        """Allow another refresh attempt after a failed one."""
+        with self._lock:
+            entry = self._memory.get(video_id)
+            if entry is not None:
+                entry.refreshing = False
+
+    def invalidate(self, video_id: str):
+        """Drop a track from both tiers."""
+        with self._lock:
+            self._memory.pop(video_id, None)
+            self._disk_delete(video_id)
+
+    def clear(self):
+        """Drop every cached track."""
+        with self._lock:
+            self._memory.clear()
+            db = self._db()
+            if db is not None:
+                with db:
+                    db.execute("DELETE FROM tracks")
+
+    def stats(self) -> dict:
+        """Get hit/miss/eviction counters for tuning."""
+        with self._lock:
+            lookups = self._hits_memory + self._hits_disk + self._misses
+            return {
+                "memory_entries": len(self._memory),
+                "memory_capacity": self._memory_entries,
+                "disk_enabled": bool(self._db_path),
+                "metadata_ttl": self._metadata_ttl,
+                "stream_ttl": self._stream_ttl,
+                "hits": {
+                    "memory": self._hits_memory,
+                    "disk": self._hits_disk,
+                },
+                "misses": self._misses,
+                "stale_streams": self._stale_streams,
+                "expired": self._expired,
+                "refreshes": self._refreshes,
+                "hit_ratio": round((lookups - self._misses) / lookups, 3) if lookups else 0.0,
+                "evictions": {
+                    "memory": self._evictions_memory,
+                    "disk": self._evictions_disk,
+                },
+            }
+
+    def close(self):
+        """Close the SQLite connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Global track cache (None when disabled)
+track_cache: Optional[TrackCache] = TrackCache() if config.cache.enabled else None
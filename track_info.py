@@ -0,0 +1,111 @@
+"""
+Track record shared by every extraction path.
+
+Kept free of project imports, so yt_dlp_client and the process-pool
+workers can build tracks without importing extraction_backends, which
+sets up the extraction manager, track cache and Invidious pool.
+"""
+
+import re
+from dataclasses import dataclass
+from enum import Enum
+from typing import List, Optional
+
+
+class BackendType(Enum):
+    """Extraction backend types."""
+    YT_DLP = "yt-dlp"
+    INVIDIOUS = "invidious"
+
+
+@dataclass(slots=True)
+class TrackInfo:
+    """Represents track metadata and streaming info.
+    
+    The one track record used everywhere (backends, yt_dlp_client, caches).
+    It is slotted, with no per-instance __dict__, since the caches hold
+    many; build it from ytdlp_track_fields(), never keep the info dict.
+    """
+    id: str
+    title: str
+    duration: int
+    audio_url: str  # Direct stream URL (from yt-dlp)
+    codec: str = "opus"
+    backend: BackendType = BackendType.YT_DLP
+    related: List[dict] = None
+    embed_url: str = None  # Client: YouTube Embed URL (with AdBlock)
+    invidious_url: str = None  # Client: Invidious Embed URL (last resort)
+    expires_at: Optional[int] = None  # Unix time audio_url stops working
+    
+    def __post_init__(self):
+        if self.related is None:
+            self.related = []
+
+
+# googlevideo URLs carry expiry as ?expire=<unix> (or /expire/<unix>/ in manifests)
+_EXPIRE_PATTERN = re.compile(r'[?&/]expire[=/](\d{9,11})')
+
+
+def parse_stream_expiry(audio_url: str) -> Optional[int]:
+    """
+    Parse the expiry time from a direct stream URL.
+    
+    Returns:
+        Unix timestamp from the URL's expire parameter, or None
+    """
+    if not audio_url:
+        return None
+    match = _EXPIRE_PATTERN.search(audio_url)
+    return int(match.group(1)) if match else None
+
+
+def ytdlp_track_fields(info: dict) -> dict:
+    """
+    Project a yt-dlp info dict down to the TrackInfo fields we keep.
+    
+    Shared by the in-process backend, yt_dlp_client and the process-pool
+    workers, which send only these fields back to the server process.
+    Callers project as soon as extract_info returns, so the info dict
+    (every format, thumbnail and caption track) is freed before the
+    YoutubeDL is closed and the track is built.
+    
+    Args:
+        info: Info dict returned by YoutubeDL.extract_info
+        
+    Returns:
+        Dict of TrackInfo keyword arguments (without backend)
+    """
+    # Extract related videos (best-effort)
+    related = []
+    if info.get('related_videos'):
+        related = [
+            {
+                'id': v.get('id', ''),
+                'title': v.get('title', 'Unknown'),
+                'duration': v.get('duration') or 0
+            }
+            for v in info.get('related_videos', [])[:10]
+        ]
+    
+    # Build YouTube embed URL (primary)
+    youtube_embed = f"https://www.youtube.com/embed/{info['id']}"
+    
+    # Build Invidious embed URL (fallback)
+    invidious_embed = f"https://yewtu.be/embed/{info['id']}"
+    
+    # Determine codec
+    codec = info.get('acodec', 'opus')
+    if not codec or codec == 'none':
+        codec = 'opus'
+    
+    return {
+        'id': info['id'],
+        'title': info.get('title', 'Unknown Title'),
+        'duration': info.get('duration', 0) or 0,
+        'audio_url': info.get('url', ''),
+        'codec': codec,
+        'related': related,
+        'embed_url': youtube_embed,
+        'invidious_url': invidious_embed,
+        'expires_at': parse_stream_expiry(info.get('url', '')),
+    }
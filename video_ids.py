@@ -0,0 +1,105 @@
+"""
+Canonical YouTube video ID parser.
+
+One precompiled pattern covers every URL shape the API accepts, so the
+yt-dlp client, both extraction backends, the routes and the track cache
+key all agree on what a video ID is:
+
+- youtube.com/watch?v=ID (v anywhere in the query, extra params allowed)
+- youtube.com/embed/ID, /v/ID, /shorts/ID, /live/ID
+- youtu.be/ID
+- www., m. and music. subdomains, youtube-nocookie.com
+- bare 11-character IDs
+
+Run ``python benchmarks/bench_video_ids.py`` to compare it with the old
+per-module pattern lists.
+
+Playlist and channel URLs are a separate shape (``parse_playlist_url``):
+they are enumerated by /api/playlist, never resolved as a single track.
+"""
+
+import re
+from typing import Optional
+
+
+_URL_PATTERN = re.compile(
+    r"""
+    (?:https?://)?
+    (?:(?:www|m|music)\.)?
+    (?:
+        youtube(?:-nocookie)?\.com/
+        (?:
+            watch/?\?(?:v=|[^#]*?&v=)
+          | (?:embed|v|shorts|live)/
+        )
+      | youtu\.be/
+    )
+    ([A-Za-z0-9_-]{11})
+    (?![A-Za-z0-9_-])
+    """,
+    re.VERBOSE
+)
+
+_BARE_ID = re.compile(r"[A-Za-z0-9_-]{11}")
+
+_PLAYLIST_PATTERN = re.compile(
+    r"""
+    (?:https?://)?
+    (?:(?:www|m|music)\.)?
+    youtube\.com/
+    (?:
+        (?:playlist|watch)/?\?(?:[^#]*?&)?list=(?P<list>[A-Za-z0-9_-]+)
+      | (?P<channel>@[\w.-]+|channel/UC[A-Za-z0-9_-]{22}|c/[\w.-]+|user/[\w.-]+)
+        (?:/(?:(?P<tab>videos|streams|shorts)|featured))?
+        /?(?:[?#]|$)
+    )
+    """,
+    re.VERBOSE
+)
+
+
+def parse_video_id(value: Optional[str]) -> Optional[str]:
+    """
+    Extract the 11-character video ID from a YouTube URL or bare ID.
+
+    Args:
+        value: YouTube URL in any supported format, or a bare video ID
+
+    Returns:
+        Video ID or None if the value is not recognised
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if len(value) == 11 and _BARE_ID.fullmatch(value):
+        return value
+    match = _URL_PATTERN.match(value)
+    return match.group(1) if match else None
+
+
+def parse_playlist_url(value: Optional[str]) -> Optional[str]:
+    """
+    Normalize a YouTube playlist or channel URL.
+
+    Args:
+        value: playlist?list=, watch?...&list=, /@handle, /channel/UC...,
+            /c/name or /user/name URL
+
+    Returns:
+        Canonical playlist URL, or the channel's videos/streams/shorts
+        tab URL (default: videos); None if the value is not a playlist or
+        channel
+    """
+    if not value:
+        return None
+    match = _PLAYLIST_PATTERN.match(value.strip())
+    if not match:
+        return None
+    if match.group("list"):
+        return f"https://www.youtube.com/playlist?list={match.group('list')}"
+    return f"https://www.youtube.com/{match.group('channel')}/{match.group('tab') or 'videos'}"
+
+
+def watch_url(video_id: str) -> str:
+    """Canonical watch URL for a video ID."""
+    return f"https://www.youtube.com/watch?v={video_id}"
@@ -28,15 +28,122 @@ class APIClient {
         return await response.json();
     }
     
-    async resolve(url) {
-        return await this.request('/resolve', {
+    /**
+     * Resolve a track. mode 'lite' returns metadata and embed URLs only
+     * (no format extraction); 'full' also returns the direct audio_url.
+     */
+    async resolve(url, mode = 'full') {
+        return await this.request(`/resolve?mode=${mode}`, {
             method: 'POST',
             body: JSON.stringify({ url })
         });
     }
     
-    async search(query, limit = 20) {
-        return await this.request(`/search?q=${encodeURIComponent(query)}&limit=${limit}`);
+    /**
+     * Resolve progressively: onEvent is called for each NDJSON event
+     * (metadata, stream, related, done/error) as soon as it arrives.
+     */
+    async resolveStream(url, onEvent) {
+        const response = await fetch(`${this.baseUrl}/resolve/stream`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ url })
+        });
+        
+        if (!response.ok) {
+            const error = await response.json().catch(() => ({}));
+            throw new Error(error.detail || `HTTP ${response.status}`);
+        }
+        
+        await this.readNdjson(response, onEvent);
+    }
+    
+    /**
+     * Stable audio URL relayed by the server (Range-capable, survives
+     * stream URL expiry); use it as <audio src>.
+     */
+    streamUrl(videoId) {
+        return `${this.baseUrl}/stream/${encodeURIComponent(videoId)}`;
+    }
+    
+    /**
+     * Enumerate a playlist or channel: onEvent gets the playlist header,
+     * then each page of entries ({id, title, duration, url}) as it is
+     * fetched, then done/error. Entries are resolved only when played.
+     */
+    async playlistStream(url, onEvent, limit = null) {
+        const params = new URLSearchParams({ url });
+        if (limit) params.set('limit', limit);
+        const response = await fetch(`${this.baseUrl}/playlist?${params}`);
+        
+        if (!response.ok) {
+            const error = await response.json().catch(() => ({}));
+            throw new Error(error.detail || `HTTP ${response.status}`);
+        }
+        
+        await this.readNdjson(response, onEvent);
+    }
+    
+    async readNdjson(response, onEvent) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            
+            let newline;
+            while ((newline = buffer.indexOf('\n')) >= 0) {
+                const line = buffer.slice(0, newline).trim();
+                buffer = buffer.slice(newline + 1);
+                if (line) onEvent(JSON.parse(line));
+            }
+        }
+    }
+    
+    /**
+     * Resolve many URLs/IDs in one round trip (e.g. a queue or playlist).
+     * Returns per-item results in request order.
+     */
+    async resolveBatch(urls) {
+        return await this.request('/resolve/batch', {
+            method: 'POST',
+            body: JSON.stringify({ urls })
+        });
+    }
+    
+    /**
+     * source 'local' answers from the server's catalog of seen tracks
+     * (falling through to YouTube on a miss); 'youtube' always searches.
+     */
+    async search(query, limit = 20, source = 'youtube') {
+        return await this.request(`/search?q=${encodeURIComponent(query)}&limit=${limit}&source=${source}`);
+    }
+    
+    async suggest(query, limit = 8) {
+        return await this.request(`/suggest?q=${encodeURIComponent(query)}&limit=${limit}`);
+    }
+    
+    /**
+     * Search with Server-Sent Events: onResult is called for each result
+     * as soon as the backend has it. Resolves with the final count.
+     */
+    searchStream(query, onResult, limit = 20) {
+        const params = new URLSearchParams({ q: query, limit });
+        return new Promise((resolve, reject) => {
+            const source = new EventSource(`${this.baseUrl}/search/stream?${params}`);
+            source.addEventListener('result', (e) => onResult(JSON.parse(e.data)));
+            source.addEventListener('done', (e) => {
+                source.close();
+                resolve(JSON.parse(e.data).count);
+            });
+            source.addEventListener('error', (e) => {
+                source.close();
+                reject(new Error(e.data ? JSON.parse(e.data).detail : 'Search stream failed'));
+            });
+        });
     }
     
     async healthCheck() {
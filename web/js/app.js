@@ -27,12 +27,21 @@ class NextSoundWaveApp {
         searchInput.addEventListener('keypress', async (e) => {
             if (e.key === 'Enter') {
                 const query = searchInput.value.trim();
-                if (query) {
+                if (this.isPlaylistUrl(query)) {
+                    await this.loadPlaylist(query);
+                } else if (query) {
                     await this.search(query);
                 }
             }
         });
         
+        // Instant completions from the server's local index
+        let suggestTimer = null;
+        searchInput.addEventListener('input', () => {
+            clearTimeout(suggestTimer);
+            suggestTimer = setTimeout(() => this.updateSuggestions(searchInput.value.trim()), 80);
+        });
+        
         // Navigation
         document.querySelectorAll('.nav-item').forEach(item => {
             item.addEventListener('click', (e) => {
@@ -107,6 +116,10 @@ class NextSoundWaveApp {
         
         audio.addEventListener('error', (e) => {
             console.error('Playback error:', e);
+            // Clearing the src for an embed also raises an error; ignore it
+            if (this.currentTrack && !this.player.isEmbedMode) {
+                this.playEmbedFallback(this.currentTrack);
+            }
         });
     }
     
@@ -351,6 +364,104 @@ class NextSoundWaveApp {
         this.addToQueue(track);
         this.isPlaying = true;
         this.updatePlayPauseButton();
+        
+        // Embed first: the lite resolve never extracts a stream URL
+        await this.resolveMetadata(track);
+        if (this.currentTrack !== track) return;  // User moved on
+        if (track.embed_url) {
+            this.player.playYouTubeEmbed(track.embed_url, document.getElementById('content-area'));
+        } else {
+            this.playDirectAudio(track);
+        }
+    }
+    
+    /**
+     * Embed playback only needs title, duration and embed URLs, so the
+     * default path resolves in lite mode. The direct stream URL is only
+     * extracted when direct audio is actually played (playDirectAudio).
+     */
+    async resolveMetadata(track) {
+        if (!track.id || track.id.startsWith('demo') || track.id.startsWith('recent')) return;
+        
+        try {
+            const info = await this.api.resolve(`https://www.youtube.com/watch?v=${track.id}`, 'lite');
+            if (this.currentTrack !== track) return;  // User moved on
+            
+            track.title = info.title;
+            track.duration = info.duration;
+            track.embed_url = info.embed_url;
+            track.invidious_url = info.invidious_url;
+            if (info.audio_url) track.audio_url = info.audio_url;
+            if (info.related && info.related.length) this.relatedVideos = info.related;
+            this.updatePlayerUI(track);
+        } catch (error) {
+            console.error('Resolve failed:', error);
+        }
+    }
+    
+    /**
+     * Play the direct audio stream through the server relay when there is
+     * no embed to play. The relay resolves (and re-resolves expired)
+     * stream URLs itself; the progressive resolve only fills in metadata
+     * and related tracks.
+     */
+    async playDirectAudio(track) {
+        if (!track.id || track.id.startsWith('demo') || track.id.startsWith('recent')) return;
+        
+        this.player.play(this.api.streamUrl(track.id));
+        await this.resolveProgressively(track);
+    }
+    
+    /**
+     * Fall back to an embed when the relay cannot play a track: YouTube's
+     * if the lite resolve has since succeeded, otherwise Invidious.
+     */
+    async playEmbedFallback(track) {
+        if (!track.embed_url) await this.resolveMetadata(track);
+        if (this.currentTrack !== track) return;
+        
+        const container = document.getElementById('content-area');
+        if (track.embed_url) {
+            this.player.playYouTubeEmbed(track.embed_url, container);
+        } else if (track.invidious_url) {
+            this.player.playInvidiousEmbed(track.invidious_url, container);
+        }
+    }
+    
+    /**
+     * Fill in track details as the server streams them: metadata first
+     * (renders immediately, enough for the embed), then the direct stream
+     * URL and related videos.
+     */
+    async resolveProgressively(track) {
+        if (!track.id || track.id.startsWith('demo') || track.id.startsWith('recent')) return;
+        
+        try {
+            await this.api.resolveStream(`https://www.youtube.com/watch?v=${track.id}`, (event) => {
+                if (this.currentTrack !== track) return;  // User moved on
+                
+                switch (event.event) {
+                    case 'metadata':
+                        track.title = event.title;
+                        track.duration = event.duration;
+                        track.embed_url = event.embed_url;
+                        track.invidious_url = event.invidious_url;
+                        this.updatePlayerUI(track);
+                        break;
+                    case 'stream':
+                        track.audio_url = event.audio_url;
+                        break;
+                    case 'related':
+                        this.relatedVideos = event.related;
+                        break;
+                    case 'error':
+                        console.error('Resolve failed:', event.detail);
+                        break;
+                }
+            });
+        } catch (error) {
+            console.error('Resolve failed:', error);
+        }
     }
     
     async search(query) {
@@ -359,6 +470,31 @@ class NextSoundWaveApp {
         document.getElementById('featured-section').classList.add('hidden');
         document.getElementById('search-results').classList.remove('hidden');
         
+        // Paint results as they stream in; fall back to the plain request
+        // if streaming fails before the first result
+        const streamed = [];
+        let frame = null;
+        try {
+            await this.api.searchStream(query, (item) => {
+                streamed.push(item);
+                if (!frame) {
+                    frame = requestAnimationFrame(() => {
+                        frame = null;
+                        this.renderSearchResults({ results: streamed }, query);
+                    });
+                }
+            });
+            if (frame) cancelAnimationFrame(frame);
+            this.renderSearchResults({ results: streamed }, query);
+            return;
+        } catch (error) {
+            if (streamed.length > 0) {
+                this.renderSearchResults({ results: streamed }, query);
+                return;
+            }
+            console.warn('Streaming search failed, retrying:', error);
+        }
+        
         try {
             const results = await this.api.search(query);
             this.renderSearchResults(results, query);
@@ -409,6 +545,73 @@ class NextSoundWaveApp {
         });
     }
     
+    async updateSuggestions(query) {
+        const list = document.getElementById('search-suggestions');
+        if (query.length < 2 || this.isPlaylistUrl(query)) {
+            list.innerHTML = '';
+            return;
+        }
+        try {
+            const { suggestions } = await this.api.suggest(query);
+            list.innerHTML = suggestions
+                .map(s => `<option value="${this.escapeHtml(s)}"></option>`)
+                .join('');
+        } catch (error) {
+            list.innerHTML = '';
+        }
+    }
+    
+    isPlaylistUrl(value) {
+        return /youtube\.com\/(playlist\?|watch\?.*[?&]list=|@|channel\/|c\/|user\/)/.test(value);
+    }
+    
+    /**
+     * Stream a playlist/channel into the results grid and queue page by
+     * page. Tracks are resolved only when played (playTrack).
+     */
+    async loadPlaylist(url) {
+        document.getElementById('hero-section').classList.add('hidden');
+        document.getElementById('featured-section').classList.add('hidden');
+        document.getElementById('search-results').classList.remove('hidden');
+        
+        const grid = document.getElementById('search-results-grid');
+        grid.innerHTML = '<div class="search-no-results"><p>Loading playlist...</p></div>';
+        const entries = [];
+        
+        try {
+            await this.api.playlistStream(url, (event) => {
+                if (event.event === 'entries') {
+                    const tracks = event.entries.map(entry => ({
+                        id: entry.id,
+                        title: entry.title,
+                        artist: 'Unknown Artist',
+                        duration: entry.duration,
+                        thumbnail: `https://img.youtube.com/vi/${entry.id}/120.jpg`
+                    }));
+                    entries.push(...event.entries);
+                    const queued = new Set(this.queue.map(t => t.id));
+                    this.queue.push(...tracks.filter(t => !queued.has(t.id)));
+                    this.renderQueue();
+                    this.renderSearchResults({ results: entries }, url);
+                } else if (event.event === 'error') {
+                    console.error('Playlist failed:', event.detail);
+                }
+            });
+        } catch (error) {
+            console.error('Playlist failed:', error);
+            grid.innerHTML = `
+                <div class="search-no-results">
+                    <p>Could not load playlist. Please check the URL.</p>
+                </div>
+            `;
+            return;
+        }
+        
+        if (entries.length === 0) {
+            this.renderSearchResults({ results: [] }, url);
+        }
+    }
+    
     addToQueue(track) {
         const exists = this.queue.find(t => t.id === track.id);
         if (!exists) {
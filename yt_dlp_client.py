@@ -1,39 +1,121 @@
 """
 yt-dlp client wrapper for YouTube extraction.
+
+yt-dlp is imported on first use, not at module import: loading its
+extractor registry takes a large share of cold start, and the health
+endpoints must answer before it has finished. ``YoutubeDL`` and
+``DownloadError`` are still module attributes (resolved lazily), so
+``patch('yt_dlp_client.YoutubeDL')`` keeps working.
 """
 
-import re
-from typing import List, Optional
-from dataclasses import dataclass
-from yt_dlp import YoutubeDL
-from yt_dlp.utils import DownloadError
+from typing import Iterator, List, Optional
 
 from config import config
+from track_info import TrackInfo, ytdlp_track_fields
+from video_ids import parse_playlist_url, parse_video_id, watch_url
+
+
+_LAZY_NAMES = {
+    'YoutubeDL': ('yt_dlp', 'YoutubeDL'),
+    'DownloadError': ('yt_dlp.utils', 'DownloadError'),
+}
+
+
+def _load_yt_dlp():
+    """Import yt-dlp and bind YoutubeDL/DownloadError here (idempotent)."""
+    import importlib
 
+    namespace = globals()
+    for name, (module, attribute) in _LAZY_NAMES.items():
+        # An existing binding (including a test patch) wins
+        if name not in namespace:
+            namespace[name] = getattr(importlib.import_module(module), attribute)
+    return namespace['YoutubeDL']
 
-@dataclass
-class TrackInfo:
-    """Represents track metadata and streaming info."""
-    id: str
-    title: str
-    duration: int
-    audio_url: str
-    related: List[dict]
+
+def __getattr__(name):
+    if name in _LAZY_NAMES:
+        _load_yt_dlp()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class PlaylistPager:
+    """
+    Pages through a playlist's flat entries as yt-dlp fetches them.
+
+    yt-dlp yields unprocessed playlist entries lazily, requesting the next
+    continuation page from YouTube only when iteration reaches it, so a
+    page is returned as soon as its entries are known. Entries carry only
+    ID, title and duration; each track is resolved when it is played.
+    """
+
+    def __init__(self, ydl, info: dict, page_size: int, max_entries: int):
+        """
+        Args:
+            ydl: Open YoutubeDL instance (closed by close())
+            info: Unprocessed playlist info dict from extract_info
+            page_size: Entries per page
+            max_entries: Stop after this many entries
+        """
+        self.id = info.get('id', '')
+        self.title = info.get('title') or 'Unknown Playlist'
+        self.uploader = info.get('uploader') or info.get('channel') or ''
+        self.count = 0
+        self.skipped = 0
+        self._ydl = ydl
+        self._entries = iter(info.get('entries') or [])
+        self._page_size = page_size
+        self._max_entries = max_entries
+        self._exhausted = False
+
+    @property
+    def truncated(self) -> bool:
+        """Whether enumeration stopped at max_entries."""
+        return self.count >= self._max_entries and not self._exhausted
+
+    def next_page(self) -> List[dict]:
+        """
+        Fetch the next page of entries (blocking; may hit the network).
+
+        Returns:
+            Up to page_size entry dicts (id, title, duration, url);
+            empty once the playlist is exhausted or max_entries is reached
+
+        Raises:
+            ValueError: If yt-dlp fails while paginating
+        """
+        page = []
+        try:
+            while len(page) < self._page_size and self.count < self._max_entries:
+                entry = next(self._entries, None)
+                if entry is None:
+                    self._exhausted = True
+                    break
+                video_id = parse_video_id(entry.get('id'))
+                if video_id is None:
+                    # Nested playlists, channels, removed videos
+                    self.skipped += 1
+                    continue
+                page.append({
+                    'id': video_id,
+                    'title': entry.get('title') or 'Unknown',
+                    'duration': int(entry.get('duration') or 0),
+                    'url': watch_url(video_id),
+                })
+                self.count += 1
+        except DownloadError as e:
+            raise ValueError(f"Failed to page playlist: {e}")
+        return page
+
+    def close(self):
+        """Release the YoutubeDL instance."""
+        self._ydl.close()
 
 
 class YTDLPCClient:
     """Client for interacting with yt-dlp."""
     
-    # Regex patterns for YouTube URL formats
-    URL_PATTERNS = [
-        r'(?:https?://)?(?:www\.)?youtube\.com/watch\?v=([a-zA-Z0-9_-]{11})',
-        r'(?:https?://)?(?:www\.)?youtube\.com/embed/([a-zA-Z0-9_-]{11})',
-        r'(?:https?://)?(?:www\.)?youtube\.com/v/([a-zA-Z0-9_-]{11})',
-        r'(?:https?://)?youtu\.be/([a-zA-Z0-9_-]{11})',
-        r'(?:https?://)?(?:www\.)?youtube\.com/shorts/([a-zA-Z0-9_-]{11})',
-        r'(?:https?://)?youtube\.com/watch\?v=([a-zA-Z0-9_-]{11})',  # Without www
-    ]
-    
     def __init__(self):
         """Initialize yt-dlp client with configured options."""
         # Prioritize Opus (YouTube's best adaptive audio)
@@ -56,18 +138,7 @@ class YTDLPCClient:
         Returns:
             Video ID string or None if invalid
         """
-        if not url:
-            return None
-        
-        # Clean up URL
-        url = url.strip()
-        
-        for pattern in self.URL_PATTERNS:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
-        
-        return None
+        return parse_video_id(url)
     
     def is_valid_youtube_url(self, url: str) -> bool:
         """Check if URL is a valid YouTube URL."""
@@ -93,6 +164,7 @@ class YTDLPCClient:
         
         ydl_opts = self.ydl_opts.copy()
         
+        _load_yt_dlp()
         try:
             with YoutubeDL(ydl_opts) as ydl:
                 info = ydl.extract_info(url, download=False)
@@ -103,30 +175,32 @@ class YTDLPCClient:
                 if not info.get('url'):
                     raise ValueError("Incomplete track data: missing url")
                 
-                # Extract related videos (best-effort)
-                related_videos = []
-                if info.get('related_videos'):
-                    related_videos = [
-                        {
-                            'id': v.get('id', ''),
-                            'title': v.get('title', 'Unknown'),
-                            'duration': v.get('duration') or 0
-                        }
-                        for v in info.get('related_videos', [])[:10]
-                    ]
-                
-                return TrackInfo(
-                    id=info['id'],
-                    title=info.get('title', 'Unknown Title'),
-                    duration=info.get('duration', 0) or 0,
-                    audio_url=info.get('url', ''),
-                    related=related_videos
-                )
-                
+                # Keep only the TrackInfo fields; drop the info dict now
+                fields = ytdlp_track_fields(info)
+                del info
         except DownloadError as e:
             raise ValueError(f"Failed to extract track: {e}")
         except KeyError as e:
             raise ValueError(f"Incomplete track data: missing {e}")
+        
+        return TrackInfo(**fields)
+    
+    SEARCH_OPTS = {
+        'quiet': True,
+        'format': 'bestaudio[acodec=opus]/best[height<=720]',
+        'extract_flat': True,
+        'no_warnings': True,
+        'skip_download': True,
+    }
+    
+    @staticmethod
+    def _search_result(entry: dict) -> dict:
+        return {
+            'id': entry.get('id', ''),
+            'title': entry.get('title', 'Unknown'),
+            'duration': entry.get('duration') or 0,
+            'thumbnail': entry.get('thumbnail', ''),
+        }
     
     def search(self, query: str, limit: int = 20) -> List[dict]:
         """
@@ -139,34 +213,114 @@ class YTDLPCClient:
         Returns:
             List of search result dictionaries
         """
-        ydl_opts = {
-            'quiet': True,
-            'format': 'bestaudio[acodec=opus]/best[height<=720]',
-            'extract_flat': True,
-            'no_warnings': True,
-            'skip_download': True,
-        }
-        
+        _load_yt_dlp()
         try:
-            with YoutubeDL(ydl_opts) as ydl:
+            with YoutubeDL(dict(self.SEARCH_OPTS)) as ydl:
                 results = ydl.extract_info(
                     f"ytsearch{limit}:{query}",
                     download=False
                 )
                 
                 return [
-                    {
-                        'id': entry.get('id', ''),
-                        'title': entry.get('title', 'Unknown'),
-                        'duration': entry.get('duration') or 0,
-                        'thumbnail': entry.get('thumbnail', ''),
-                    }
+                    self._search_result(entry)
                     for entry in results.get('entries', [])
                 ]
                 
         except DownloadError:
             return []
     
+    def iter_search(self, query: str, limit: int = 20) -> Iterator[dict]:
+        """
+        Search YouTube, yielding each result as yt-dlp produces it.
+        
+        Unprocessed search results keep yt-dlp's entries a lazy
+        generator, so the first results are available before the whole
+        result list has been fetched.
+        
+        Args:
+            query: Search query string
+            limit: Maximum number of results
+            
+        Yields:
+            Search result dictionaries (same shape as search())
+            
+        Raises:
+            ValueError: If yt-dlp fails
+        """
+        _load_yt_dlp()
+        ydl = YoutubeDL(dict(self.SEARCH_OPTS))
+        try:
+            info = ydl.extract_info(
+                f"ytsearch{limit}:{query}",
+                download=False,
+                process=False
+            )
+            for count, entry in enumerate(info.get('entries') or []):
+                if count >= limit:
+                    break
+                yield self._search_result(entry)
+        except DownloadError as e:
+            raise ValueError(f"Search failed: {e}")
+        finally:
+            ydl.close()
+    
+    def open_playlist(
+        self,
+        url: str,
+        page_size: Optional[int] = None,
+        max_entries: Optional[int] = None
+    ) -> PlaylistPager:
+        """
+        Start a flat enumeration of a playlist or channel.
+        
+        Only the first page is requested here; later pages are fetched by
+        PlaylistPager.next_page().
+        
+        Args:
+            url: YouTube playlist or channel URL
+            page_size: Entries per page
+            max_entries: Maximum entries to enumerate
+            
+        Returns:
+            PlaylistPager (caller must close() it)
+            
+        Raises:
+            ValueError: If the URL is not a playlist/channel or cannot be loaded
+        """
+        playlist_url = parse_playlist_url(url)
+        if not playlist_url:
+            raise ValueError(f"Invalid YouTube playlist or channel URL: {url}")
+        
+        _load_yt_dlp()
+        ydl = YoutubeDL({
+            'quiet': True,
+            'no_warnings': True,
+            'extract_flat': 'in_playlist',
+            'skip_download': True,
+            'socket_timeout': config.ytdlp.timeout,
+        })
+        try:
+            # process=False keeps 'entries' a lazy generator
+            info = ydl.extract_info(playlist_url, download=False, process=False)
+            if info.get('_type') in ('url', 'url_transparent') and info.get('url'):
+                # Legacy /c/ and /user/ URLs redirect to the canonical channel
+                info = ydl.extract_info(info['url'], download=False, process=False)
+            if info.get('_type') != 'playlist':
+                raise ValueError(f"Not a playlist: {url}")
+        except DownloadError as e:
+            ydl.close()
+            raise ValueError(f"Failed to load playlist: {e}")
+        except ValueError:
+            ydl.close()
+            raise
+        
+        return PlaylistPager(
+            ydl,
+            info,
+            page_size=page_size or config.server.playlist_page_size,
+            max_entries=max_entries or config.server.playlist_max_entries
+        )
+    
     def download_as_opus(self, url: str, output_path: str = ".") -> dict:
         """
         Download audio as Opus and optionally transcode.
@@ -185,6 +339,7 @@ class YTDLPCClient:
             'no_warnings': False,
         }
         
+        _load_yt_dlp()
         try:
             with YoutubeDL(ydl_opts) as ydl:
                 info = ydl.extract_info(url, download=False)
@@ -224,6 +379,7 @@ class YTDLPCClient:
             }],
         }
         
+        _load_yt_dlp()
         try:
             with YoutubeDL(ydl_opts) as ydl:
                 info = ydl.extract_info(url, download=True)